@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Measure how long inline-snapshot needs to convert large values into the
+code which is written into the snapshots.
+
+Usage:
+    uv run scripts/benchmark_customize.py [--size SIZE] [--repeat REPEAT]
+
+Every case builds the Custom tree of a value with SIZE elements (1M by
+default) and renders its code, which is what happens for every value
+which is compared with a snapshot.
+"""
+
+import argparse
+import sys
+import time
+
+from inline_snapshot._adapter_context import AdapterContext
+from inline_snapshot._code_repr import code_repr_context
+from inline_snapshot._customize._builder import Builder
+from inline_snapshot._generator_utils import only_value
+from inline_snapshot._global_state import snapshot_env
+
+
+def cases(size: int) -> dict:
+    return {
+        "ints": list(range(size)),
+        "floats": [i / 7 for i in range(size)],
+        "strings": [f"item-{i}" for i in range(size)],
+        "mixed": [(i, str(i), i / 3, None, i % 2 == 0) for i in range(size // 5)],
+        "dicts": [{"id": i, "name": f"name-{i}"} for i in range(size // 4)],
+    }
+
+
+def measure(value, context: AdapterContext) -> float:
+    start = time.perf_counter()
+    with code_repr_context(context):
+        custom = Builder(_snapshot_context=context)._get_handler(value)
+        only_value(custom._code_repr(context))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    context = AdapterContext(sys._getframe())
+
+    with snapshot_env():
+        for name, value in cases(args.size).items():
+            best = min(measure(value, context) for _ in range(args.repeat))
+            print(f"{name:10} {best:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
+from __future__ import annotations
+
 from itertools import groupby
+from typing import Any
+from typing import Sequence
+
+from inline_snapshot._customize._custom import Custom
 
 
 def align(seq_a, seq_b) -> str:
@@ -27,43 +33,257 @@ def align(seq_a, seq_b) -> str:
     return "m" * start + diff + "m" * end
 
 
+def _hash_key(value) -> int | None:
+    """A hash which is equal for equal values, or `None` if the value can not
+    be hashed."""
+    if isinstance(value, Custom):
+        if not value._is_static():
+            # unmanaged values like dirty-equals can be equal to different values
+            return None
+        try:
+            return hash(value)
+        except TypeError:
+            value = value._eval()
+
+    if type(value) in (list, tuple):
+        keys = [_hash_key(v) for v in value]
+        if None in keys:
+            return None
+        return hash((type(value), *keys))
+
+    if type(value) is dict:
+        items = []
+        for k, v in value.items():
+            value_key = _hash_key(v)
+            if value_key is None:
+                return None
+            items.append((k, value_key))
+        try:
+            return hash((dict, frozenset(items)))
+        except TypeError:
+            return None
+
+    try:
+        return hash(value)
+    except TypeError:
+        return None
+
+
+def _fingerprints(seq_a, seq_b) -> tuple[Sequence[Any], Sequence[Any]]:
+    """Maps the elements to integers which are equal for equal elements.
+
+    The original sequences are returned if some elements can only be
+    compared with `==`.
+    """
+    ids: dict[int, list[tuple[Any, int]]] = {}
+    next_id = 0
+
+    def element_id(value) -> int | None:
+        nonlocal next_id
+        key = _hash_key(value)
+        if key is None:
+            return None
+
+        candidates = ids.setdefault(key, [])
+        for candidate, candidate_id in candidates:
+            if candidate == value:
+                return candidate_id
+
+        candidates.append((value, next_id))
+        next_id += 1
+        return next_id - 1
+
+    result = []
+    for seq in (seq_a, seq_b):
+        fingerprints = []
+        for value in seq:
+            fingerprint = element_id(value)
+            if fingerprint is None:
+                return seq_a, seq_b
+            fingerprints.append(fingerprint)
+        result.append(fingerprints)
+
+    return result[0], result[1]
+
+
+def _lcs_length(a: Sequence[Any], b: Sequence[Any]) -> int:
+    """The length of the longest common subsequence (Myers' O((n+m)D)
+    algorithm)."""
+    n = len(a)
+    m = len(b)
+    offset = n + m + 1
+    v = [0] * (2 * offset + 1)
+
+    for d in range(n + m + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return (n + m - d) // 2
+
+    assert False  # pragma: no cover
+
+
+class _Aligner:
+    """Finds the same alignment as the Needleman-Wunsch backtracking from the
+    end, which prefers matches and then insertions, in linear space.
+
+    The alignment is computed on the reversed sequences, where the
+    backtracking becomes a walk from the start which only depends on the
+    LCS of the remaining suffixes. The walk is split at the middle row
+    (Hirschberg) and only the diagonals which the walk can reach are
+    computed.
+
+    The rows are dicts which map the column q to the LCS of the suffixes
+    a[p:] and b[q:]. Missing values are -1, which is a lower bound for the
+    cells which are not part of the walk.
+    """
+
+    def __init__(self, a: Sequence[Any], b: Sequence[Any]):
+        self.a = a
+        self.b = b
+        self.track: list[str] = []
+
+    def _row(
+        self, p: int, q0: int, q1: int, band: tuple[int, int], below: dict, right: dict
+    ):
+        a = self.a[p]
+        b = self.b
+        row = {q1: right.get(p, -1)}
+        k_min, k_max = band
+        columns = range(min(q1 - 1, p + k_max), max(q0, p + k_min) - 1, -1)
+        last = row.get(columns.start + 1, -1)
+        for q in columns:
+            if a == b[q]:
+                last = below.get(q + 1, -1) + 1
+            else:
+                down = below.get(q, -1)
+                if down > last:
+                    last = down
+            row[q] = last
+        return row
+
+    def _tracked_row(self, p, q0, q1, band, below, right, targets_below):
+        # like _row(), but also returns the columns where the walks from the
+        # cells of the row reach the row of targets_below
+        a = self.a[p]
+        b = self.b
+        row = {q1: right.get(p, -1)}
+        targets = {q1: targets_below.get(q1, q1)}
+        k_min, k_max = band
+        columns = range(min(q1 - 1, p + k_max), max(q0, p + k_min) - 1, -1)
+        last = row.get(columns.start + 1, -1)
+        target = targets.get(columns.start + 1, q1)
+        for q in columns:
+            if a == b[q]:
+                last = below.get(q + 1, -1) + 1
+                target = targets_below.get(q + 1, q + 1)
+            else:
+                down = below.get(q, -1)
+                if down > last:
+                    last = down
+                    target = targets_below.get(q, q)
+            row[q] = last
+            targets[q] = target
+        return row, targets
+
+    def solve(
+        self,
+        p0: int,
+        p1: int,
+        q0: int,
+        q1: int,
+        matches: int,
+        bottom: dict,
+        right: dict,
+    ):
+        """Appends the walk from (p0, q0) to (p1, q1) to the track.
+
+        Arguments:
+            matches: the number of matches of the walk
+            bottom: the row p1
+            right: the values of the column q1
+        """
+        # the walk always takes a match
+        start = p0
+        while p0 < p1 and q0 < q1 and self.a[p0] == self.b[q0]:
+            p0 += 1
+            q0 += 1
+        self.track.append("m" * (p0 - start))
+        matches -= p0 - start
+
+        if matches == 0:
+            # the values are equal for every cell, which prefers insertions
+            self.track.append("i" * (q1 - q0) + "d" * (p1 - p0))
+            return
+
+        # the diagonals q-p which the walk can reach
+        band = (q0 - p0 - (p1 - p0 - matches), q0 - p0 + (q1 - q0 - matches))
+
+        if p1 - p0 == 1:
+            row = self._row(p0, q0, q1, band, bottom, right)
+            a = self.a[p0]
+            for q in range(q0, q1):
+                if a == self.b[q]:
+                    self.track.append("m" + "i" * (q1 - q - 1))
+                    return
+                if row.get(q + 1, -1) >= bottom.get(q, -1):
+                    self.track.append("i")
+                else:
+                    self.track.append("d" + "i" * (q1 - q))
+                    return
+            assert False  # pragma: no cover
+
+        mid = (p0 + p1) // 2
+
+        middle = bottom
+        for p in range(p1 - 1, mid - 1, -1):
+            middle = self._row(p, q0, q1, band, middle, right)
+
+        # column in this row -> column in the middle row where the walk crosses it
+        targets: dict[int, int] = {}
+        row = middle
+        for p in range(mid - 1, p0 - 1, -1):
+            row, targets = self._tracked_row(p, q0, q1, band, row, right, targets)
+        k = targets.get(q0, q0)
+
+        # the values of column k for the upper half
+        row = middle
+        column = {mid: middle[k]}
+        for p in range(mid - 1, p0 - 1, -1):
+            row = self._row(p, q0, q1, band, row, right)
+            column[p] = row.get(k, -1)
+
+        bottom_matches = middle[k] - bottom[q1]
+        self.solve(p0, mid, q0, k, matches - bottom_matches, middle, column)
+        self.solve(mid, p1, k, q1, bottom_matches, bottom, right)
+
+
 def nw_align(seq_a, seq_b) -> str:
+    """Aligns the sequences and returns the operations to get from `seq_a`
+    to `seq_b` (`m`atch, `i`nsert, `d`elete).
+
+    The elements are compared with their fingerprints when possible and
+    only O(len(seq_a)+len(seq_b)) memory is used.
+    """
+    a, b = _fingerprints(seq_a, seq_b)
+    a = a[::-1]
+    b = b[::-1]
+    n = len(a)
+    m = len(b)
+
+    aligner = _Aligner(a, b)
+    zeros = {i: 0 for i in range(max(n, m) + 1)}
+    aligner.solve(0, n, 0, m, _lcs_length(a, b), zeros, zeros)
 
-    matrix: list = [[(0, "e")] + [(0, "i")] * len(seq_b)]
-
-    for a in seq_a:
-        last = matrix[-1]
-
-        new_line = [(0, "d")]
-        for bi, b in enumerate(seq_b, 1):
-            la, lc, lb = new_line[-1], last[bi - 1], last[bi]
-            values = [(la[0], "i"), (lb[0], "d")]
-            if a == b:
-                values.append((lc[0] + 1, "m"))
-
-            new_line.append(max(values))
-        matrix.append(new_line)
-
-    # backtrack
-
-    ai = len(seq_a)
-    bi = len(seq_b)
-    d = ""
-    track = ""
-
-    while d != "e":
-        _, d = matrix[ai][bi]
-        if d == "m":
-            ai -= 1
-            bi -= 1
-        elif d == "i":
-            bi -= 1
-        elif d == "d":
-            ai -= 1
-        if d != "e":
-            track += d
-
-    return track[::-1]
+    return "".join(aligner.track)[::-1]
 
 
 def add_x(track):
@@ -5,6 +5,7 @@ from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
+from typing import Callable
 from typing import DefaultDict
 from typing import Tuple
 from typing import cast
@@ -101,9 +102,15 @@ class Change(ChangeBase):
     flag: str
     file: SourceFile
 
+    # the new code is formatted by format_changes() before it is applied
+    _formatted = False
+
     def rich_diff(self):
         return None
 
+    def _map_code(self, f: Callable[[str], str]):
+        """Replaces every expression of this change with `f(expression)`."""
+
     @property
     def filename(self):
         return self.file.filename
@@ -133,8 +140,8 @@ class ListInsert(Change):
 
     new_code: list[str]
 
-    def __post_init__(self):
-        self.new_code = [self.file.format_expression(v) for v in self.new_code]
+    def _map_code(self, f):
+        self.new_code = [f(v) for v in self.new_code]
 
 
 @dataclass()
@@ -144,11 +151,8 @@ class DictInsert(Change):
 
     new_code: list[tuple[str, str]]
 
-    def __post_init__(self):
-        self.new_code = [
-            (self.file.format_expression(k), self.file.format_expression(v))
-            for k, v in self.new_code
-        ]
+    def _map_code(self, f):
+        self.new_code = [(f(k), f(v)) for k, v in self.new_code]
 
 
 @dataclass()
@@ -162,8 +166,8 @@ class Replace(Change):
         range = self.file.asttokens().get_text_positions(self.node, False)
         change.replace(range, self.new_code, filename=self.filename)
 
-    def __post_init__(self):
-        self.new_code = self.file.format_expression(self.new_code)
+    def _map_code(self, f):
+        self.new_code = f(self.new_code)
 
 
 @dataclass()
@@ -174,8 +178,8 @@ class CallArg(Change):
 
     new_code: str
 
-    def __post_init__(self):
-        self.new_code = self.file.format_expression(self.new_code)
+    def _map_code(self, f):
+        self.new_code = f(self.new_code)
 
 
 TokenRange = Tuple[Token, Token]
@@ -250,7 +254,34 @@ def generic_sequence_update(
         )
 
 
+def format_changes(all_changes: list[ChangeBase]):
+    """Formats the new code of all changes with one formatter call per file."""
+    by_file: dict[str, list[Change]] = defaultdict(list)
+
+    for change in all_changes:
+        if isinstance(change, Change) and not change._formatted:
+            by_file[change.filename].append(change)
+
+    for changes in by_file.values():
+        expressions: list[str] = []
+
+        def collect(code):
+            expressions.append(code)
+            return code
+
+        for change in changes:
+            change._map_code(collect)
+
+        formatted = iter(changes[0].file.format_expressions(expressions))
+
+        for change in changes:
+            change._map_code(lambda code: next(formatted))
+            change._formatted = True
+
+
 def apply_all(all_changes: list[ChangeBase], recorder: ChangeRecorder):
+    format_changes(all_changes)
+
     by_parent: dict[EnhancedAST, list[Delete | DictInsert | ListInsert | CallArg]] = (
         defaultdict(list)
     )
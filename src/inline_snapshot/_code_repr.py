@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import builtins
 import inspect
+import threading
 import warnings
 from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import singledispatch
 from typing import TYPE_CHECKING
-from unittest import mock
+from typing import Any
+from typing import Callable
 
 from typing_extensions import deprecated
 
@@ -58,7 +62,7 @@ class HasRepr:
             if type(other) is not self._type:
                 return False
 
-        with mock_repr(adapter_context_for_parent_frame()):
+        with code_repr_context(adapter_context_for_parent_frame()):
             other_repr = value_code_repr(other)
         return other_repr == self._str_repr or other_repr == real_repr(self)
 
@@ -93,33 +97,121 @@ def customize_repr(f):
 
 
 def code_repr(obj):
-    with mock_repr(adapter_context_for_parent_frame()):
-        return repr(obj)
+    with code_repr_context(adapter_context_for_parent_frame()):
+        return nested_code_repr(obj)
+
+
+# the context of the code generation in the current thread or task
+_current_context: ContextVar[AdapterContext | None] = ContextVar(
+    "inline_snapshot_code_repr_context", default=None
+)
 
 
 @contextmanager
-def mock_repr(context: AdapterContext):
+def code_repr_context(context: AdapterContext):
+    """Values are converted into code for the given context inside this
+    block."""
     assert context is not None
 
-    def new_repr(obj):
-        from inline_snapshot._customize._builder import Builder
+    token = _current_context.set(context)
+    try:
+        yield
+    finally:
+        _current_context.reset(token)
+
+
+def nested_code_repr(obj) -> str:
+    """The code of a value which is part of a value which is converted with
+    `repr()`."""
+    from inline_snapshot._customize._builder import Builder
+
+    context = _current_context.get()
+    assert context is not None, "code_repr_context() is missing"
+
+    return only_value(
+        Builder(_snapshot_context=context)._get_handler(obj)._code_repr(context)
+    )
+
+
+def _compat_repr(obj):
+    # replaces builtins.repr while a __repr__() or @customize_repr function is called
+    if _current_context.get() is None:
+        # other threads or code outside of the code generation
+        return real_repr(obj)
+    return nested_code_repr(obj)
+
+
+_patch_lock = threading.Lock()
+_patch_users = 0
+
+
+@contextmanager
+def _patched_repr():
+    """Replaces `builtins.repr` with the code representation, because
+    `__repr__()` and `@customize_repr` implementations use `repr()` for their
+    children.
 
-        return only_value(
-            Builder(_snapshot_context=context)._get_handler(obj)._code_repr(context)
-        )
+    It is only used for `@customize_repr` implementations and for
+    `__repr__()` methods which call `repr()`.
+    """
+    global _patch_users
 
-    with mock.patch("builtins.repr", new_repr):
+    with _patch_lock:
+        if _patch_users == 0:
+            builtins.repr = _compat_repr
+        _patch_users += 1
+    try:
         yield
+    finally:
+        with _patch_lock:
+            _patch_users -= 1
+            if _patch_users == 0:
+                builtins.repr = real_repr
+
+
+def _with_patched_repr(function):
+    def w(obj):
+        with _patched_repr():
+            return function(obj)
+
+    return w
+
+
+def _calls_repr(function) -> bool:
+    """Checks if a Python `__repr__()` uses `repr()` for its children (see
+    "customize recursive repr" in the documentation)."""
+    code = getattr(inspect.unwrap(function), "__code__", None)
+    return code is not None and "repr" in code.co_names
+
+
+def _code_repr_function(value_type: type) -> Callable[[Any], str]:
+    from inline_snapshot._global_state import state
+
+    key = (value_type, len(code_repr_dispatch.registry))
+    cache = state().code_repr_cache
+
+    if key not in cache:
+        function = code_repr_dispatch.dispatch(value_type)
+        if function is code_repr_dispatch.dispatch(object):
+            # the default implementation
+            if _calls_repr(value_type.__repr__):
+                function = _with_patched_repr(real_repr)
+            else:
+                function = real_repr
+        else:
+            # @customize_repr
+            function = _with_patched_repr(function)
+        cache[key] = function
+
+    return cache[key]
 
 
 def value_code_repr(obj):
-    assert repr is not real_repr, "@mock_repr is missing"
+    assert _current_context.get() is not None, "code_repr_context() is missing"
 
     if not type(obj) == type(obj):  # pragma: no cover
         # this was caused by https://github.com/samuelcolvin/dirty-equals/issues/104
         # dispatch will not work in cases like this
-        return f"HasRepr({repr(type(obj))}, '< type(obj) cannot be compared with == >')"
-
-    result = code_repr_dispatch(obj)
+        return f"HasRepr({nested_code_repr(type(obj))}, '< type(obj) cannot be compared with == >')"
 
-    return result
+    return _code_repr_function(type(obj))(obj)
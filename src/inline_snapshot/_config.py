@@ -1,3 +1,4 @@
+import hashlib
 import sys
 from dataclasses import dataclass
 from dataclasses import field
@@ -17,14 +18,19 @@ else:
 @dataclass
 class Config:
     hash_length: int = 12
+    hash_algorithm: str = "sha256"
     default_flags: List[str] = field(default_factory=lambda: ["short-report"])
     default_flags_tui: List[str] = field(default_factory=lambda: ["short-report"])
     shortcuts: Dict[str, List[str]] = field(default_factory=dict)
     format_command: str = ""
+    format_server: str = ""
     storage_dir: Optional[Path] = None
     show_updates: bool = False
     test_directories: Optional[List[Path]] = None
     default_storage: str = "uuid"
+    json_backend: str = "json"
+    compression: str = ""
+    compression_threshold: int = 64 * 1024
 
 
 def read_config(path: Path, config=Config()) -> Config:
@@ -43,6 +49,18 @@ def read_config(path: Path, config=Config()) -> Config:
     except KeyError:
         pass
 
+    config.hash_algorithm = tool_config.get("hash-algorithm", "sha256")
+
+    try:
+        digest_size = hashlib.new(config.hash_algorithm).digest_size
+    except ValueError:
+        digest_size = 0
+
+    if digest_size == 0:
+        raise UsageError(
+            f'hash-algorithm "{config.hash_algorithm}" is not supported, use one with a fixed digest size like "sha256" or "blake2b"'
+        )
+
     try:
         config.default_flags = tool_config["default-flags"]
     except KeyError:
@@ -94,11 +112,36 @@ def read_config(path: Path, config=Config()) -> Config:
 
     config.default_storage = tool_config.get("default-storage", "uuid")
 
-    if config.default_storage not in ("uuid", "hash"):
+    if config.default_storage not in ("uuid", "hash", "pack"):
+        raise UsageError(
+            f'default-storage has to be uuid, hash or pack but is "{config.default_storage}"'
+        )
+
+    config.json_backend = tool_config.get("json-backend", "json")
+
+    if config.json_backend not in ("json", "orjson"):
+        raise UsageError(
+            f'json-backend has to be json or orjson but is "{config.json_backend}"'
+        )
+
+    config.compression = tool_config.get("compression", "")
+
+    if config.compression not in ("", "gzip", "lzma", "bz2"):
+        raise UsageError(
+            f'compression has to be gzip, lzma or bz2 but is "{config.compression}"'
+        )
+
+    config.compression_threshold = tool_config.get("compression-threshold", 64 * 1024)
+
+    if (
+        not isinstance(config.compression_threshold, int)
+        or config.compression_threshold < 0
+    ):
         raise UsageError(
-            f'default-storage has to be uuid or hash but is "{config.default_storage}"'
+            f'compression-threshold has to be a number of bytes but is "{config.compression_threshold}"'
         )
 
     config.format_command = tool_config.get("format-command", "")
+    config.format_server = tool_config.get("format-server", "")
 
     return config
@@ -48,7 +48,8 @@ class Builder:
 
         while not isinstance(result, Custom):
             with compare_context():
-                r = state().pm.hook.customize(
+                r = state().customize_dispatch.customize(
+                    state().pm,
                     value=result,
                     builder=self,
                     local_vars=self._local_vars,
@@ -6,6 +6,7 @@ from abc import abstractmethod
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Generator
+from typing import Iterable
 
 from inline_snapshot._adapter_context import AdapterContext
 from inline_snapshot._change import ChangeBase
@@ -14,6 +15,28 @@ if TYPE_CHECKING:
     pass
 
 
+def _identity(value):
+    return value
+
+
+_immutable_types = (int, float, complex, str, bytes, bool, type(None))
+
+
+def _is_immutable(value) -> bool:
+    if type(value) in _immutable_types:
+        return True
+    if type(value) in (tuple, frozenset):
+        return all(_is_immutable(item) for item in value)
+    return False
+
+
+def map_child(child: Custom, f):
+    """Maps a child node, which uses the cached `_eval()` when possible."""
+    if f is _identity:
+        return child._eval()
+    return child._map(f)
+
+
 class Custom(ABC):
     """
     Custom objects are returned by the `create_*` functions of the builder.
@@ -23,13 +46,46 @@ class Custom(ABC):
     node_type: type[ast.AST] = ast.AST
     original_value: Any
 
+    # the nodes do not change after they are built, which allows to cache
+    # the hash and the result of _eval() if it can not be changed by the
+    # caller
+
     def __hash__(self):
-        return hash(self._eval())
+        if "_cached_hash" in self.__dict__:
+            return self.__dict__["_cached_hash"]
+
+        result = hash(self._eval())
+        if self._is_static():
+            self.__dict__["_cached_hash"] = result
+        return result
 
     def __eq__(self, other):
         assert isinstance(other, Custom)
+        if (
+            "_cached_hash" in self.__dict__
+            and "_cached_hash" in other.__dict__
+            and self.__dict__["_cached_hash"] != other.__dict__["_cached_hash"]
+        ):
+            return False
+
         return self._eval() == other._eval()
 
+    def _children(self) -> Iterable[Custom]:
+        return ()
+
+    def _is_static(self) -> bool:
+        """Returns `False` if the value of this node or of one of its children
+        can change."""
+        static = self.__dict__.get("_cached_static")
+        if static is None:
+            static = True
+            for child in self._children():
+                if not (isinstance(child, Custom) and child._is_static()):
+                    static = False
+                    break
+            self.__dict__["_cached_static"] = static
+        return static
+
     @abstractmethod
     def _map(self, f):
         raise NotImplementedError()
@@ -39,4 +95,12 @@ class Custom(ABC):
         raise NotImplementedError()
 
     def _eval(self):
-        return self._map(lambda a: a)
+        try:
+            return self.__dict__["_cached_eval"]
+        except KeyError:
+            pass
+
+        result = self._map(_identity)
+        if self._is_static() and _is_immutable(result):
+            self.__dict__["_cached_eval"] = result
+        return result
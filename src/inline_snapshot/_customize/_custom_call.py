@@ -9,6 +9,7 @@ from inline_snapshot._adapter_context import AdapterContext
 from inline_snapshot._change import ChangeBase
 
 from ._custom import Custom
+from ._custom import map_child
 
 
 @dataclass(frozen=True, eq=False)
@@ -21,7 +22,10 @@ class CustomDefault(Custom):
         assert False
 
     def _map(self, f):
-        return self.value._map(f)
+        return map_child(self.value, f)
+
+    def _children(self):
+        return [self.value]
 
 
 def unwrap_default(value):
@@ -56,12 +60,17 @@ class CustomCall(Custom):
         else:
             return unwrap_default(self.kwargs[pos_or_str])
 
+    def _children(self):
+        yield self.function
+        yield from self.args
+        yield from self.kwargs.values()
+
     def _map(self, f):
-        args = [f(x._map(f)) for x in self.args]
-        kwargs = {k: f(v._map(f)) for k, v in self.kwargs.items()}
+        args = [f(map_child(x, f)) for x in self.args]
+        kwargs = {k: f(map_child(v, f)) for k, v in self.kwargs.items()}
 
         try:
-            return self.function._map(f)(
+            return map_child(self.function, f)(
                 *args,
                 **kwargs,
             )
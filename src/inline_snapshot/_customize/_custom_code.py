@@ -9,6 +9,8 @@ from inline_snapshot._adapter_context import AdapterContext
 from inline_snapshot._change import ChangeBase
 from inline_snapshot._change import RequiredImport
 from inline_snapshot._code_repr import HasRepr
+from inline_snapshot._code_repr import code_repr_dispatch
+from inline_snapshot._code_repr import real_repr
 from inline_snapshot._code_repr import value_code_repr
 from inline_snapshot._utils import clone
 
@@ -42,24 +44,44 @@ def _simplify_module_path(module: str, name: str) -> str:
     return ".".join(parts)
 
 
+# immutable values where repr() is always valid code
+_scalar_types = frozenset({int, float, str, bytes, bool, type(None)})
+
+
+def _is_plain_scalar(value) -> bool:
+    return (
+        type(value) in _scalar_types
+        # clone() fails for nan
+        and value == value
+        # @customize_repr can change the repr of these types
+        and code_repr_dispatch.dispatch(type(value))
+        is code_repr_dispatch.dispatch(object)
+    )
+
+
 class CustomCode(Custom):
     _imports: list[Import | ImportFrom]
 
     def __init__(self, value, repr_str=None, imports: list[Import | ImportFrom] = []):
         assert not isinstance(value, Custom)
-        value = clone(value)
         self._imports = list(imports)
 
-        if repr_str is None:
-            self.repr_str = value_code_repr(value)
-
-            try:
-                ast.parse(self.repr_str)
-            except SyntaxError:
-                self.repr_str = HasRepr(type(value), self.repr_str).__repr__()
-                self._imports.append(ImportFrom("inline_snapshot", "HasRepr"))
+        if repr_str is None and _is_plain_scalar(value):
+            # there is nothing to copy and repr() is already valid code
+            self.repr_str = real_repr(value)
         else:
-            self.repr_str = repr_str
+            value = clone(value)
+
+            if repr_str is None:
+                self.repr_str = value_code_repr(value)
+
+                try:
+                    ast.parse(self.repr_str)
+                except SyntaxError:
+                    self.repr_str = HasRepr(type(value), self.repr_str).__repr__()
+                    self._imports.append(ImportFrom("inline_snapshot", "HasRepr"))
+            else:
+                self.repr_str = repr_str
 
         self.value = value
 
@@ -9,6 +9,7 @@ from inline_snapshot._adapter_context import AdapterContext
 from inline_snapshot._change import ChangeBase
 
 from ._custom import Custom
+from ._custom import map_child
 
 
 @dataclass(frozen=True, eq=False)
@@ -17,7 +18,11 @@ class CustomDict(Custom):
     value: dict[Custom, Custom] = field(compare=False)
 
     def _map(self, f):
-        return f({k._map(f): v._map(f) for k, v in self.value.items()})
+        return f({map_child(k, f): map_child(v, f) for k, v in self.value.items()})
+
+    def _children(self):
+        yield from self.value.keys()
+        yield from self.value.values()
 
     def _code_repr(self, context: AdapterContext) -> Generator[ChangeBase, None, str]:
         values = []
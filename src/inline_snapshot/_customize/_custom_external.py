@@ -10,6 +10,7 @@ from inline_snapshot._change import ChangeBase
 from inline_snapshot._change import ExternalChange
 from inline_snapshot._change import RequiredImport
 from inline_snapshot._external._external_location import ExternalLocation
+from inline_snapshot._external._format._protocol import encoding_cache
 from inline_snapshot._external._format._protocol import get_format_handler
 
 from ._custom import Custom
@@ -29,21 +30,23 @@ class CustomExternal(Custom):
 
         storage_name = self.storage or state().config.default_storage
 
-        format = get_format_handler(self.value, self.format or "")
+        # the value is checked and encoded in one pass
+        with encoding_cache():
+            format = get_format_handler(self.value, self.format or "")
 
-        location = ExternalLocation(
-            storage=storage_name,
-            stem="",
-            suffix=self.format or format.suffix,
-            filename=Path(context.file.filename),
-            qualname=context.qualname,
-        )
+            location = ExternalLocation(
+                storage=storage_name,
+                stem="",
+                suffix=self.format or format.suffix,
+                filename=Path(context.file.filename),
+                qualname=context.qualname,
+            )
 
-        tmp_file = state().new_tmp_path(location.suffix)
+            tmp_file = state().new_tmp_path(location.suffix)
 
-        storage = state().all_storages[storage_name]
+            storage = state().all_storages[storage_name]
 
-        format.encode(self.value, tmp_file)
+            format.encode(self.value, tmp_file)
         location = storage.new_location(location, tmp_file)
 
         yield ExternalChange(
@@ -9,6 +9,7 @@ from inline_snapshot._adapter_context import AdapterContext
 from inline_snapshot._change import ChangeBase
 
 from ._custom import Custom
+from ._custom import map_child
 
 
 class CustomSequenceTypes:
@@ -22,7 +23,10 @@ class CustomSequence(Custom, CustomSequenceTypes):
     value: list[Custom] = field(compare=False)
 
     def _map(self, f):
-        return f(self.value_type([x._map(f) for x in self.value]))
+        return f(self.value_type([map_child(x, f) for x in self.value]))
+
+    def _children(self):
+        return self.value
 
     def _code_repr(self, context: AdapterContext) -> Generator[ChangeBase, None, str]:
         values = []
@@ -22,3 +22,7 @@ class CustomUnmanaged(Custom):
 
     def _map(self, f):
         return f(self.value)
+
+    def _is_static(self):
+        # the value is updated by reeval()
+        return False
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pluggy
+
+
+def _applies_to(hookimpl: pluggy.HookImpl, value_type: type) -> bool:
+    types = getattr(hookimpl.function, "inline_snapshot_types", None)
+    return types is None or issubclass(value_type, types)
+
+
+class CustomizeDispatch:
+    """Calls the implementations of the `customize` hook like pluggy.
+
+    The handlers which can apply to a type (see `@customize(types=...)` and
+    `@customize(by_type=True)`) are cached for every type and called
+    directly, because calling all handlers through pluggy for every value
+    is slow for large snapshots.
+    The cache is rebuilt when the registered handlers change, and pluggy is
+    used if one of them is a hook wrapper.
+    """
+
+    def __init__(self):
+        self._hookimpls: list[pluggy.HookImpl] | None = None
+        self._use_pluggy = False
+        # type -> handlers in the order in which they are called
+        self._handlers: dict[type, list[pluggy.HookImpl]] = {}
+
+    def _update(self, hookimpls: list[pluggy.HookImpl]):
+        self._hookimpls = hookimpls
+        self._use_pluggy = any(
+            hookimpl.opts.get("hookwrapper") or hookimpl.opts.get("wrapper")
+            for hookimpl in hookimpls
+        )
+        self._handlers = {}
+
+    def customize(self, pm: pluggy.PluginManager, **kwargs: Any) -> Any:
+        hook = pm.hook.customize
+
+        hookimpls = hook.get_hookimpls()
+        if hookimpls != self._hookimpls:
+            self._update(hookimpls)
+
+        if self._use_pluggy:
+            return hook(**kwargs)
+
+        value_type = type(kwargs["value"])
+
+        handlers = self._handlers.get(value_type)
+        if handlers is None:
+            # pluggy calls the last registered handler first
+            handlers = self._handlers[value_type] = [
+                hookimpl
+                for hookimpl in reversed(hookimpls)
+                if _applies_to(hookimpl, value_type)
+            ]
+
+        for hookimpl in handlers:
+            result = hookimpl.function(
+                *[kwargs[argname] for argname in hookimpl.argnames]
+            )
+            if result is not None:
+                return result
+
+            if getattr(hookimpl.function, "inline_snapshot_by_type", False):
+                self._handlers[value_type] = [
+                    h for h in self._handlers[value_type] if h is not hookimpl
+                ]
+
+        return None
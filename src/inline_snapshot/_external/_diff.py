@@ -1,6 +1,16 @@
+from __future__ import annotations
+
+import mmap
+import os
+from contextlib import contextmanager
+from difflib import SequenceMatcher
 from difflib import unified_diff
 from itertools import islice
 from pathlib import Path
+from typing import Iterator
+from typing import List
+from typing import Literal
+from typing import Tuple
 
 from rich.syntax import Syntax
 
@@ -18,7 +28,7 @@ def diff(original_text, new_text):
     return Syntax(diff, "diff", theme="ansi_light", word_wrap=True)
 
 
-def hexdump(bytes, style=False):
+def hexdump(bytes, style=False, offset=0):
     from binascii import hexlify
 
     result = []
@@ -32,10 +42,12 @@ def hexdump(bytes, style=False):
         s = "".join(chr(c) if 32 <= c < 127 else dot for c in line)
         if style:
             result.append(
-                f"[dark_green]{i:08x}[/]: [bright_black]{hexlify(line,' ',-2).decode():<39}[/] |[orange3]{s}{' '*(16-len(line))}[/]|"
+                f"[dark_green]{offset+i:08x}[/]: [bright_black]{hexlify(line,' ',-2).decode():<39}[/] |[orange3]{s}{' '*(16-len(line))}[/]|"
             )
         else:
-            result.append(f"{i:08x}: {hexlify(line,' ',-2).decode():<39} |{s:<16}|")
+            result.append(
+                f"{offset+i:08x}: {hexlify(line,' ',-2).decode():<39} |{s:<16}|"
+            )
 
     return "\n".join(result)
 
@@ -49,18 +61,137 @@ class TextDiff:
         return Syntax.from_path(str(path), theme="ansi_light", word_wrap=True)
 
 
+@contextmanager
+def mapped_file(path: Path) -> Iterator[bytes | mmap.mmap]:
+    """Maps the file into memory, which allows to access large files without
+    reading them completely."""
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+diff_block_size = 64 * 1024
+
+
+def changed_rows(original, new, row_size: int = 16) -> list[tuple[int, int]]:
+    """Returns the ranges of rows which are different in both buffers.
+
+    The buffers are compared in blocks and only the blocks which differ are
+    compared row by row.
+    """
+    result: list[tuple[int, int]] = []
+
+    def add(row):
+        if result and result[-1][1] == row:
+            result[-1] = (result[-1][0], row + 1)
+        else:
+            result.append((row, row + 1))
+
+    common = min(len(original), len(new))
+    for block in range(0, common, diff_block_size):
+        end = min(block + diff_block_size, common)
+        if original[block:end] == new[block:end]:
+            continue
+        for start in range(block, end, row_size):
+            if original[start : start + row_size] != new[start : start + row_size]:
+                add(start // row_size)
+
+    original_rows = -(-len(original) // row_size)
+    new_rows = -(-len(new) // row_size)
+    if original_rows != new_rows or len(original) != len(new):
+        first = common // row_size
+        if result and result[-1][1] > first:
+            first = result[-1][1]
+        for row in range(first, max(original_rows, new_rows)):
+            add(row)
+
+    return result
+
+
+def _format_range(start, length):
+    # same format as difflib.unified_diff()
+    beginning = start + 1
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+Opcode = Tuple[Literal["replace", "delete", "insert", "equal"], int, int, int, int]
+
+
+class _KnownOpcodes(SequenceMatcher):
+    """Groups opcodes which are already known like `SequenceMatcher`."""
+
+    def __init__(self, opcodes: List[Opcode]):
+        super().__init__()
+        self._known_opcodes = opcodes
+
+    def get_opcodes(self) -> List[Opcode]:
+        return list(self._known_opcodes)
+
+
+def binary_diff(original, new, context: int = 3) -> str:
+    """Creates the same diff like `diff(hexdump(original), hexdump(new))`, but
+    only the changed rows (and their context) are converted into a hexdump."""
+
+    original_rows = -(-len(original) // 16)
+    new_rows = -(-len(new) // 16)
+
+    def row(data, i):
+        return hexdump(data[i * 16 : i * 16 + 16], offset=i * 16)
+
+    opcodes: list[Opcode] = []
+    last = 0
+    for start, end in changed_rows(original, new):
+        if start > last:
+            opcodes.append(("equal", last, start, last, start))
+        opcodes.append(
+            (
+                "replace",
+                start,
+                min(end, original_rows),
+                start,
+                min(end, new_rows),
+            )
+        )
+        last = end
+    if last < min(original_rows, new_rows):
+        opcodes.append(("equal", last, original_rows, last, new_rows))
+
+    lines = []
+    for group in _KnownOpcodes(opcodes).get_grouped_opcodes(context):
+        first, last_op = group[0], group[-1]
+        lines.append(
+            f"@@ -{_format_range(first[1], last_op[2] - first[1])}"
+            f" +{_format_range(first[3], last_op[4] - first[3])} @@\n"
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines += [" " + row(original, i) for i in range(i1, i2)]
+                continue
+            lines += ["-" + row(original, i) for i in range(i1, i2)]
+            lines += ["+" + row(new, j) for j in range(j1, j2)]
+
+    return "\n".join(lines).strip()
+
+
 class BinaryDiff:
     def rich_diff(self, original: Path, new: Path):
 
-        original_bytes = original.read_bytes()
-        new_bytes = new.read_bytes()
+        with mapped_file(original) as original_bytes, mapped_file(new) as new_bytes:
+            diff = binary_diff(original_bytes, new_bytes)
 
-        return diff(hexdump(original_bytes), hexdump(new_bytes))
+        return Syntax(diff, "diff", theme="ansi_light", word_wrap=True)
 
     def rich_show(self, path: Path):
-        content = path.read_bytes()
+        size = path.stat().st_size
 
-        if len(content) > 20 * 16:
-            return f"<binary file ({len(content)} bytes)>"
+        if size > 20 * 16:
+            return f"<binary file ({size} bytes)>"
         else:
-            return hexdump(content, style=True)
+            return hexdump(path.read_bytes(), style=True)
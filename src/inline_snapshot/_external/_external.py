@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ast
+from contextlib import contextmanager
 from pathlib import Path
 from types import FrameType
 
@@ -19,6 +20,7 @@ from inline_snapshot._unmanaged import declare_unmanaged
 from inline_snapshot._utils import is_relative_to
 
 from ._external_location import ExternalLocation
+from ._value_cache import decoded_values
 
 
 def external(name: str | None = None):
@@ -156,6 +158,19 @@ class External(ExternalBase, SnapshotRefBase):
 
         assert False, f"which has to be new or old but is {which!r}"
 
+    def _old_format(self):
+        return get_format_handler_from_suffix(self._original_location.suffix or "")
+
+    @contextmanager
+    def _old_file(self):
+        location = self._original_location
+        if not location.exists():
+            raise StorageLookupError("no old value", files=[])
+
+        assert location.storage
+        with state().all_storages[location.storage].load(location) as f:
+            yield f
+
     @classmethod
     def _load_value_from_location(cls, location: ExternalLocation) -> object:
         assert location.storage
@@ -170,4 +185,4 @@ class External(ExternalBase, SnapshotRefBase):
             assert location.suffix
             format = get_format_handler_from_suffix(location.suffix)
 
-            return format.decode(f)
+            return decoded_values().decode(format, f)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import ContextManager
 
 from inline_snapshot._change import ExternalChange
 from inline_snapshot._exceptions import UsageError
+from inline_snapshot._external._diff import diff_block_size
+from inline_snapshot._external._diff import mapped_file
+from inline_snapshot._external._format._protocol import Format
+from inline_snapshot._external._format._protocol import encoding_cache
 from inline_snapshot._external._format._protocol import get_format_handler
 from inline_snapshot._external._outsource import Outsourced
 from inline_snapshot._external._storage._protocol import StorageLookupError
@@ -40,9 +45,51 @@ class ExternalBase:
     def _load_value(self, which):
         raise NotImplementedError()
 
+    def _old_format(self) -> Format:
+        raise NotImplementedError()
+
+    def _old_file(self) -> ContextManager[Path]:
+        raise NotImplementedError()
+
+    def _has_canonical_bytes(self, other) -> bool:
+        """Checks if the stored file contains the bytes which the format
+        would write for `other`, without decoding the file."""
+        try:
+            format = self._old_format()
+        except UsageError:
+            return False
+
+        canonical_bytes = getattr(format, "canonical_bytes", None)
+        if canonical_bytes is None:
+            return False
+
+        try:
+            data = canonical_bytes(other)
+        except Exception:
+            return False
+        if data is None:
+            return False
+
+        try:
+            with self._old_file() as path, mapped_file(path) as content:
+                if len(content) != len(data):
+                    return False
+                return all(
+                    content[i : i + diff_block_size] == data[i : i + diff_block_size]
+                    for i in range(0, len(data), diff_block_size)
+                )
+        except (StorageLookupError, FileNotFoundError):
+            return False
+
     def __eq__(self, other):
         """Two external objects are equal if they have the same value"""
+        __tracebackhide__ = True
+
+        # `other` is checked, compared and encoded by the format only once
+        with encoding_cache():
+            return self._compare(other)
 
+    def _compare(self, other):
         external_type = (
             "external" if type(self).__name__ == "External" else "external_file"
         )
@@ -76,6 +123,9 @@ class ExternalBase:
                 return True
             return False
 
+        if self._has_canonical_bytes(other):
+            return True
+
         try:
             value = self._load_value("old")
         except StorageLookupError as error:
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional
 from typing import Union
@@ -11,6 +12,7 @@ from inline_snapshot._global_state import state
 from inline_snapshot._types import SnapshotRefBase
 
 from ._external_base import ExternalBase
+from ._value_cache import decoded_values
 
 
 class ExternalFile(ExternalBase, SnapshotRefBase):
@@ -41,6 +43,13 @@ class ExternalFile(ExternalBase, SnapshotRefBase):
             path = filename
         return f"external_file({str(path)!r})"
 
+    def _old_format(self):
+        return self._format
+
+    @contextmanager
+    def _old_file(self):
+        yield self._filename
+
     def _load_value(self, which):
         if which == "new":
             if self._tmp_file:
@@ -50,7 +59,7 @@ class ExternalFile(ExternalBase, SnapshotRefBase):
                 raise StorageLookupError("no new value", files=[])
         if which == "old":
             try:
-                return self._format.decode(self._filename)
+                return decoded_values().decode(self._format, self._filename)
             except FileNotFoundError:
                 raise StorageLookupError("old value not found", files=[])
 
@@ -63,8 +63,8 @@ class ExternalLocation(Location):
                 path = name
             elif ":" in name:
                 storage, path = name.split(":", 1)
-                if storage not in ("hash", "uuid"):
-                    raise ValueError(f"storage has to be hash or uuid")
+                if storage not in ("hash", "uuid", "pack"):
+                    raise ValueError(f"storage has to be hash, uuid or pack")
             else:
                 storage = state().config.default_storage
                 path = name
@@ -151,7 +151,9 @@ class FileLocation(Location):
         yield self._filename
 
     def store(self, new_file: Path):
-        self._filename.parent.mkdir(exist_ok=True, parents=True)
+        from inline_snapshot._parallel import ensure_directory
+
+        ensure_directory(self._filename.parent)
         shutil.copy(new_file, self._filename)
 
     def exists(self):
@@ -13,6 +13,7 @@ class BinaryFormat(BinaryDiff, Format[bytes]):
     "Stores bytes in `.bin` files and shows them as a hexdump."
 
     suffix = ".bin"
+    decided_by_type = True
 
     def is_format_for(self, value: object):
         return isinstance(value, bytes)
@@ -20,5 +21,11 @@ class BinaryFormat(BinaryDiff, Format[bytes]):
     def encode(self, value: bytes, path: Path):
         path.write_bytes(value)
 
+    def canonical_bytes(self, value: bytes) -> bytes | None:
+        # subclasses can change the comparison with the decoded value
+        if type(value) is not bytes:
+            return None
+        return value
+
     def decode(self, path: Path) -> bytes:
         return path.read_bytes()
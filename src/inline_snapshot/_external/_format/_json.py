@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import json
+import math
+import re
+from json.encoder import encode_basestring
 from pathlib import Path
 
+from rich.markup import escape
+
 from inline_snapshot._external._diff import TextDiff
+from inline_snapshot._problems import raise_problem
 
 from ._protocol import Format
+from ._protocol import cached_encoding
 from ._protocol import register_format
 
 
@@ -21,6 +28,212 @@ def is_json(obj):
     return False
 
 
+class NotJson(Exception):
+    pass
+
+
+def encode_json(value: object) -> str:
+    """Encodes the value like `json.dumps(value, indent=2, ensure_ascii=False)`.
+
+    `NotJson` is raised if the value is not json (see `is_json()`).
+    The check and the encoding are done in the same pass, which is as fast
+    as `json.dumps()` alone because the json module uses a python
+    implementation if `indent` is used.
+    """
+    chunks: list[str] = []
+    append = chunks.append
+
+    def encode(value, indent):
+        if isinstance(value, str):
+            append(encode_basestring(value))
+        elif value is None:
+            append("null")
+        elif value is True:
+            append("true")
+        elif value is False:
+            append("false")
+        elif isinstance(value, int):
+            append(int.__repr__(value))
+        elif isinstance(value, float):
+            append(float_repr(value))
+        elif isinstance(value, list):
+            if not value:
+                append("[]")
+                return
+            newline = "\n" + "  " * (indent + 1)
+            append("[")
+            first = True
+            for item in value:
+                append(newline if first else "," + newline)
+                first = False
+                encode(item, indent + 1)
+            append("\n" + "  " * indent + "]")
+        elif isinstance(value, dict):
+            if not value:
+                append("{}")
+                return
+            newline = "\n" + "  " * (indent + 1)
+            append("{")
+            first = True
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise NotJson()
+                append(newline if first else "," + newline)
+                first = False
+                append(encode_basestring(key))
+                append(": ")
+                encode(item, indent + 1)
+            append("\n" + "  " * indent + "}")
+        else:
+            raise NotJson()
+
+    encode(value, 0)
+    return "".join(chunks)
+
+
+def float_repr(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == -float("inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def json_text(value: object) -> str | None:
+    try:
+        return encode_json(value)
+    except NotJson:
+        return None
+
+
+def orjson_backend():
+    """Returns the orjson module if it is configured as `json-backend`."""
+    from inline_snapshot._global_state import state
+
+    if state().config.json_backend != "orjson":
+        return None
+
+    try:
+        import orjson
+    except ImportError:
+        raise_problem(f"""\
+[b]json-backend is "orjson" but orjson is not installed.[/b]
+You can install {escape('inline-snapshot[orjson]')} to use it.
+The json module is used instead.""")
+        return None
+
+    return orjson
+
+
+# orjson formats the exponent (1e16) and small numbers (0.00001) in another
+# way than python (1e+16, 1e-05).
+_orjson_float = re.compile(rb"-?(?:\d+(?:\.\d+)?e-?\d+|0\.0000\d+)")
+_orjson_float_parts = [b"0.0000", b"e-", *(b"e%d" % digit for digit in range(1, 10))]
+
+
+def _python_floats(data: bytes) -> bytes:
+    """Formats the floats in the output of orjson like python.
+
+    The floats are searched with `bytes.find()`, which is much faster than
+    a regular expression for large files.
+    Numbers are the only tokens which end a line after a space (or fill
+    the whole file), because newlines in strings are escaped.
+    """
+    replacements: dict[int, tuple[int, bytes]] = {}
+
+    for part in _orjson_float_parts:
+        position = data.find(part)
+        while position != -1:
+            start = data.rfind(b" ", 0, position) + 1
+            end = data.find(b"\n", position)
+            if end == -1:
+                end = len(data)
+            if data[end - 1 : end] == b",":
+                end -= 1
+
+            if _orjson_float.fullmatch(data, start, end):
+                replacements[start] = (
+                    end,
+                    float.__repr__(float(data[start:end])).encode(),
+                )
+
+            position = data.find(part, position + 1)
+
+    if not replacements:
+        return data
+
+    chunks = []
+    last = 0
+    for start, (end, replacement) in sorted(replacements.items()):
+        chunks += [data[last:start], replacement]
+        last = end
+    chunks.append(data[last:])
+    return b"".join(chunks)
+
+
+# the exact types of the values which orjson encodes like the json module
+_orjson_types = (str, bool, type(None), int, float, list, dict)
+
+
+def orjson_supports(value: object) -> bool:
+    """Checks that orjson encodes the value like `encode_json()`.
+
+    orjson also encodes tuples, enums, uuids, dataclasses ... and writes
+    NaN as null. These values are rejected before they are encoded.
+    Subclasses are rejected too, because the python encoder uses the
+    methods of the base class.
+    """
+    if type(value) not in _orjson_types:
+        return False
+    if value is None or isinstance(value, (str, bool)):
+        return True
+    if isinstance(value, int):
+        # orjson encodes only 64 bit integers
+        return -(2**63) <= value < 2**64
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, list):
+        return all(orjson_supports(item) for item in value)
+    assert isinstance(value, dict)
+    return all(
+        type(key) is str and orjson_supports(item) for key, item in value.items()
+    )
+
+
+def orjson_bytes(orjson, value: object) -> bytes | None:
+    """Encodes the value with orjson like `encode_json()` or returns `None`
+    if it can not be encoded in the same way."""
+    if not orjson_supports(value):
+        return None
+
+    try:
+        data = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        # lone surrogates and too deeply nested values
+        return None
+
+    return _python_floats(data)
+
+
+def json_bytes(value: object) -> bytes | None:
+    """The utf-8 encoded result of `encode_json()` or `None` if the value is
+    not json."""
+    if (orjson := orjson_backend()) is not None:
+        if (data := orjson_bytes(orjson, value)) is not None:
+            return data
+
+    text = json_text(value)
+    if text is None:
+        return None
+    return text.encode("utf-8")
+
+
+# orjson decodes integers which do not fit into 64 bit as float
+_long_number = re.compile(rb"\d{19}")
+
+
 @register_format
 class JsonFormat(TextDiff, Format[object]):
     "Stores the data with `json.dump()`."
@@ -29,14 +242,37 @@ class JsonFormat(TextDiff, Format[object]):
     priority = -10
 
     def is_format_for(self, value: object):
-        return is_json(value)
+        return cached_encoding(self, value, json_bytes) is not None
 
     def encode(self, value: object, path: Path):
+        data = cached_encoding(self, value, json_bytes)
+        if data is not None:
+            path.write_bytes(data)
+            return
 
+        # values like tuples can be stored if the suffix is given
         with path.open("w", newline="\n", encoding="utf-8") as f:
             json.dump(value, f, indent=2, ensure_ascii=False)
 
+    def canonical_bytes(self, value: object) -> bytes | None:
+        # tuples and other types which json.dumps() accepts are not equal
+        # to the decoded value
+        data = cached_encoding(self, value, json_bytes)
+
+        # NaN is not equal to itself and never equal to the decoded value.
+        # Strings which contain "NaN" are compared in the normal way too.
+        if data is None or b"NaN" in data:
+            return None
+        return data
+
     def decode(self, path: Path) -> object:
+        data = path.read_bytes()
+
+        if (orjson := orjson_backend()) is not None and not _long_number.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # NaN, Infinity, lone surrogates ... are handled by json
+                pass
 
-        with path.open("r", newline="\n", encoding="utf-8") as f:
-            return json.load(f)
+        return json.loads(data.decode("utf-8"))
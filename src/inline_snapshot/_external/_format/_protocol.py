@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from functools import partial
 from pathlib import Path
+from typing import Any
+from typing import Callable
 from typing import Protocol
 from typing import TypeVar
 
@@ -9,6 +12,9 @@ from rich.console import RenderableType
 
 from inline_snapshot._exceptions import UsageError
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 def get_format_handler(data, suffix: str) -> Format:
     """
@@ -30,25 +36,35 @@ def get_format_handler(data, suffix: str) -> Format:
     if suffix:
         suffix = state().format_aliases.get(suffix, suffix)
 
-    possible_formatter = sorted(
-        [
+    key = (type(data), suffix)
+    dispatch_cache = state().format_dispatch_cache
+    if key not in dispatch_cache:
+        # formats which are decided by the type are checked only once
+        dispatch_cache[key] = [
             formatter
-            for formatter in state().all_formats.values()
-            if formatter.is_format_for(data)
-            and (not suffix or suffix == formatter.suffix)
-        ],
-        key=lambda format: format.priority,
-    )
+            for formatter in sorted(
+                state().all_formats.values(),
+                key=lambda format: format.priority,
+                reverse=True,
+            )
+            if (not suffix or suffix == formatter.suffix)
+            and (not _decided_by_type(formatter) or formatter.is_format_for(data))
+        ]
+
+    possible_formatter: list[Format] = []
+    for formatter in dispatch_cache[key]:
+        if possible_formatter and formatter.priority < possible_formatter[0].priority:
+            # formats with a lower priority are not used
+            break
+        if _decided_by_type(formatter) or formatter.is_format_for(data):
+            possible_formatter.append(formatter)
 
     if not possible_formatter:
         and_suffix = f" and suffix '{suffix}'" if suffix else ""
         raise UsageError(
             f"No format handler found for the given type '{type(data).__qualname__}'{and_suffix}."
         )
-    if (
-        len(possible_formatter) >= 2
-        and possible_formatter[-1].priority == possible_formatter[-2].priority
-    ):
+    if len(possible_formatter) >= 2:
         and_suffix = f" and suffix '{suffix}'" if suffix else ""
         raise UsageError(
             f"Multiple format handlers found for the given type '{type(data).__qualname__}'. "
@@ -56,7 +72,47 @@ def get_format_handler(data, suffix: str) -> Format:
             f"You can explicitly choose one with external('.suffix') or adjust the priorities of the handlers if you implemented them."
         )
 
-    return possible_formatter[-1]
+    return possible_formatter[0]
+
+
+def _decided_by_type(format: Format) -> bool:
+    return getattr(format, "decided_by_type", False)
+
+
+_encoding_cache: dict[tuple[int, int], tuple[object, Any]] | None = None
+
+
+@contextmanager
+def encoding_cache():
+    """Allows formats to reuse the work for a value in `is_format_for()`,
+    `canonical_bytes()` and `encode()` (see `cached_encoding()`).
+
+    The values must not be changed inside this context.
+    """
+    global _encoding_cache
+    if _encoding_cache is not None:
+        yield
+        return
+
+    _encoding_cache = {}
+    try:
+        yield
+    finally:
+        _encoding_cache = None
+
+
+def cached_encoding(format: object, value: T, encode: Callable[[T], R]) -> R:
+    """Returns `encode(value)`, which is computed once for every value inside
+    of `encoding_cache()`."""
+    if _encoding_cache is None:
+        return encode(value)
+
+    key = (id(format), id(value))
+    entry = _encoding_cache.get(key)
+    if entry is None or entry[0] is not value:
+        entry = (value, encode(value))
+        _encoding_cache[key] = entry
+    return entry[1]
 
 
 def get_format_handler_from_suffix(suffix: str) -> Format:
@@ -84,9 +140,6 @@ def get_format_handler_from_suffix(suffix: str) -> Format:
     return format
 
 
-T = TypeVar("T")
-
-
 class Format(Protocol[T]):
     """
     Base class for the Format Protocol.
@@ -116,6 +169,13 @@ class Format(Protocol[T]):
     with a `b"\\x89PNG"` prefix that should be stored as *.png* files.
     """
 
+    decided_by_type: bool = False
+    """
+    `True` if `is_format_for()` depends only on the type of the value.
+    The result is cached for every type in this case, which is useful for
+    formats like *.txt* or *.bin* which check `isinstance(value, str)`.
+    """
+
     def rich_diff(self, original: Path, new: Path) -> RenderableType:
         """
         Displays a diff between the original and new files.
@@ -184,6 +244,27 @@ class Format(Protocol[T]):
         """
         raise NotImplementedError
 
+    def canonical_bytes(self, value: T) -> bytes | None:
+        """
+        Returns the bytes which `encode()` would write for the given value.
+
+        This method is optional and can be implemented by formats which
+        always encode equal values to the same bytes. inline-snapshot
+        compares these bytes with the stored file and decodes the file only
+        if they differ.
+        The value has to be equal to the decoded bytes. `None` has to be
+        returned for values where this is not guaranteed, like `float("nan")`
+        which is not equal to itself or subclasses which change `__eq__`.
+
+        Arguments:
+            value: The value which is compared with the external object.
+
+        Returns:
+            The encoded value or `None` if the value can not be compared
+            this way.
+        """
+        return None
+
 
 FormatT = TypeVar("FormatT")
 
@@ -229,6 +310,7 @@ def register_format(
         )
 
     state().all_formats[instance.suffix] = instance
+    state().format_dispatch_cache.clear()
     return format
 
 
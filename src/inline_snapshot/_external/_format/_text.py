@@ -13,6 +13,7 @@ class TextFormat(TextDiff, Format[str]):
     "Stores strings in `.txt` files."
 
     suffix = ".txt"
+    decided_by_type = True
 
     def is_format_for(self, value: object):
         return isinstance(value, str)
@@ -21,6 +22,12 @@ class TextFormat(TextDiff, Format[str]):
         with path.open("w", encoding="utf-8", newline="\n") as f:
             f.write(value)
 
+    def canonical_bytes(self, value: str) -> bytes | None:
+        # subclasses can change the comparison with the decoded value
+        if type(value) is not str:
+            return None
+        return value.encode("utf-8")
+
     def decode(self, path: Path) -> str:
         with path.open("r", encoding="utf-8", newline="\n") as f:
             return f.read()
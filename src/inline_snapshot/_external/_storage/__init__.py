@@ -1,12 +1,17 @@
 from pathlib import Path
 
 from ._hash import HashStorage
+from ._pack import PackStorage
 from ._protocol import StorageLookupError
 from ._protocol import StorageProtocol
 from ._uuid import UuidStorage
 
-__all__ = ("StorageLookupError", "StorageProtocol", "HashStorage")
+__all__ = ("StorageLookupError", "StorageProtocol", "HashStorage", "PackStorage")
 
 
 def default_storages(storage_dir: Path):
-    return {"hash": HashStorage(storage_dir / "external"), "uuid": UuidStorage()}
+    return {
+        "hash": HashStorage(storage_dir / "external"),
+        "uuid": UuidStorage(storage_dir / "cache" / "uuid"),
+        "pack": PackStorage(storage_dir / "pack"),
+    }
@@ -0,0 +1,151 @@
+"""Transparent compression of the files in the storages.
+
+Compressed externals are stored with an additional suffix
+(`<name>.json.gz`) and are found with the name of the uncompressed file.
+They are decompressed when they are loaded, which allows the formats and
+diffs to work with the original content.
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import shutil
+import threading
+from pathlib import Path
+from typing import BinaryIO
+from typing import Literal
+
+from inline_snapshot._global_state import state_cached
+
+# config value -> file suffix
+compression_suffixes = {"gzip": ".gz", "lzma": ".xz", "bz2": ".bz2"}
+
+
+def compression_suffix_of(name: str, suffix: str) -> str:
+    """Returns the compression suffix of the file with the given name or ""
+    if the file is not compressed.
+
+    Arguments:
+        name: the name of the file in the storage
+        suffix: the suffix of the format
+    """
+    for compression_suffix in compression_suffixes.values():
+        if name.endswith(suffix + compression_suffix):
+            return compression_suffix
+    return ""
+
+
+def has_suffix(name: str, suffix: str) -> bool:
+    """Returns `True` if the file stores a value with the given suffix."""
+    return name.endswith(suffix) or compression_suffix_of(name, suffix) != ""
+
+
+def split_compression(name: str) -> tuple[str, str]:
+    """Splits the name of a stored file into the name of the uncompressed
+    file and the compression suffix.
+
+    The suffix is only removed if the rest has the suffix of a format,
+    because formats can also use suffixes like `.gz`.
+    """
+    from inline_snapshot._global_state import state
+
+    for compression_suffix in compression_suffixes.values():
+        if name.endswith(compression_suffix):
+            uncompressed_name = name[: -len(compression_suffix)]
+            _, dot, suffix = uncompressed_name.partition(".")
+            if (
+                dot + suffix in state().all_formats
+                or dot + suffix in state().format_aliases
+            ):
+                return uncompressed_name, compression_suffix
+
+    return name, ""
+
+
+def stored_names(name: str) -> list[str]:
+    """All names which can be used to store the file with the given name."""
+    return [name] + [name + suffix for suffix in compression_suffixes.values()]
+
+
+def new_compression_suffix(file_path: Path) -> str:
+    """The compression suffix for a new file, which depends on the
+    `compression` and `compression-threshold` configuration."""
+    from inline_snapshot._global_state import state
+
+    config = state().config
+    if not config.compression:
+        return ""
+
+    if file_path.stat().st_size < config.compression_threshold:
+        return ""
+
+    return compression_suffixes[config.compression]
+
+
+def _open(
+    file: BinaryIO, compression_suffix: str, mode: Literal["rb", "wb"]
+) -> io.BufferedIOBase:
+    """Opens a compressed stream, which reads or writes the file."""
+    if compression_suffix == ".gz":
+        # without filename and mtime the same content creates the same file
+        return gzip.GzipFile(filename="", mode=mode, fileobj=file, mtime=0)
+    if compression_suffix == ".xz":
+        return lzma.LZMAFile(file, mode)
+    assert compression_suffix == ".bz2"
+    return bz2.BZ2File(file, mode)
+
+
+def compress(source: Path, target: Path, compression_suffix: str):
+    """Writes the compressed content of `source` into `target`."""
+    with source.open("rb") as input, target.open("wb") as file:
+        with _open(file, compression_suffix, "wb") as output:
+            shutil.copyfileobj(input, output, 2**18)
+
+
+class DecompressedFiles:
+    """The decompressed content of the loaded files.
+
+    Every file is decompressed once per session (as long as it does not
+    change) into a temporary file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: dict[tuple[Path, int, int], Path] = {}
+
+    def get(self, path: Path, compression_suffix: str, suffix: str) -> Path:
+        from inline_snapshot._global_state import state
+
+        stat = path.stat()
+        key = (path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if key not in self._files:
+                target = state().new_tmp_path(suffix)
+                with path.open("rb") as file, target.open("wb") as output:
+                    with _open(file, compression_suffix, "rb") as input:
+                        shutil.copyfileobj(input, output, 2**18)
+                self._files[key] = target
+
+            return self._files[key]
+
+
+@state_cached
+def decompressed_files() -> DecompressedFiles:
+    return DecompressedFiles()
+
+
+def decompressed(path: Path, suffix: str) -> Path:
+    """Returns the path to the decompressed content of the stored file.
+
+    Arguments:
+        path: the path of the file in the storage
+        suffix: the suffix of the format
+    """
+    compression_suffix = compression_suffix_of(path.name, suffix)
+    if not compression_suffix:
+        return path
+    return decompressed_files().get(path, compression_suffix, suffix)
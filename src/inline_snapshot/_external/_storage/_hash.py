@@ -1,65 +1,185 @@
 from __future__ import annotations
 
+import bisect
+import errno
 import hashlib
+import io
+import os
 import shutil
-import typing
+import sys
+import threading
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Generator
+from uuid import uuid4
+
+from inline_snapshot._parallel import ensure_directory
 
 from .._external_location import ExternalLocation
+from ._compression import compress
+from ._compression import decompressed
+from ._compression import has_suffix
+from ._compression import new_compression_suffix
+from ._compression import split_compression
+from ._compression import stored_names
 from ._protocol import StorageLookupError
 from ._protocol import StorageProtocol
 
 
-def file_digest(file: typing.BinaryIO, name: str):
+def file_digest(file: io.BufferedIOBase, name: str):
+    if sys.version_info >= (3, 11):
+        return hashlib.file_digest(file, name)
+
     algo = hashlib.new(name)
-    algo.update(file.read())
+    while chunk := file.read(2**18):
+        algo.update(chunk)
     return algo
 
 
+def copy_file(source: Path, target: Path):
+    """Copies the file to a temporary file which is moved to the target.
+
+    The target is a new file, which is not changed when the source is
+    written later, and it is never seen half written.
+    """
+    tmp_path = target.with_name(f".{target.name}-{uuid4()}.tmp")
+    try:
+        shutil.copy(str(source), str(tmp_path))
+        os.replace(tmp_path, target)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def move_file(source: Path, target: Path):
+    """Moves the file to the target or copies it if the target is on another
+    file system."""
+    try:
+        os.replace(source, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        copy_file(source, target)
+
+
+def is_session_file(path: Path) -> bool:
+    """Checks if the file is a temporary file of the session, which is not
+    used after it is stored."""
+    from inline_snapshot._global_state import state
+
+    tmp_dir = state().tmp_dir
+    return tmp_dir is not None and path.parent == Path(tmp_dir.name)
+
+
 class HashStorage(StorageProtocol):
+    thread_safe = True
+
     def __init__(self, directory):
         self.directory = Path(directory)
+        # sorted names of the files in the directory, created on first use
+        self._index: list[str] | None = None
+        # file -> ((mtime, size, algorithm), hash) of the files which are hashed
+        # by new_location() and stored later
+        self._hashes: dict[Path, tuple[tuple[int, int, str], str]] = {}
+        # store() and delete() can be called from multiple threads
+        self._lock = threading.Lock()
+
+    def _hash(self, file_path: Path) -> str:
+        from inline_snapshot._global_state import state
+
+        algorithm = state().config.hash_algorithm
+        stat = file_path.stat()
+        key = (stat.st_mtime_ns, stat.st_size, algorithm)
+
+        entry = self._hashes.get(file_path)
+        if entry is None or entry[0] != key:
+            with file_path.open("rb") as f:
+                entry = (key, file_digest(f, algorithm).hexdigest())
+            self._hashes[file_path] = entry
+
+        return entry[1]
+
+    def _names(self) -> list[str]:
+        if self._index is None:
+            self._index = sorted(self.list())
+        return self._index
+
+    def _find(self, name: str) -> list[str]:
+        """Returns the names which match `name`, which can contain one `*`
+        between the (partial) hash and the suffix."""
+        # the index is changed by store() and delete() in other threads
+        with self._lock:
+            names = self._names()
+
+            if "*" not in name:
+                i = bisect.bisect_left(names, name)
+                return [name] if i < len(names) and names[i] == name else []
+
+            prefix, suffix = name.split("*", 1)
+            result = []
+            for i in range(bisect.bisect_left(names, prefix), len(names)):
+                candidate = names[i]
+                if not candidate.startswith(prefix):
+                    break
+                if has_suffix(candidate, suffix) and len(candidate) >= len(name) - 1:
+                    result.append(candidate)
+            return result
 
     def _ensure_directory(self):
-        self.directory.mkdir(exist_ok=True, parents=True)
-        gitignore = self.directory / ".gitignore"
-        if not gitignore.exists():
-            gitignore.write_bytes(
-                b"# ignore all snapshots which are not referred in the source\n*-new.*\n"
-            )
+        with self._lock:
+            ensure_directory(self.directory)
+            gitignore = self.directory / ".gitignore"
+            if not gitignore.exists():
+                gitignore.write_bytes(
+                    b"# ignore all snapshots which are not referred in the source\n*-new.*\n"
+                )
 
     @contextmanager
     def load(self, location: ExternalLocation) -> Generator[Path]:
         path = self._lookup_path(location.path)
-        yield path
+        yield decompressed(path, location.suffix)
 
     def store(self, location: ExternalLocation, file_path: Path):
         self._ensure_directory()
 
-        with file_path.open("rb") as f:
-            hash_name = file_digest(f, "sha256").hexdigest()
+        hash_name = self._hash(file_path)
 
         assert location.suffix
 
-        if not (self.directory / (hash_name + location.suffix)).exists():
-            shutil.copy(
-                str(file_path),
-                str(self.directory / (hash_name + location.suffix)),
-            )
+        name = hash_name + location.suffix
+
+        # the file can already be stored with another compression
+        existing = [n for n in stored_names(name) if (self.directory / n).exists()]
+
+        if existing:
+            name = existing[0]
+        elif compression_suffix := new_compression_suffix(file_path):
+            name += compression_suffix
+            compress(file_path, self.directory / name, compression_suffix)
+        elif is_session_file(file_path):
+            move_file(file_path, self.directory / name)
+            self._hashes.pop(file_path, None)
+        else:
+            copy_file(file_path, self.directory / name)
+
+        with self._lock:
+            names = self._names()
+            i = bisect.bisect_left(names, name)
+            if i == len(names) or names[i] != name:
+                names.insert(i, name)
 
     def delete(self, location: ExternalLocation):
         path = self._lookup_path(location.path)
         path.unlink()
+        with self._lock:
+            self._names().remove(path.name)
 
     def new_location(
         self, location: ExternalLocation, file_path: Path
     ) -> ExternalLocation:
         from inline_snapshot._global_state import state
 
-        with file_path.open("rb") as f:
-            hash_name = file_digest(f, "sha256").hexdigest()
+        hash_name = self._hash(file_path)
 
         path = hash_name[: state().config.hash_length]
         if len(path) < len(hash_name):
@@ -70,38 +190,57 @@ class HashStorage(StorageProtocol):
     def find_unused_externals(
         self, used_externals: list[ExternalLocation]
     ) -> list[ExternalLocation]:
-        unused_externals = self.list()
+        # read the directory once again, because it can be changed by someone else
+        self._index = None
+        unused_externals = set(self._names())
         for location in used_externals:
             if location.path:
                 used = self.lookup_all(location.path)
                 unused_externals -= used
 
-        return [ExternalLocation.from_name(name) for name in unused_externals]
+        return [
+            ExternalLocation.from_name("hash:" + split_compression(name)[0])
+            for name in unused_externals
+        ]
 
     def list(self) -> set[str]:
 
         if self.directory.exists():
-            return {item.name for item in self.directory.iterdir()} - {".gitignore"}
+            # .gitignore and the temporary files of copy_file()
+            return {
+                item.name
+                for item in self.directory.iterdir()
+                if not item.name.startswith(".")
+            }
         else:
             return set()
 
     def _lookup_path(self, name) -> Path:
+        return self.directory / self._lookup_name(name)
+
+    def _lookup_name(self, name) -> str:
         if "*" not in name:
             p = Path(name)
             name = p.stem + "*" + p.suffix
-        files = list(self.directory.glob(name))
+
+        files = self._find(name)
+        if not files:
+            # the directory can be changed by someone else
+            self._index = None
+            files = self._find(name)
 
         if len(files) > 1:
             raise StorageLookupError(
-                f"hash collision files={sorted(f.name for f in  files)}", files=files
+                f"hash collision files={sorted(files)}",
+                files=[self.directory / f for f in files],
             )
 
         if not files:
             raise StorageLookupError(
-                f"hash {name!r} is not found in the HashStorage", files=[]
+                f"hash {name!r} is not found in the {type(self).__name__}", files=[]
             )
 
         return files[0]
 
     def lookup_all(self, name: str) -> set[str]:
-        return {file.name for file in self.directory.glob(name)}
+        return set(self._find(name))
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator
+from typing import Iterator
+from typing import List
+
+from .._external_location import ExternalLocation
+from ._compression import compress
+from ._compression import decompressed
+from ._compression import has_suffix
+from ._compression import new_compression_suffix
+from ._compression import split_compression
+from ._compression import stored_names
+from ._hash import HashStorage
+
+
+class PackStorage(HashStorage):
+    """Stores the externals in one append-only pack file.
+
+    The files are named like in the `HashStorage`. `index.sqlite` maps the
+    names to their position in the pack file.
+    `store()` and `delete()` are collected and written in one transaction by
+    `flush()`. The pack is compacted when externals are deleted.
+
+    The connection to the index is opened on first use and closed by
+    `flush()` or `close()`. The collected changes and the connection are
+    guarded by a lock, because `store()` and `delete()` are called from
+    multiple threads.
+    """
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        # name -> file which is added to the pack by flush()
+        self._new: dict[str, Path] = {}
+        # names which are removed from the pack by flush()
+        self._deleted: set[str] = set()
+        # name -> file which contains the extracted content
+        self._extracted: dict[str, Path] = {}
+        self._db: sqlite3.Connection | None = None
+        # guards the collected changes and the connection, which are shared
+        # by the threads of apply_external_changes()
+        self._pack_lock = threading.RLock()
+
+    @property
+    def _index_path(self) -> Path:
+        return self.directory / "index.sqlite"
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        with self._pack_lock:
+            if self._db is None:
+                db = sqlite3.connect(self._index_path, check_same_thread=False)
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS externals"
+                    " (name TEXT PRIMARY KEY, offset INTEGER NOT NULL, size INTEGER NOT NULL)"
+                )
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                self._db = db
+            yield self._db
+
+    def close(self):
+        with self._pack_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @staticmethod
+    def _pack_name(db: sqlite3.Connection) -> str:
+        row = db.execute("SELECT value FROM meta WHERE key = 'pack'").fetchone()
+        return row[0] if row else "externals-0.pack"
+
+    def _find(self, name: str) -> List[str]:
+        if "*" in name:
+            prefix, suffix = name.split("*", 1)
+        else:
+            prefix, suffix = name, None
+
+        with self._pack_lock:
+            candidates = {n for n in self._new if n.startswith(prefix)}
+
+            if self._index_path.exists():
+                with self._connect() as db:
+                    if suffix is None:
+                        rows = db.execute(
+                            "SELECT name FROM externals WHERE name = ?", (name,)
+                        )
+                    else:
+                        rows = db.execute(
+                            "SELECT name FROM externals WHERE name >= ? AND name < ?",
+                            (prefix, prefix + "\U0010ffff"),
+                        )
+                    candidates.update(row[0] for row in rows)
+
+            candidates -= self._deleted
+
+        if suffix is None:
+            return [name] if name in candidates else []
+
+        return sorted(
+            candidate
+            for candidate in candidates
+            if has_suffix(candidate, suffix) and len(candidate) >= len(name) - 1
+        )
+
+    def list(self) -> set[str]:
+        with self._pack_lock:
+            names = set(self._new)
+            if self._index_path.exists():
+                with self._connect() as db:
+                    names.update(
+                        row[0] for row in db.execute("SELECT name FROM externals")
+                    )
+            return names - self._deleted
+
+    @contextmanager
+    def load(self, location: ExternalLocation) -> Generator[Path]:
+        name = self._lookup_name(location.path)
+
+        with self._pack_lock:
+            path = self._new.get(name) or self._extract(name)
+
+        yield decompressed(path, location.suffix)
+
+    def _extract(self, name: str) -> Path:
+        """Copies the content of the external into a temporary file once."""
+        if name not in self._extracted:
+            from inline_snapshot._global_state import state
+
+            with self._connect() as db:
+                offset, size = db.execute(
+                    "SELECT offset, size FROM externals WHERE name = ?", (name,)
+                ).fetchone()
+                pack = self.directory / self._pack_name(db)
+
+            path = state().new_tmp_path(_split(name)[1])
+            with pack.open("rb") as source, path.open("wb") as target:
+                source.seek(offset)
+                _copy(source, target, size)
+            self._extracted[name] = path
+
+        return self._extracted[name]
+
+    def store(self, location: ExternalLocation, file_path: Path):
+        from inline_snapshot._global_state import state
+
+        assert location.suffix
+
+        hash_name = self._hash(file_path)
+        name = hash_name + location.suffix
+
+        with self._pack_lock:
+            self._deleted.difference_update(stored_names(name))
+
+            # the file can already be stored with another compression
+            if self._find(hash_name + "*" + location.suffix):
+                return
+
+        if compression_suffix := new_compression_suffix(file_path):
+            name += compression_suffix
+            compressed = state().new_tmp_path(location.suffix + compression_suffix)
+            compress(file_path, compressed, compression_suffix)
+            file_path = compressed
+
+        with self._pack_lock:
+            self._new[name] = file_path
+
+    def delete(self, location: ExternalLocation):
+        with self._pack_lock:
+            name = self._lookup_name(location.path)
+            if self._new.pop(name, None) is None:
+                self._deleted.add(name)
+
+    def find_unused_externals(
+        self, used_externals: List[ExternalLocation]
+    ) -> List[ExternalLocation]:
+        unused_externals = self.list()
+        for location in used_externals:
+            if location.path:
+                unused_externals -= self.lookup_all(location.path)
+
+        return [
+            ExternalLocation("pack", *_split(split_compression(name)[0]))
+            for name in unused_externals
+        ]
+
+    def flush(self):
+        with self._pack_lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._new and not self._deleted:
+            self.close()
+            return
+
+        self.directory.mkdir(exist_ok=True, parents=True)
+
+        with self._connect() as db, db:
+            db.executemany(
+                "DELETE FROM externals WHERE name = ?",
+                [(name,) for name in self._deleted],
+            )
+
+            pack = self.directory / self._pack_name(db)
+            with pack.open("ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                rows = []
+                for name, file_path in self._new.items():
+                    with file_path.open("rb") as source:
+                        shutil.copyfileobj(source, f)
+                    size = f.tell() - offset
+                    rows.append((name, offset, size))
+                    offset += size
+
+            db.executemany("INSERT OR IGNORE INTO externals VALUES (?, ?, ?)", rows)
+
+        if self._deleted:
+            self._compact()
+
+        self._new.clear()
+        self._deleted.clear()
+        self._extracted.clear()
+        self.close()
+
+    def _compact(self):
+        """Copies the used content into a new pack file and removes the old
+        one, which contains the content of the deleted externals."""
+        with self._connect() as db:
+            old_name = self._pack_name(db)
+            number = int(old_name[len("externals-") : -len(".pack")])
+            new_name = f"externals-{number + 1}.pack"
+            old_pack = self.directory / old_name
+            new_pack = self.directory / new_name
+
+            rows = db.execute(
+                "SELECT name, offset, size FROM externals ORDER BY offset"
+            ).fetchall()
+
+            new_rows = []
+            with old_pack.open("rb") as source, new_pack.open("wb") as target:
+                for name, offset, size in rows:
+                    source.seek(offset)
+                    new_rows.append((target.tell(), name))
+                    _copy(source, target, size)
+
+            # the new pack is used after the commit and the old pack is
+            # still valid if the transaction fails
+            with db:
+                db.executemany(
+                    "UPDATE externals SET offset = ? WHERE name = ?", new_rows
+                )
+                db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('pack', ?)", (new_name,)
+                )
+
+        old_pack.unlink()
+
+
+def _split(name: str) -> tuple[str, str]:
+    stem, dot, suffix = name.partition(".")
+    return stem, dot + suffix
+
+
+def _copy(source, target, size: int):
+    while size:
+        chunk = source.read(min(size, 2**18))
+        if not chunk:  # pragma: no cover
+            raise EOFError("the pack file is truncated")
+        target.write(chunk)
+        size -= len(chunk)
@@ -17,6 +17,11 @@ class StorageLookupError(ValueNotFound):
 
 class StorageProtocol:
 
+    # store() and delete() of different locations are called from multiple
+    # threads at the end of the session if the storage is thread-safe,
+    # otherwise they are called one after another
+    thread_safe: bool = False
+
     @contextmanager
     def load(self, location: ExternalLocation) -> Generator[Path]:
         """
@@ -51,9 +56,23 @@ class StorageProtocol:
     ) -> list[ExternalLocation]:
         raise NotImplementedError
 
+    def flush(self):
+        """
+        This function is executed at the end of each test session
+        after all changes are applied and can be used to write
+        changes which are collected by `store()` and `delete()`
+        """
+
     def check_externals(self, used_externals: list[ExternalLocation]):
         """
         This function is executed with all external locations
         at the end of each test session and can be used
         to verify storage specific constraints
         """
+
+    def close(self):
+        """
+        This function is executed when the test session ends
+        and can be used to release open resources.
+        The storage can be used again after it is closed.
+        """
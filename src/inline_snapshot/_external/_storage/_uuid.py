@@ -1,65 +1,269 @@
 from __future__ import annotations
 
+import json
+import os
 import shutil
+import threading
 import uuid
 from collections import defaultdict
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Generator
 
-from inline_snapshot._global_state import state_cached
+from inline_snapshot._parallel import ensure_directory
 from inline_snapshot._problems import raise_problem
+from inline_snapshot._utils import create_cache_dir
 from inline_snapshot._utils import link
 
 from .._external_location import ExternalLocation
+from ._compression import compress
+from ._compression import decompressed
+from ._compression import new_compression_suffix
+from ._compression import split_compression
+from ._compression import stored_names
 from ._protocol import StorageLookupError
 from ._protocol import StorageProtocol
 
+uuid_pattern = "????????-????-????-????-????????????.*"
 
-@state_cached
-def external_files() -> dict[str, Path]:
-    from inline_snapshot._global_state import state
 
-    base_folders = set()
+class UuidManifest:
+    """Maps the names of the uuid externals to their paths.
 
-    for test_dir in state().config.test_directories or []:
-        base_folders |= set(test_dir.rglob("__inline_snapshot__"))
+    The manifest is stored in `<directory>/manifest.json` together with the
+    modification times of all folders in the test directories, which
+    changes when a new `__inline_snapshot__` folder is created. It is
+    rebuilt by searching the test directories when it is missing, when one
+    of these folders has changed or when an external can not be found.
+    """
 
-    return {
-        file.name: file
-        for folder in base_folders
-        for file in folder.rglob("????????-????-????-????-????????????.*")
-    }
+    version = 1
+
+    def __init__(self, directory: Path | None, test_directories: list[Path]):
+        self.directory = directory
+        self.test_directories = [str(d) for d in test_directories]
+        self.files: dict[str, Path] = {}
+        self._folders: dict[str, int] = {}
+        self._rebuilt = False
+        self._lock = threading.RLock()
+
+        if not self._load():
+            self.rebuild()
+
+    @property
+    def _path(self) -> Path:
+        assert self.directory is not None
+        return self.directory / "manifest.json"
+
+    def _load(self) -> bool:
+        if self.directory is None:
+            return False
+
+        try:
+            data = json.loads(self._path.read_text("utf-8"))
+        except (OSError, ValueError):
+            return False
+
+        if not (
+            isinstance(data, dict)
+            and data.get("version") == self.version
+            and data.get("test_directories") == self.test_directories
+        ):
+            return False
+
+        for folder, mtime in data["folders"].items():
+            try:
+                if os.stat(self.directory / folder).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+
+        self._folders = data["folders"]
+        self.files = {
+            name: (self.directory / path).resolve()
+            for name, path in data["files"].items()
+        }
+        return True
+
+    def rebuild(self):
+        base_folders = set()
+        self._folders = {}
+
+        for test_dir in self.test_directories:
+            for root, dirs, _ in os.walk(test_dir):
+                # the cache of python changes often and contains no externals
+                dirs[:] = [d for d in dirs if d != "__pycache__"]
+                folder = Path(root)
+                self._add_folder(folder)
+                if folder.name == "__inline_snapshot__":
+                    base_folders.add(folder)
+
+        self.files = {
+            file.name: file
+            for folder in base_folders
+            for file in folder.rglob(uuid_pattern)
+        }
+
+        self._rebuilt = True
+        self.save()
+
+    def rebuild_once(self) -> bool:
+        """Rebuilds the manifest if this was not already done in this
+        session."""
+        with self._lock:
+            if self._rebuilt:
+                return False
+            self.rebuild()
+            return True
+
+    def _relative(self, path: Path) -> str:
+        assert self.directory is not None
+        return Path(os.path.relpath(path, self.directory)).as_posix()
+
+    def _add_folder(self, folder: Path):
+        if self.directory is not None:
+            self._folders[self._relative(folder)] = os.stat(folder).st_mtime_ns
+
+    def _update_folders(self, path: Path):
+        """Updates the modification times of the folders which contain the
+        path.
+
+        The folders up to the `__inline_snapshot__` folder can be new. The
+        folders above are only updated if they are part of the manifest,
+        which is the case for the folders in the test directories.
+        """
+        if self.directory is None:
+            return
+
+        in_base_folder = True
+        for folder in path.parents:
+            if not (in_base_folder or self._relative(folder) in self._folders):
+                break
+            if folder.exists():
+                self._add_folder(folder)
+            if folder.name == "__inline_snapshot__":
+                in_base_folder = False
+
+    def add(self, path: Path, save: bool = True):
+        with self._lock:
+            self.files[path.name] = path
+            self._update_folders(path)
+        if save:
+            self.save()
+
+    def remove(self, path: Path, save: bool = True):
+        with self._lock:
+            self.files.pop(path.name, None)
+            self._update_folders(path)
+        if save:
+            self.save()
+
+    def save(self):
+        if self.directory is None:
+            return
+
+        with self._lock:
+            data = {
+                "version": self.version,
+                "test_directories": self.test_directories,
+                "folders": dict(self._folders),
+                "files": {
+                    name: self._relative(path) for name, path in self.files.items()
+                },
+            }
+
+        try:
+            create_cache_dir(self.directory)
+            tmp_path = self.directory / f"manifest-{uuid.uuid4()}.tmp"
+            tmp_path.write_text(json.dumps(data), "utf-8")
+            os.replace(tmp_path, self._path)
+        except OSError:  # pragma: no cover
+            pass
 
 
 class UuidStorage(StorageProtocol):
+    thread_safe = True
+
+    def __init__(self, manifest_dir: Path | None = None):
+        self.manifest_dir = manifest_dir
+        self._uuid_manifest: UuidManifest | None = None
+        self._manifest_lock = threading.Lock()
+        # the manifest is saved by flush() after store() and delete()
+        self._manifest_changed = False
+
+    def _manifest(self) -> UuidManifest:
+        from inline_snapshot._global_state import state
+
+        with self._manifest_lock:
+            if self._uuid_manifest is None:
+                self._uuid_manifest = UuidManifest(
+                    self.manifest_dir, state().config.test_directories or []
+                )
+        return self._uuid_manifest
+
     @contextmanager
     def load(self, location: ExternalLocation) -> Generator[Path]:
         snapshot_path = self._lookup_path(location)
 
-        yield snapshot_path
+        yield decompressed(snapshot_path, location.suffix)
 
     def _lookup_path(self, location: ExternalLocation):
         if location.filename and location.qualname:
-            path = self._get_path(location)
-            if path.exists():
-                return path
+            snapshot_path = self._get_path(location)
+            for name in stored_names(snapshot_path.name):
+                if snapshot_path.with_name(name).exists():
+                    return snapshot_path.with_name(name)
+
+        manifest = self._manifest()
+        path = self._manifest_path(manifest, location.path)
+        if path is None and manifest.rebuild_once():
+            path = self._manifest_path(manifest, location.path)
 
-        if location.path in external_files():
-            return external_files()[location.path]
+        if path is not None:
+            return path
         else:
             raise StorageLookupError(location, files=[])
 
+    @staticmethod
+    def _manifest_path(manifest: UuidManifest, name: str) -> Path | None:
+        for stored_name in stored_names(name):
+            path = manifest.files.get(stored_name)
+            if path is not None and path.exists():
+                return path
+        return None
+
     def store(self, location: ExternalLocation, file_path: Path):
         snapshot_path = self._get_path(location)
 
-        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_directory(snapshot_path.parent)
 
-        shutil.copy(str(file_path), str(snapshot_path))
+        compression_suffix = new_compression_suffix(file_path)
+        target = snapshot_path.with_name(snapshot_path.name + compression_suffix)
+        if compression_suffix:
+            compress(file_path, target, compression_suffix)
+        else:
+            shutil.copy(str(file_path), str(target))
+        self._manifest().add(target, save=False)
+
+        # the previous version can be stored with another compression
+        for name in stored_names(snapshot_path.name):
+            other = snapshot_path.with_name(name)
+            if other != target and other.exists():
+                other.unlink()
+                self._manifest().remove(other, save=False)
+
+        self._manifest_changed = True
 
     def delete(self, location: ExternalLocation):
         snapshot_path = self._lookup_path(location)
         snapshot_path.unlink()
+        self._manifest().remove(snapshot_path, save=False)
+        self._manifest_changed = True
+
+    def flush(self):
+        if self._manifest_changed:
+            self._manifest().save()
+            self._manifest_changed = False
 
     def new_location(
         self, location: ExternalLocation, file_path: Path
@@ -96,8 +300,8 @@ class UuidStorage(StorageProtocol):
         used_names = [location.path for location in used_externals]
 
         unused_externals = {
-            f.name for f in external_files().values() if f.name not in used_names
-        }
+            split_compression(name)[0] for name in self._manifest().files
+        } - set(used_names)
 
         return [ExternalLocation.from_name("uuid:" + name) for name in unused_externals]
 
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+import tokenize
+from pathlib import Path
+from uuid import uuid4
+
+from inline_snapshot._global_state import state_cached
+from inline_snapshot._utils import create_cache_dir
+
+from ._external_location import ExternalLocation
+from ._find_external import used_externals_in
+
+
+class ExternalUsageIndex:
+    """Remembers the `external()` usages of every test file.
+
+    The index is stored in `<storage-dir>/cache/externals/index.json` and an
+    entry is only valid as long as the (mtime, size) of the file does not
+    change. This allows to find unused externals without parsing every test
+    file in every session.
+    """
+
+    version = 1
+
+    def __init__(self, directory: Path | None, default_storage: str):
+        self.directory = directory
+        self.default_storage = default_storage
+        self._entries: dict[str, dict] = {}
+        self._used: set[str] = set()
+        self._changed = False
+
+        if directory is not None:
+            self._load(directory / "index.json")
+
+    def _load(self, path: Path):
+        try:
+            data = json.loads(path.read_text("utf-8"))
+        except (OSError, ValueError):
+            return
+
+        # the storage of external("name.txt") depends on the default-storage
+        if (
+            isinstance(data, dict)
+            and data.get("version") == self.version
+            and data.get("default_storage") == self.default_storage
+        ):
+            self._entries = data["files"]
+
+    @staticmethod
+    def _file_key(path: Path) -> list[int]:
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def used_externals(self, filename: Path) -> list[ExternalLocation]:
+        """Returns the externals which are used in the file on disk."""
+        name = str(filename)
+        key = self._file_key(filename)
+        self._used.add(name)
+
+        entry = self._entries.get(name)
+        if entry is None or entry["key"] != key:
+            with tokenize.open(filename) as f:
+                content = f.read()
+
+            entry = self._entries[name] = {
+                "key": key,
+                "externals": [
+                    [e.storage, e.stem, e.suffix, e.linenumber]
+                    for e in used_externals_in(filename, content, check_import=True)
+                ],
+            }
+            self._changed = True
+
+        return [
+            ExternalLocation(storage, stem, suffix, filename, None, linenumber)
+            for storage, stem, suffix, linenumber in entry["externals"]
+        ]
+
+    def save(self):
+        """Writes the index and removes the files which were not used in this
+        session."""
+        if self.directory is None:
+            return
+
+        if not self._changed and set(self._entries) == self._used:
+            return
+
+        data = {
+            "version": self.version,
+            "default_storage": self.default_storage,
+            "files": {
+                name: entry
+                for name, entry in self._entries.items()
+                if name in self._used
+            },
+        }
+
+        try:
+            create_cache_dir(self.directory)
+            tmp_path = self.directory / f"index-{uuid4()}.tmp"
+            tmp_path.write_text(json.dumps(data), "utf-8")
+            os.replace(tmp_path, self.directory / "index.json")
+        except OSError:  # pragma: no cover
+            pass
+
+
+@state_cached
+def external_usage_index() -> ExternalUsageIndex:
+    from inline_snapshot._global_state import state
+
+    storage_dir = state().config.storage_dir
+
+    return ExternalUsageIndex(
+        storage_dir / "cache" / "externals" if storage_dir is not None else None,
+        state().config.default_storage,
+    )
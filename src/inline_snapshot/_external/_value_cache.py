@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import copy
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from inline_snapshot._global_state import state_cached
+
+from ._format._protocol import Format
+
+immutable_types = (str, bytes, int, float, bool, type(None))
+
+
+class DecodedValueCache:
+    """A LRU cache for the decoded values of external files.
+
+    The values are keyed by (path, mtime, size, format suffix). Mutable values
+    are stored pickled (or deep-copied if they can not be pickled) and every
+    caller gets its own copy, which allows tests to change the loaded value.
+    """
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024):
+        self.max_size = max_size
+        self._size = 0
+        self._entries: OrderedDict[tuple, tuple[int, str, Any]] = OrderedDict()
+
+    def decode(self, format: Format, path: Path) -> Any:
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = (path, stat.st_mtime_ns, stat.st_size, format.suffix)
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            _, kind, data = self._entries[key]
+        else:
+            value = format.decode(path)
+            if stat.st_size > self.max_size:
+                return value
+
+            kind, data = self._store(value)
+            self._entries[key] = (stat.st_size, kind, data)
+            self._size += stat.st_size
+
+            while self._size > self.max_size:
+                _, (size, _, _) = self._entries.popitem(last=False)
+                self._size -= size
+
+        if kind == "immutable":
+            return data
+        if kind == "pickle":
+            return pickle.loads(data)
+        return copy.deepcopy(data)
+
+    @staticmethod
+    def _store(value: Any) -> tuple[str, Any]:
+        if type(value) in immutable_types:
+            return "immutable", value
+
+        try:
+            return "pickle", pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return "copy", copy.deepcopy(value)
+
+
+@state_cached
+def decoded_values() -> DecodedValueCache:
+    return DecodedValueCache()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from inline_snapshot._format import format_code
+from inline_snapshot._global_state import state_cached
+
+
+class FileCache:
+    """Caches the content of source files and the results which are derived
+    from it for one session.
+
+    Every entry is valid as long as the (mtime, size) of the file does not
+    change. Files which are written by inline-snapshot are invalidated
+    explicitly.
+    """
+
+    def __init__(self):
+        self._contents: dict[Path, tuple[tuple[int, int], bytes]] = {}
+        self._formatted: dict[Path, tuple[tuple[int, int], bool]] = {}
+        self._new_code: dict[
+            tuple[Path, tuple], tuple[tuple[int, int], tuple[str, bool]]
+        ] = {}
+
+    @staticmethod
+    def file_key(path: Path) -> tuple[int, int]:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def read_bytes(self, path: Path) -> bytes:
+        key = self.file_key(path)
+        entry = self._contents.get(path)
+        if entry is None or entry[0] != key:
+            entry = self._contents[path] = (key, path.read_bytes())
+        return entry[1]
+
+    def is_formatted(self, path: Path, code: str) -> bool:
+        """Checks if the whole file is formatted.
+
+        This formats the whole file once per session, but the result is
+        usually found in the format cache of the storage directory when the
+        file was not changed since the last session.
+        """
+        key = self.file_key(path)
+        entry = self._formatted.get(path)
+        if entry is None or entry[0] != key:
+            entry = self._formatted[path] = (key, code == format_code(code, path))
+        return entry[1]
+
+    def new_code(self, path: Path, replacements: tuple) -> tuple[str, bool] | None:
+        entry = self._new_code.get((path, replacements))
+        if entry is not None and entry[0] == self.file_key(path):
+            return entry[1]
+        return None
+
+    def set_new_code(self, path: Path, replacements: tuple, new_code: tuple[str, bool]):
+        self._new_code[(path, replacements)] = (self.file_key(path), new_code)
+
+    def invalidate(self, path: Path):
+        self._contents.pop(path, None)
+        self._formatted.pop(path, None)
+        for key in [key for key in self._new_code if key[0] == path]:
+            del self._new_code[key]
+
+
+@state_cached
+def file_cache() -> FileCache:
+    return FileCache()
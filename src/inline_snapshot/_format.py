@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import subprocess as sp
 import warnings
 
@@ -9,7 +11,32 @@ from ._problems import raise_problem
 def enforce_formatting():
     from inline_snapshot._global_state import state
 
-    return bool(state().config.format_command)
+    return bool(state().config.format_command or state().config.format_server)
+
+
+def finish_formatting():
+    """Cleans up the resources which are used for formatting at the end of
+    the session."""
+    from inline_snapshot._format_cache import format_cache
+    from inline_snapshot._format_server import format_server
+
+    if (cache := format_cache()) is not None:
+        cache.prune()
+
+    if (server := format_server()) is not None:
+        server.close()
+
+
+def black_version() -> str:
+    import black
+
+    return black.__version__
+
+
+def black_supports_line_ranges() -> bool:
+    """`format_str(..., lines=...)` is supported since black 23.11."""
+    major, minor = black_version().split(".")[:2]
+    return (int(major), int(minor)) >= (23, 11)
 
 
 def file_mode_for_path(path):
@@ -49,12 +76,67 @@ def file_mode_for_path(path):
     return mode
 
 
-def format_code(text, filename):
+def _pyproject_text(path) -> str:
+    from pathlib import Path
+
+    directory = Path(path).absolute().parent
+    while True:
+        pyproject = directory / "pyproject.toml"
+        if pyproject.is_file():
+            return pyproject.read_text("utf-8")
+        if directory == directory.parent:
+            return ""
+        directory = directory.parent
+
+
+def format_code(text, filename, lines: list[tuple[int, int]] | None = None):
+    """Formats the code of the given file.
+
+    Arguments:
+        text: the source code
+        filename: the name of the file which is used to find the configuration
+        lines: 1-based inclusive line ranges. Only these lines are formatted if
+            they are given and the formatter supports it (black>=23.11).
+            The `format-command` and `format-server` always format the whole
+            code.
+    """
+    from inline_snapshot._format_cache import FormatCache
+    from inline_snapshot._format_cache import format_cache
+    from inline_snapshot._format_server import FormatServerError
+    from inline_snapshot._format_server import FormatServerUnavailable
+    from inline_snapshot._format_server import format_server
     from inline_snapshot._global_state import state
 
+    cache = format_cache()
+
+    if server := format_server():
+        # the server can read its configuration from pyproject.toml
+        key = FormatCache.key(server.command, _pyproject_text(filename), text)
+        if cache is not None and (result := cache.get(key)) is not None:
+            return result
+
+        try:
+            formatted = server.format(text, str(filename))
+        except FormatServerError as e:
+            raise_problem(f"""\
+[b]The format-server '{escape(server.command)}' caused the following error:[/b]
+""" + escape(str(e)))
+            return text
+        except FormatServerUnavailable:
+            pass
+        else:
+            if cache is not None:
+                cache.set(key, formatted)
+            return formatted
+
     if state().config.format_command:
         format_command = state().config.format_command.format(filename=filename)
 
+        # the command can read its configuration from pyproject.toml
+        key = FormatCache.key(format_command, _pyproject_text(filename), text)
+        if cache is not None and (result := cache.get(key)) is not None:
+            return result
+
         # Split the command at | to handle pipelines properly
         # https://github.com/15r10nk/inline-snapshot/issues/320
         commands = [cmd.strip() for cmd in format_command.split("|")]
@@ -72,7 +154,10 @@ def format_code(text, filename):
                 return text
             current_input = result.stdout
 
-        return current_input.decode("utf-8")
+        formatted = current_input.decode("utf-8")
+        if cache is not None:
+            cache.set(key, formatted)
+        return formatted
 
     try:
         from black import format_str
@@ -90,13 +175,78 @@ This issue can be solved by:
 
         mode = file_mode_for_path(filename)
 
+        if lines is not None and not black_supports_line_ranges():
+            lines = None
+
+        key = FormatCache.key(black_version(), mode.get_cache_key(), repr(lines), text)
+        if cache is not None and (result := cache.get(key)) is not None:
+            return result
+
         try:
             # "a\n" is a work around for https://github.com/15r10nk/inline-snapshot/issues/301
             # it prevents that " " gets treated as a docstring and gets striped by black.
-            return format_str("a\n" + text, mode=mode)[2:].lstrip()
+            if lines is None:
+                formatted = format_str("a\n" + text, mode=mode)
+            else:
+                formatted = format_str(
+                    "a\n" + text,
+                    mode=mode,
+                    lines=[(start + 1, end + 1) for start, end in lines],
+                )
+            formatted = formatted[2:].lstrip()
         except:
             raise_problem("""\
 [b]black could not format your code, which might be caused by this issue:[/b]
     [link=https://github.com/15r10nk/inline-snapshot/issues/138]https://github.com/15r10nk/inline-snapshot/issues/138[/link]\
 """)
             return text
+
+        if cache is not None:
+            cache.set(key, formatted)
+        return formatted
+
+
+expression_separator = "# inline-snapshot: expression separator"
+
+
+def format_expressions(expressions: list[str], filename) -> list[str]:
+    """Formats multiple expressions of the same file with one call of black.
+
+    The expressions are joined into one module which is formatted at once
+    and split again at the separator comments. Every expression is formatted
+    on its own (which reports the correct problem) if this is not possible.
+    """
+
+    def format_each():
+        return [format_code(expression, filename) for expression in expressions]
+
+    if len(expressions) <= 1 or any(
+        expression_separator in expression for expression in expressions
+    ):
+        return format_each()
+
+    try:
+        from black import format_str
+    except ImportError:
+        return format_each()
+
+    code = "a\n" + "".join(
+        f"{expression_separator}\n{expression}\n" for expression in expressions
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+
+        mode = file_mode_for_path(filename)
+
+        try:
+            formatted = format_str(code, mode=mode)
+        except:
+            return format_each()
+
+    _, *results = formatted.split(expression_separator + "\n")
+
+    if len(results) != len(expressions):  # pragma: no cover
+        return format_each()
+
+    return [result.lstrip() for result in results]
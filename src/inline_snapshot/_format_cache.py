@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from uuid import uuid4
+
+from inline_snapshot._global_state import state_cached
+from inline_snapshot._utils import create_cache_dir
+
+
+class FormatCache:
+    """A content addressed cache for the results of `format_code()`.
+
+    Every entry is stored in its own file. The modification time of a file
+    is updated when it is used, which allows to remove the least recently
+    used entries when the cache becomes larger than `max_size` bytes.
+    """
+
+    def __init__(self, directory: Path, max_size: int = 20 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._changed = False
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        algo = hashlib.sha256()
+        for part in parts:
+            algo.update(part.encode("utf-8"))
+            algo.update(b"\0")
+        return algo.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            result = path.read_bytes().decode("utf-8")
+            os.utime(path)
+        except (OSError, UnicodeDecodeError):
+            return None
+        return result
+
+    def set(self, key: str, value: str):
+        path = self._path(key)
+        try:
+            create_cache_dir(self.directory)
+            path.parent.mkdir(exist_ok=True)
+
+            # xdist workers can write the same entry at the same time
+            tmp_path = path.with_name(f"{key}-{uuid4()}.tmp")
+            tmp_path.write_bytes(value.encode("utf-8"))
+            os.replace(tmp_path, path)
+        except OSError:  # pragma: no cover
+            return
+
+        self._changed = True
+
+    def prune(self):
+        """Removes the least recently used entries until the cache is smaller
+        than `max_size`."""
+        if not self._changed:
+            return
+        self._changed = False
+
+        entries = []
+        for path in self.directory.glob("??/*"):
+            try:
+                stat = path.stat()
+            except OSError:  # pragma: no cover
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:  # pragma: no cover
+                pass
+            size -= entry_size
+
+
+@state_cached
+def format_cache() -> FormatCache | None:
+    from inline_snapshot._global_state import state
+
+    storage_dir = state().config.storage_dir
+    if storage_dir is None:
+        return None
+
+    return FormatCache(storage_dir / "cache" / "format")
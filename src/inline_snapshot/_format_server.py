@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import os
+import queue
+import signal
+import subprocess as sp
+import sys
+import tempfile
+import threading
+from typing import IO
+
+from rich.markup import escape
+
+from inline_snapshot._global_state import state_cached
+
+from ._problems import raise_problem
+
+
+class FormatServerError(Exception):
+    """The server reported that it could not format the code."""
+
+
+class FormatServerUnavailable(Exception):
+    """The server could not be used and the code has to be formatted in
+    another way."""
+
+
+class FormatServer:
+    """A long-running formatter process which formats multiple requests.
+
+    Every request consists of a header line `<filename-length> <code-length>`
+    followed by the utf-8 encoded filename and code.
+    The server answers with `ok <length>` or `error <length>`, followed by the
+    formatted code or the error message.
+
+    The process is restarted once if it stops or does not read the request
+    and answer within `timeout` seconds. The server becomes unavailable if this does not help.
+    """
+
+    def __init__(self, command: str, timeout: float = 60):
+        self.command = command
+        self.timeout = timeout
+        self.available = True
+        self._process: sp.Popen | None = None
+        self._stderr = None
+        self._responses: queue.Queue = queue.Queue()
+
+    def _start(self):
+        self._stderr = tempfile.TemporaryFile()
+        self._process = sp.Popen(
+            self.command,
+            shell=True,
+            stdin=sp.PIPE,
+            stdout=sp.PIPE,
+            stderr=self._stderr,
+            # the shell and the server can be killed together
+            start_new_session=sys.platform != "win32",
+        )
+        # the responses are read by a thread, which allows to wait for them
+        # with a timeout
+        self._responses = queue.Queue()
+        threading.Thread(
+            target=_read_responses,
+            args=(self._process.stdout, self._responses),
+            daemon=True,
+        ).start()
+
+    def _request(self, text: str, filename: str) -> str:
+        if self._process is None:
+            self._start()
+        assert self._process is not None
+        assert self._process.stdin is not None
+
+        filename_bytes = filename.encode("utf-8")
+        code = text.encode("utf-8")
+
+        # the request is written by a thread too, because the write blocks
+        # when the server does not read the request
+        threading.Thread(
+            target=_write_request,
+            args=(
+                self._process.stdin,
+                b"%d %d\n" % (len(filename_bytes), len(code)) + filename_bytes + code,
+                self._responses,
+            ),
+            daemon=True,
+        ).start()
+
+        try:
+            response = self._responses.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no response within {self.timeout} seconds") from None
+
+        if isinstance(response, Exception):
+            raise response
+
+        status, data = response
+        if status == b"error":
+            raise FormatServerError(data.decode("utf-8", "replace"))
+
+        return data.decode("utf-8")
+
+    def format(self, text: str, filename: str) -> str:
+        if not self.available:
+            raise FormatServerUnavailable()
+
+        for retry in (True, False):
+            try:
+                return self._request(text, filename)
+            except (OSError, ValueError) as e:
+                # kills the process if it is still running
+                error_output = self._stderr_output()
+                if isinstance(e, TimeoutError):
+                    error_output += f"{e}\n"
+                self.close()
+                if retry:
+                    continue
+
+        self.available = False
+        raise_problem(
+            f"""\
+[b]The format-server '{escape(self.command)}' stopped and could not be restarted:[/b]
+"""
+            + escape(error_output.strip() + "\n" if error_output.strip() else "")
+            + "The code is formatted without the server for the rest of the session."
+        )
+        raise FormatServerUnavailable()
+
+    def _stderr_output(self) -> str:
+        if self._stderr is None:
+            return ""
+        if self._process is not None and self._process.poll() is None:
+            _kill(self._process)
+        self._stderr.seek(0)
+        return self._stderr.read().decode("utf-8", "replace")
+
+    def close(self):
+        process, self._process = self._process, None
+        if process is not None:
+            assert process.stdin is not None
+            try:
+                process.stdin.close()
+            except OSError:  # pragma: no cover
+                pass
+            try:
+                process.wait(timeout=5)
+            except sp.TimeoutExpired:  # pragma: no cover
+                _kill(process)
+            # stdout is closed by the reader thread
+
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+
+def _kill(process: sp.Popen):
+    """Kills the shell which was started for the command and the processes
+    it started."""
+    if sys.platform == "win32":  # pragma: no cover
+        sp.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:  # pragma: no cover
+            pass
+    process.kill()
+    process.wait()
+
+
+def _write_request(stdin: IO[bytes], request: bytes, responses: queue.Queue):
+    """Writes the request or puts the exception into `responses` if it can
+    not be written."""
+    try:
+        stdin.write(request)
+        stdin.flush()
+    except (OSError, ValueError) as e:
+        responses.put(e)
+
+
+def _read_responses(stdout: IO[bytes], responses: queue.Queue):
+    """Puts the `(status, data)` of every response into `responses`, or the
+    exception if the response can not be read."""
+    try:
+        while True:
+            header = stdout.readline().split()
+            if len(header) != 2 or header[0] not in (b"ok", b"error"):
+                raise ValueError(f"invalid response header {header!r}")
+
+            length = int(header[1])
+            data = stdout.read(length)
+            if len(data) != length:
+                raise ValueError("incomplete response")
+
+            responses.put((header[0], data))
+    except (OSError, ValueError) as e:
+        responses.put(e)
+    finally:
+        stdout.close()
+
+
+@state_cached
+def format_server() -> FormatServer | None:
+    from inline_snapshot._global_state import state
+
+    command = state().config.format_server
+    if not command:
+        return None
+
+    return FormatServer(command)
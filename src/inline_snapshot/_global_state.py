@@ -8,6 +8,7 @@ from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import Callable
 from typing import Generator
 from typing import Literal
 from uuid import uuid4
@@ -15,6 +16,7 @@ from uuid import uuid4
 import pluggy
 
 from inline_snapshot._config import Config
+from inline_snapshot._customize._dispatch import CustomizeDispatch
 from inline_snapshot.plugin._spec import inline_snapshot_plugin_name
 
 if TYPE_CHECKING:
@@ -45,6 +47,11 @@ class State:
 
     all_formats: dict[str, Format] = field(default_factory=dict)
 
+    # the possible formats for (type(value), suffix), sorted by priority
+    format_dispatch_cache: dict[tuple[type, str], list[Format]] = field(
+        default_factory=dict
+    )
+
     all_storages: dict[str, StorageProtocol] = field(default_factory=dict)
 
     default_storage: str = "uuid"
@@ -57,11 +64,18 @@ class State:
         default_factory=lambda: pluggy.PluginManager(inline_snapshot_plugin_name)
     )
 
+    customize_dispatch: CustomizeDispatch = field(default_factory=CustomizeDispatch)
+
+    # the function which converts values of a type into code, see value_code_repr()
+    code_repr_cache: dict[tuple[type, int], Callable[[Any], str]] = field(
+        default_factory=dict
+    )
+
     def new_tmp_path(self, suffix: str) -> Path:
         assert self.tmp_dir is not None
         return Path(self.tmp_dir.name) / f"tmp-path-{uuid4()}{suffix}"
 
-    disable_reason: Literal["xdist", "ci", "implementation", None] = None
+    disable_reason: Literal["ci", "implementation", None] = None
 
 
 _latest_global_states: list[State] = []
@@ -116,6 +130,8 @@ def enter_snapshot_context():
 
 def leave_snapshot_context():
     global _current
+    for storage in _current.all_storages.values():
+        storage.close()
     _current.tmp_dir.cleanup()
     _current = _latest_global_states.pop()
 
@@ -0,0 +1,58 @@
+"""File operations at the end of the session are executed in a thread pool,
+because most of the time is spent waiting for the file system."""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+from typing import Iterable
+from typing import TypeVar
+
+from inline_snapshot._global_state import state_cached
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+
+def parallel_map(function: Callable[[T], R], items: Iterable[T]) -> list[R]:
+    """Calls the function for every item in a bounded thread pool.
+
+    The results are returned in the order of the items, and the first
+    exception (in the order of the items) is raised after all calls are
+    finished.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [function(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(function, item) for item in items]
+    return [future.result() for future in futures]
+
+
+class CreatedDirectories:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._directories: set[Path] = set()
+
+    def ensure(self, directory: Path):
+        if directory in self._directories:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._directories.add(directory)
+
+
+@state_cached
+def created_directories() -> CreatedDirectories:
+    return CreatedDirectories()
+
+
+def ensure_directory(directory: Path):
+    """Creates the directory and its parents once per session."""
+    created_directories().ensure(directory)
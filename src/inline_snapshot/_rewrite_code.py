@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import bisect
+import heapq
+import io
 import logging
 import pathlib
-import sys
 import tokenize
-from collections import defaultdict
 from collections.abc import Iterable
+from copy import copy
 from dataclasses import dataclass
 from difflib import unified_diff
 from itertools import islice
@@ -16,16 +18,6 @@ from asttokens import LineNumbers
 from ._format import enforce_formatting
 from ._format import format_code
 
-if sys.version_info >= (3, 10):
-    from itertools import pairwise
-else:
-    from itertools import tee
-
-    def pairwise(iterable):  # type: ignore
-        a, b = tee(iterable)
-        next(b, None)
-        return zip(a, b)
-
 
 @dataclass(order=True)
 class SourcePosition:
@@ -118,56 +110,156 @@ class Change:  # ChangeSet
 
     def _replace(self, filename, range, new_contend):
         source = self.change_recorder.get_source(filename)
-        source.replacements.append(
+        source.add_replacement(
             Replacement(range=range, text=new_contend, change_id=self.change_id)
         )
-        source._check()
+
+
+def _check_overlaps(replacements: list[Replacement], replacement: Replacement) -> int:
+    """Returns the sorted position of the replacement in `replacements` and
+    checks that it does not overlap with its neighbours."""
+    index = bisect.bisect_right(replacements, replacement)
+
+    if index > 0:
+        lhs = replacements[index - 1]
+        assert lhs.range.end <= replacement.range.start, (lhs, replacement)
+
+    if index < len(replacements):
+        rhs = replacements[index]
+        assert replacement.range.end <= rhs.range.start, (replacement, rhs)
+
+    return index
+
+
+def _offset_delta(r: Replacement, line_numbers: LineNumbers) -> int:
+    return len(r.text) - (
+        r.range.end.offset(line_numbers) - r.range.start.offset(line_numbers)
+    )
+
+
+def _line_delta(r: Replacement) -> int:
+    return r.text.count("\n") - (r.range.end.lineno - r.range.start.lineno)
+
+
+def _edit(
+    r: Replacement, line_numbers: LineNumbers, offset_delta=0, line_delta=0
+) -> tuple[int, int, int, int, str]:
+    """The offsets and line numbers of the replaced code and the new text."""
+    return (
+        r.range.start.offset(line_numbers) + offset_delta,
+        r.range.end.offset(line_numbers) + offset_delta,
+        r.range.start.lineno + line_delta,
+        r.range.end.lineno + line_delta,
+        r.text,
+    )
 
 
 class SourceFile:
     def __init__(self, filename: pathlib.Path):
+        from ._file_cache import file_cache
+
+        # sorted by their range, the replacements do not overlap
         self.replacements: list[Replacement] = []
         self.filename = filename
-        with open(self.filename, "rb") as f:
-            self.encoding, _ = tokenize.detect_encoding(f.readline)
+        self.encoding, _ = tokenize.detect_encoding(
+            io.BytesIO(file_cache().read_bytes(self.filename)).readline
+        )
 
         self.source = self.read_source()
 
+        # the file of the lower layer and all its replacements, see layer()
+        self._lower: SourceFile | None = None
+        self._lower_replacements: list[Replacement] = []
+
     def read_source(self) -> str:
-        return self.filename.read_bytes().decode(self.encoding)
+        from ._file_cache import file_cache
+
+        return file_cache().read_bytes(self.filename).decode(self.encoding)
+
+    def add_replacement(self, replacement: Replacement):
+        """Inserts the replacement at its sorted position.
+
+        Only the neighbours have to be checked for overlaps, because the
+        existing replacements do not overlap.
+        """
+        _check_overlaps(self._lower_replacements, replacement)
+        index = _check_overlaps(self.replacements, replacement)
+        self.replacements.insert(index, replacement)
+
+    def all_replacements(self) -> list[Replacement]:
+        """The replacements of this file and its lower layers."""
+        if not self._lower_replacements:
+            return list(self.replacements)
+        return list(heapq.merge(self._lower_replacements, self.replacements))
 
     def rewrite(self):
+        from ._file_cache import file_cache
+
         new_code = self.new_code()
         self.filename.write_bytes(new_code.encode(self.encoding))
+        file_cache().invalidate(self.filename)
 
     def virtual_write(self):
         self.source = self.new_code()
 
-    def _check(self):
-        replacements = list(self.replacements)
-        replacements.sort()
+    def layer(self) -> SourceFile:
+        """Returns a file which uses the new code of this file as its source.
 
-        for r in replacements:
-            assert r.range.start <= r.range.end, r
-
-        for lhs, rhs in pairwise(replacements):
-            assert lhs.range.end <= rhs.range.start, (lhs, rhs)
+        The replacements which are added to the new file are applied to
+        the new code of this file. `diff()` of the new file shows only
+        these replacements.
+        """
+        result = copy(self)
+        result.replacements = []
+        result._lower = self
+        result._lower_replacements = self.all_replacements()
+        result.source = self.new_code()
+        return result
 
     def new_code(self) -> str:
         """Returns the new file contend or None if there are no replacepents to
-        apply."""
-        replacements = list(self.replacements)
-        replacements.sort()
+        apply.
+
+        The result is cached for the same replacements until the file
+        changes on disk, which allows all `ChangeRecorder`s of the session to
+        share it.
+        """
+        return self._new_code()[0]
+
+    def _new_code(self) -> tuple[str, bool]:
+        """Returns the new code and if it is exactly the code of the
+        replacements, which was not changed by the formatter."""
+        from ._file_cache import file_cache
+
+        cache = file_cache()
+
+        key = tuple(
+            (
+                r.range.start.lineno,
+                r.range.start.col_offset,
+                r.range.end.lineno,
+                r.range.end.col_offset,
+                r.text,
+            )
+            for r in self.all_replacements()
+        )
+
+        if (entry := cache.new_code(self.filename, key)) is None:
+            entry = self._compute_new_code()
+            cache.set_new_code(self.filename, key, entry)
 
-        self._check()
+        return entry
+
+    def _compute_new_code(self) -> tuple[str, bool]:
+        from ._file_cache import file_cache
 
         code = self.read_source()
 
-        format_whole_file = enforce_formatting() or code == format_code(
-            code, self.filename
+        is_formatted = enforce_formatting() or file_cache().is_formatted(
+            self.filename, code
         )
 
-        if not format_whole_file:
+        if not is_formatted:
             logging.info(f"file is not formatted with black: {self.filename}")
             import black
 
@@ -175,22 +267,71 @@ class SourceFile:
 
         line_numbers = LineNumbers(code)
 
-        new_code = asttokens.util.replace(
-            code,
-            [
-                (
-                    r.range.start.offset(line_numbers),
-                    r.range.end.offset(line_numbers),
-                    r.text,
-                )
-                for r in replacements
-            ],
+        lower_code, exact = (
+            self._lower._new_code() if self._lower is not None else ("", False)
         )
 
-        if format_whole_file:
-            new_code = format_code(new_code, self.filename)
-
-        return new_code
+        if exact:
+            # only the replacements of this layer are applied to the code of
+            # the lower layer. Their positions are moved by the replacements
+            # of the lower layers in front of them.
+            base_code = lower_code
+            edits = []
+            lower = iter(self._lower_replacements)
+            next_lower = next(lower, None)
+            offset_delta = 0
+            line_delta = 0
+
+            for r in self.replacements:
+                while next_lower is not None and next_lower < r:
+                    offset_delta += _offset_delta(next_lower, line_numbers)
+                    line_delta += _line_delta(next_lower)
+                    next_lower = next(lower, None)
+
+                edits.append(_edit(r, line_numbers, offset_delta, line_delta))
+        else:
+            # the replacements are already sorted and can be applied in one pass
+            base_code = code
+            edits = [_edit(r, line_numbers) for r in self.all_replacements()]
+
+        parts = []
+        position = 0
+
+        # the changed lines in the new code
+        changed_lines: list[tuple[int, int]] = []
+        line_delta = 0
+
+        for start_offset, end_offset, start_line, end_line, text in edits:
+            parts.append(base_code[position:start_offset])
+            parts.append(text)
+            position = end_offset
+
+            start = start_line + line_delta
+            end = start + text.count("\n")
+            if changed_lines and changed_lines[-1][1] >= start - 1:
+                changed_lines[-1] = (
+                    changed_lines[-1][0],
+                    max(end, changed_lines[-1][1]),
+                )
+            else:
+                changed_lines.append((start, end))
+            line_delta += text.count("\n") - (end_line - start_line)
+
+        parts.append(base_code[position:])
+        new_code = "".join(parts)
+
+        if enforce_formatting():
+            formatted_code = format_code(new_code, self.filename)
+        elif is_formatted and changed_lines:
+            # the original code is formatted with black and only the changed
+            # lines have to be formatted again
+            formatted_code = format_code(new_code, self.filename, lines=changed_lines)
+        else:
+            formatted_code = new_code
+
+        # the upper layers can only move their positions through the code
+        # when it was not changed by the formatter
+        return formatted_code, formatted_code == new_code
 
     def diff(self):
         return "\n".join(
@@ -204,17 +345,40 @@ class SourceFile:
 
 class ChangeRecorder:
 
-    def __init__(self):
-        self._source_files = defaultdict(SourceFile)
-        self._changes = []
+    def __init__(self, parent: ChangeRecorder | None = None):
+        self._source_files: dict[pathlib.Path, SourceFile] = {}
+        self._changes: list[Change] = []
+        self._parent = parent
 
     def get_source(self, filename) -> SourceFile:
         filename = pathlib.Path(filename)
         if filename not in self._source_files:
-            self._source_files[filename] = SourceFile(filename)
+            lower = self._parent._find_source(filename) if self._parent else None
+            if lower is not None:
+                self._source_files[filename] = lower.layer()
+            else:
+                self._source_files[filename] = SourceFile(filename)
 
         return self._source_files[filename]
 
+    def _find_source(self, filename: pathlib.Path) -> SourceFile | None:
+        if filename in self._source_files:
+            return self._source_files[filename]
+        if self._parent is not None:
+            return self._parent._find_source(filename)
+        return None
+
+    def layer(self) -> ChangeRecorder:
+        """Creates a recorder which contains the replacements of this
+        recorder.
+
+        The changes which are recorded in the new layer are shown by the
+        `diff()` of its files, without applying the changes of the lower
+        layers again. `files()` contains only the files which are changed in
+        the new layer.
+        """
+        return ChangeRecorder(self)
+
     def files(self) -> Iterable[SourceFile]:
         return self._source_files.values()
 
@@ -28,7 +28,10 @@ class CollectionValue(GenericValue):
             self._new_value = CustomList([self.to_custom(item)])
         else:
             if item not in self._new_value._eval():
-                self._new_value.value.append(self.to_custom(item))
+                # a new node, because the result of _eval() is cached
+                self._new_value = CustomList(
+                    [*self._new_value.value, self.to_custom(item)]
+                )
 
         if ignore_old_value() or isinstance(self._old_value, CustomUndefined):
             return True
@@ -1,11 +1,12 @@
 import os
 import sys
-import tokenize
 from pathlib import Path
 from types import FunctionType
 from types import SimpleNamespace
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Tuple
 
 from executing import is_pytest_compatible
 from rich import box
@@ -21,13 +22,20 @@ from inline_snapshot.fix_pytest_cache import fix_pytest_cache
 
 from . import _config
 from ._change import ChangeBase
+from ._change import ExternalChange
 from ._change import ExternalRemove
 from ._change import apply_all
+from ._external._external_location import ExternalLocation
+from ._external._external_location import Location
 from ._external._find_external import used_externals_in
+from ._external._usage_index import external_usage_index
 from ._flags import Flags
 from ._global_state import state
+from ._parallel import parallel_map
 from ._problems import report_problems
 from ._rewrite_code import ChangeRecorder
+from ._xdist import WorkerChanges
+from ._xdist import worker_output
 from .fix_pytest_diff import fix_pytest_diff
 from .pydantic_fix import pydantic_fix
 from .version import is_insider
@@ -124,6 +132,49 @@ def apply_changes(flag, console):
         return False
 
 
+def _is_thread_safe(location: Location) -> bool:
+    if isinstance(location, ExternalLocation):
+        assert location.storage
+        return state().all_storages[location.storage].thread_safe
+    # the files of external_file() are written independently
+    return True
+
+
+def apply_external_changes(changes: List[ChangeBase]):
+    """Stores and deletes the external files in a thread pool.
+
+    Changes for the same location are applied in order by one task, and all
+    files are stored before the removed externals are deleted. The changes
+    of storages which are not thread-safe are applied one after another.
+    """
+
+    # str(location) -> (location, changes)
+    stores: Dict[str, Tuple[Location, List[ChangeBase]]] = {}
+    removes: Dict[str, Tuple[Location, List[ChangeBase]]] = {}
+    for change in changes:
+        if isinstance(change, ExternalChange):
+            location = change.new_location
+            stores.setdefault(str(location), (location, []))[1].append(change)
+        elif isinstance(change, ExternalRemove):
+            location = change.old_location
+            removes.setdefault(str(location), (location, []))[1].append(change)
+        else:
+            change.apply_external_changes()
+
+    def apply(group: List[ChangeBase]):
+        for change in group:
+            change.apply_external_changes()
+
+    for groups in (stores, removes):
+        parallel_map(
+            apply,
+            [group for location, group in groups.values() if _is_thread_safe(location)],
+        )
+        for location, group in groups.values():
+            if not _is_thread_safe(location):
+                apply(group)
+
+
 def short_report(snapshot_changes, console):
     def report(flag, message, message_n):
         num = snapshot_changes[flag]
@@ -170,6 +221,7 @@ def short_report(snapshot_changes, console):
 def filter_changes(changes, snapshot_changes, console):
 
     used_changes = []
+    accepted = ChangeRecorder()
     for flag in Flags.all():
         if not changes[flag]:
             continue
@@ -192,9 +244,8 @@ def filter_changes(changes, snapshot_changes, console):
         ):
             continue
 
-        cr = ChangeRecorder()
-        apply_all(used_changes, cr)
-        cr.virtual_write()
+        # the changes of this flag are recorded on top of the accepted changes
+        cr = accepted.layer()
         apply_all(changes[flag], cr)
 
         any_changes = False
@@ -236,6 +287,7 @@ def filter_changes(changes, snapshot_changes, console):
 
         if any_changes and apply_changes(flag, console):
             used_changes += changes[flag]
+            accepted = cr
 
     return used_changes
 
@@ -244,6 +296,7 @@ class SnapshotSession:
 
     def __init__(self):
         self.registered_modules = set()
+        self.worker_changes = WorkerChanges()
 
     def register_customize_hooks_from_module(self, module):
         """Find and register functions decorated with @customize from a module"""
@@ -295,7 +348,7 @@ class SnapshotSession:
                 "some snapshots in this test have incorrect values." + extra,
             )
 
-    def load_config(self, pyproject, cli_flags, parallel_run, error, project_root):
+    def load_config(self, pyproject, cli_flags, error, project_root):
 
         # read config
         if pyproject is not None:
@@ -326,10 +379,6 @@ class SnapshotSession:
         else:
             state().disable_reason = None
             flags = cli_flags
-            if parallel_run and flags - {"disable"}:
-                error(
-                    f"--inline-snapshot={','.join(flags)} cannot be combined with xdist"
-                )
 
         state().flags = flags
 
@@ -349,10 +398,7 @@ class SnapshotSession:
             )
 
         # disable inline-snapshot if it cannot be used in the current context
-        if parallel_run and "disable" not in flags:
-            state().active = False
-            state().disable_reason = "xdist"
-        elif not is_implementation_supported() and "disable" not in flags:
+        if not is_implementation_supported() and "disable" not in flags:
             state().active = False
             state().disable_reason = "implementation"
         elif flags & {"review"}:
@@ -384,6 +430,39 @@ class SnapshotSession:
         fix_pytest_diff()
         fix_pytest_cache()
 
+    @staticmethod
+    def _local_snapshot_changes() -> Iterator[tuple]:
+        for key, snapshot in state().snapshots.items():
+            try:
+                change_list = list(snapshot._changes())
+            except Exception as exception:
+                context = ""
+                if _context := getattr(snapshot, "_context", None):
+                    frame = _context._frame
+                    context = f"""
+file: {frame.f_code.co_filename}
+line: {frame.f_lineno}\
+"""
+                raise RuntimeError(f"""
+error during change collection for snapshot ({snapshot})
+snapshot.\
+{context}
+""") from exception
+
+            yield key, snapshot, change_list
+
+    def snapshot_changes(self) -> Iterator[List[ChangeBase]]:
+        """Yields the changes of every snapshot of this session, including
+        the snapshots of the xdist workers."""
+        for _, _, change_list in self._local_snapshot_changes():
+            yield change_list
+
+        yield from self.worker_changes.snapshot_changes()
+
+    def worker_output(self, worker_id: str) -> dict:
+        """Serializes the changes of this xdist worker for the controller."""
+        return worker_output(worker_id, self._local_snapshot_changes())
+
     def show_report(self, con: Console):
 
         @call_once
@@ -398,12 +477,7 @@ class SnapshotSession:
 
         if not state().active:
             disable_info = "This means that tests with snapshots will continue to run, but snapshot(x) will only return x and inline-snapshot will not be able to fix snapshots or generate reports."
-            if state().disable_reason == "xdist":
-                console().print(
-                    f"INFO: inline-snapshot was disabled because you used xdist. {disable_info}\n"
-                )
-
-            elif state().disable_reason == "ci":
+            if state().disable_reason == "ci":
                 env_var = is_ci_run()
                 console().print(
                     f'INFO: CI run was detected because environment variable "{env_var}" was defined. '
@@ -425,23 +499,8 @@ class SnapshotSession:
 
         snapshot_changes = {f: 0 for f in Flags.all()}
 
-        for snapshot in state().snapshots.values():
+        for change_list in self.snapshot_changes():
             all_categories = set()
-            try:
-                change_list = list(snapshot._changes())
-            except Exception as exception:
-                context = ""
-                if _context := getattr(snapshot, "_context", None):
-                    frame = _context._frame
-                    context = f"""
-file: {frame.f_code.co_filename}
-line: {frame.f_lineno}\
-"""
-                raise RuntimeError(f"""
-error during change collection for snapshot ({snapshot})
-snapshot.\
-{context}
-""") from exception
 
             for change in change_list:
                 changes[change.flag].append(change)
@@ -468,17 +527,16 @@ snapshot.\
             }
 
             used = []
+            usage_index = external_usage_index()
 
             for file in all_files:
                 if file in changed_files:
                     content = changed_files[file].new_code()
-                    check_import = False
+                    used += used_externals_in(file, content, check_import=False)
                 else:
-                    with tokenize.open(file) as f:
-                        content = f.read()
-                    check_import = True
+                    used += usage_index.used_externals(file)
 
-                used += used_externals_in(file, content, check_import=check_import)
+            usage_index.save()
 
             changes = {f: [] for f in Flags.all()}
 
@@ -498,7 +556,9 @@ snapshot.\
             cr = ChangeRecorder()
             apply_all(used_changes, cr)
 
-            for change in used_changes:
-                change.apply_external_changes()
+            apply_external_changes(used_changes)
+
+            for storage in state().all_storages.values():
+                storage.flush()
 
             cr.fix_all()
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import io
 import token
 import tokenize
@@ -6,7 +8,7 @@ from pathlib import Path
 from executing import Source
 
 from inline_snapshot._format import enforce_formatting
-from inline_snapshot._format import format_code
+from inline_snapshot._format import format_expressions
 from inline_snapshot._utils import normalize
 from inline_snapshot._utils import simple_token
 
@@ -33,14 +35,15 @@ class SourceFile:
     def filename(self) -> str:
         return self._source.filename
 
-    def _format(self, code):
+    def format_expressions(self, codes: list[str]) -> list[str]:
+        """Formats multiple expressions with one formatter call."""
         if self._source is None or enforce_formatting():
-            return code
+            return [code.strip() for code in codes]
         else:
-            return format_code(code, Path(self._source.filename))
-
-    def format_expression(self, code: str) -> str:
-        return self._format(code).strip()
+            return [
+                code.strip()
+                for code in format_expressions(codes, Path(self._source.filename))
+            ]
 
     def asttokens(self):
         return self._source.asttokens()
@@ -23,6 +23,15 @@ def category_link(category):
     )
 
 
+def create_cache_dir(directory: Path):
+    """Creates a directory for cached data which is ignored by git."""
+    if not directory.exists():
+        directory.mkdir(parents=True)
+        (directory / ".gitignore").write_bytes(
+            b"# this cache is created by inline-snapshot\n*\n"
+        )
+
+
 def is_relative_to(base: Path, relative: Path):
     try:
         relative.relative_to(base)
@@ -0,0 +1,329 @@
+"""Transfer of snapshot changes from pytest-xdist workers to the controller.
+
+Every worker collects the changes of its snapshots and serializes them into
+`config.workeroutput`. The controller deserializes them, merges the changes
+of snapshots which are used by tests on different workers and
+reports/applies them like the changes of a normal test run.
+"""
+
+from __future__ import annotations
+
+import ast
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+
+from executing import Source
+
+from inline_snapshot._change import CallArg
+from inline_snapshot._change import Change
+from inline_snapshot._change import ChangeBase
+from inline_snapshot._change import Delete
+from inline_snapshot._change import DictInsert
+from inline_snapshot._change import ExternalChange
+from inline_snapshot._change import ExternalRemove
+from inline_snapshot._change import ListInsert
+from inline_snapshot._change import Replace
+from inline_snapshot._change import RequiredImport
+from inline_snapshot._external._external_location import ExternalLocation
+from inline_snapshot._external._external_location import FileLocation
+from inline_snapshot._external._external_location import Location
+from inline_snapshot._global_state import state
+from inline_snapshot._problems import raise_problem
+from inline_snapshot._source_file import SourceFile
+from inline_snapshot._utils import is_relative_to
+
+source_changes = {
+    cls.__name__: cls
+    for cls in (RequiredImport, Delete, ListInsert, DictInsert, Replace, CallArg)
+}
+
+# execnet can only transfer builtin types
+SerializedChange = Dict[str, Any]
+
+
+def _serialize_location(location: Location) -> dict:
+    if isinstance(location, ExternalLocation):
+        return {
+            "type": "external",
+            "storage": location.storage,
+            "stem": location.stem,
+            "suffix": location.suffix,
+            "filename": str(location.filename) if location.filename else None,
+            "qualname": location.qualname,
+            "linenumber": location.linenumber,
+        }
+
+    if isinstance(location, FileLocation):
+        return {"type": "file", "filename": str(location._filename)}
+
+    assert False, location
+
+
+def _deserialize_location(data: dict) -> Location:
+    if data["type"] == "file":
+        return FileLocation(Path(data["filename"]))
+
+    return ExternalLocation(
+        storage=data["storage"],
+        stem=data["stem"],
+        suffix=data["suffix"],
+        filename=Path(data["filename"]) if data["filename"] else None,
+        qualname=data["qualname"],
+        linenumber=data["linenumber"],
+    )
+
+
+class _NodeIndex:
+    """AST nodes are transferred as their index in `ast.walk(tree)`, which is
+    the same in every process because all of them parse the same file."""
+
+    def __init__(self):
+        self._indices: dict[str, dict[ast.AST, int]] = {}
+        self._nodes: dict[str, list[ast.AST]] = {}
+
+    @staticmethod
+    def _tree(file: SourceFile) -> ast.AST:
+        tree = file._source.tree
+        assert tree is not None, file.filename
+        return tree
+
+    def index(self, file: SourceFile, node: ast.AST | None) -> int | None:
+        if node is None:
+            return None
+        if file.filename not in self._indices:
+            self._indices[file.filename] = {
+                n: i for i, n in enumerate(ast.walk(self._tree(file)))
+            }
+        return self._indices[file.filename][node]
+
+    def node(self, file: SourceFile, index: int | None) -> ast.AST | None:
+        if index is None:
+            return None
+        if file.filename not in self._nodes:
+            self._nodes[file.filename] = list(ast.walk(self._tree(file)))
+        return self._nodes[file.filename][index]
+
+
+def serialize_change(change: ChangeBase, nodes: _NodeIndex) -> SerializedChange:
+    if isinstance(change, ExternalChange):
+        return {
+            "type": "ExternalChange",
+            "flag": change.flag,
+            "content": change.new_file.read_bytes(),
+            "old_location": _serialize_location(change.old_location),
+            "new_location": _serialize_location(change.new_location),
+            "format": change.format.suffix,
+        }
+
+    if isinstance(change, ExternalRemove):
+        return {
+            "type": "ExternalRemove",
+            "flag": change.flag,
+            "old_location": _serialize_location(change.old_location),
+        }
+
+    assert isinstance(change, Change) and type(change).__name__ in source_changes
+
+    data: SerializedChange = {
+        "type": type(change).__name__,
+        "flag": change.flag,
+        "filename": change.file.filename,
+    }
+    for field in fields(change):
+        if field.name in ("flag", "file"):
+            continue
+        value = getattr(change, field.name)
+        if field.name == "node":
+            value = nodes.index(change.file, value)
+        data[field.name] = value
+
+    return data
+
+
+def deserialize_change(data: SerializedChange, nodes: _NodeIndex) -> ChangeBase:
+    from inline_snapshot._external._format._protocol import (
+        get_format_handler_from_suffix,
+    )
+
+    data = dict(data)
+    type_name = data.pop("type")
+
+    if type_name == "ExternalChange":
+        new_location = _deserialize_location(data["new_location"])
+        new_file = state().new_tmp_path(new_location.suffix)
+        new_file.write_bytes(data["content"])
+        return ExternalChange(
+            data["flag"],
+            new_file,
+            _deserialize_location(data["old_location"]),
+            new_location,
+            get_format_handler_from_suffix(data["format"]),
+        )
+
+    if type_name == "ExternalRemove":
+        return ExternalRemove(data["flag"], _deserialize_location(data["old_location"]))
+
+    file = SourceFile(Source.for_filename(data.pop("filename")))
+    if "node" in data:
+        data["node"] = nodes.node(file, data["node"])
+    if type_name == "DictInsert":
+        data["new_code"] = [tuple(item) for item in data["new_code"]]
+
+    return source_changes[type_name](file=file, **data)
+
+
+def _snapshot_id(key, snapshot, default: tuple) -> tuple:
+    """An identifier for the snapshot which is the same in every worker."""
+    context = getattr(snapshot, "_context", None)
+    if context is not None and context.expr.node is not None:
+        node = context.expr.node
+        return (context.file.filename, node.lineno, node.col_offset)
+
+    if isinstance(key, tuple) and key[0] == "file":
+        return (str(key[1]), None, None)
+
+    return default
+
+
+def _display_name(snapshot_id: tuple) -> str:
+    filename, lineno, _ = snapshot_id
+    path = Path(filename).resolve()
+    if is_relative_to(Path.cwd().resolve(), path):
+        path = path.relative_to(Path.cwd().resolve())
+    return path.as_posix() + (f":{lineno}" if lineno is not None else "")
+
+
+# the fields which contain the new value of a serialized change
+_change_content = ("new_code", "content", "new_location", "format")
+
+
+def _change_target(change: SerializedChange) -> tuple:
+    """Identifies the part of the code or the external which is changed."""
+    return tuple(
+        (name, repr(value))
+        for name, value in sorted(change.items())
+        if name not in _change_content
+    )
+
+
+def _change_span(change: SerializedChange, nodes: _NodeIndex) -> tuple | None:
+    """The source range of the node which is changed, or `None` if the change
+    has no node."""
+    if change.get("node") is None:
+        return None
+
+    file = SourceFile(Source.for_filename(change["filename"]))
+    node = nodes.node(file, change["node"])
+    assert node is not None
+    return (
+        change["filename"],
+        (node.lineno, node.col_offset),  # type: ignore[attr-defined]
+        (node.end_lineno, node.end_col_offset),  # type: ignore[attr-defined]
+    )
+
+
+def _overlaps(a: tuple | None, b: tuple | None) -> bool:
+    if a is None or b is None or a[0] != b[0]:
+        return False
+    return a[1] < b[2] and b[1] < a[2]
+
+
+def worker_output(worker_id: str, snapshot_changes) -> dict:
+    """Serializes the changes of all snapshots of this worker.
+
+    Arguments:
+        worker_id: the id of the xdist worker (gw0, gw1, ...)
+        snapshot_changes: iterable of `(key, snapshot, changes)` tuples
+    """
+    nodes = _NodeIndex()
+
+    return {
+        "snapshots": [
+            {
+                "id": _snapshot_id(key, snapshot, (worker_id, i, None)),
+                "changes": [serialize_change(change, nodes) for change in changes],
+            }
+            for i, (key, snapshot, changes) in enumerate(snapshot_changes)
+        ],
+        "problems": sorted(state().all_problems),
+    }
+
+
+class WorkerChanges:
+    """Collects the output of all xdist workers on the controller."""
+
+    def __init__(self):
+        self._outputs: dict[str, dict] = {}
+
+    def add(self, worker_id: str, output: dict):
+        self._outputs[worker_id] = output
+
+    def snapshot_changes(self) -> Iterator[List[ChangeBase]]:
+        """Yields the changes of every snapshot once.
+
+        The same snapshot can be used by tests which run on different
+        workers, and not every worker has to find a change for it. The
+        changes of all workers are merged and identical changes are
+        applied once. The changes of a worker are not used when they
+        change the same part of the snapshot differently than the changes
+        of a previous worker, or when they change code which overlaps with
+        the code changed by a previous worker.
+        """
+        merged: dict[tuple, dict[tuple, tuple[str, SerializedChange]]] = {}
+        conflicts: dict[tuple, tuple[str, str]] = {}
+        nodes = _NodeIndex()
+
+        for worker_id, output in sorted(self._outputs.items()):
+            for problem in output["problems"]:
+                raise_problem(problem)
+
+            for snapshot in output["snapshots"]:
+                snapshot_id = tuple(snapshot["id"])
+                targets = merged.setdefault(snapshot_id, {})
+                spans = [
+                    (other_worker, _change_span(other, nodes))
+                    for other_worker, other in targets.values()
+                ]
+
+                new_targets: dict[tuple, tuple[str, SerializedChange]] = {}
+                conflict_worker = None
+
+                for change in snapshot["changes"]:
+                    target = _change_target(change)
+                    if target in targets:
+                        if targets[target][1] != change:
+                            conflict_worker = targets[target][0]
+                            break
+                        continue
+
+                    span = _change_span(change, nodes)
+                    conflict_worker = next(
+                        (
+                            other_worker
+                            for other_worker, other_span in spans
+                            if _overlaps(span, other_span)
+                        ),
+                        None,
+                    )
+                    if conflict_worker is not None:
+                        break
+
+                    new_targets[target] = (worker_id, change)
+
+                if conflict_worker is not None:
+                    conflicts.setdefault(snapshot_id, (conflict_worker, worker_id))
+                else:
+                    targets.update(new_targets)
+
+        for snapshot_id, (first_worker, worker_id) in conflicts.items():
+            raise_problem(
+                f"[b]The snapshot at {_display_name(snapshot_id)} was changed differently by the xdist workers {first_worker} and {worker_id}.[/b]\n"
+                f"Only the changes of {first_worker} are used. Run the tests without xdist (-n0) to update this snapshot correctly."
+            )
+
+        for targets in merged.values():
+            yield [deserialize_change(change, nodes) for _, change in targets.values()]
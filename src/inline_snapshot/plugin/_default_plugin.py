@@ -30,7 +30,7 @@ from ._spec import customize
 
 
 class InlineSnapshotPlugin:
-    @customize
+    @customize(types=(list, tuple, dict))
     def standard_handler(self, value, builder: Builder):
         if isinstance(value, list):
             return builder.create_list(value)
@@ -41,7 +41,7 @@ class InlineSnapshotPlugin:
         if isinstance(value, dict):
             return builder.create_dict(value)
 
-    @customize
+    @customize(types=(str,))
     def string_handler(self, value, builder: Builder):
         if isinstance(value, str) and (
             ("\n" in value and value[-1] != "\n") or value.count("\n") > 1
@@ -53,12 +53,12 @@ class InlineSnapshotPlugin:
 
             return builder.create_code(triple_quoted_string)
 
-    @customize(tryfirst=True)
+    @customize(types=(Counter,), tryfirst=True)
     def counter_handler(self, value, builder: Builder):
         if isinstance(value, Counter):
             return builder.create_call(Counter, [dict(value)])
 
-    @customize
+    @customize(types=(FunctionType, type))
     def function_and_type_handler(
         self, value, builder: Builder, local_vars: Dict[str, Any]
     ):
@@ -75,7 +75,7 @@ class InlineSnapshotPlugin:
 
     if sys.version_info >= (3, 10):
 
-        @customize
+        @customize(types=(NewType,))
         def typing_newtype_handler(
             self, value, builder: Builder, local_vars: Dict[str, Any]
         ):
@@ -90,12 +90,12 @@ class InlineSnapshotPlugin:
                     qualname, imports=[ImportFrom(value.__module__, name)]
                 )
 
-    @customize
+    @customize(types=(BuiltinFunctionType,))
     def builtin_function_handler(self, value, builder: Builder):
         if isinstance(value, BuiltinFunctionType):
             return builder.create_code(value.__name__)
 
-    @customize
+    @customize(types=(datetime.timezone,))
     def timezone_handler(self, value, builder: Builder):
         if type(value) is datetime.timezone:
             # Handle timezone.utc specially - it's a constant, not a constructor call
@@ -110,7 +110,7 @@ class InlineSnapshotPlugin:
             tzname = value.tzname(None)
             return builder.create_call(datetime.timezone, [offset, tzname])
 
-    @customize
+    @customize(types=(datetime.date, datetime.time, datetime.timedelta))
     def datetime_handler(self, value, builder: Builder):
 
         if type(value) is datetime.datetime:
@@ -155,7 +155,7 @@ class InlineSnapshotPlugin:
                 },
             )
 
-    @customize
+    @customize(types=(PurePath,))
     def path_handler(self, value, builder: Builder):
         if isinstance(value, Path):
             return builder.create_call(Path, [value.as_posix()])
@@ -179,7 +179,7 @@ class InlineSnapshotPlugin:
 
         return set_values
 
-    @customize
+    @customize(types=(set,))
     def set_handler(self, value, builder: Builder):
         if isinstance(value, set):
             if len(value) == 0:
@@ -189,7 +189,7 @@ class InlineSnapshotPlugin:
                     "{" + ", ".join(self.sort_set_values(value)) + "}"
                 )
 
-    @customize
+    @customize(types=(frozenset,))
     def frozenset_handler(self, value, builder: Builder):
         if isinstance(value, frozenset):
             if len(value) == 0:
@@ -198,7 +198,7 @@ class InlineSnapshotPlugin:
                 return builder.create_call(frozenset, [set(value)])
 
     # -8<- [start:Enum]
-    @customize
+    @customize(types=(Enum,))
     def enum_handler(self, value, builder: Builder):
         if isinstance(value, Enum):
             qualname = type(value).__qualname__
@@ -211,7 +211,7 @@ class InlineSnapshotPlugin:
 
     # -8<- [end:Enum]
 
-    @customize
+    @customize(types=(Flag,))
     def flag_handler(self, value, builder: Builder):
         if isinstance(value, Flag):
             qualname = type(value).__qualname__
@@ -229,7 +229,7 @@ class InlineSnapshotPlugin:
         if "__file__" in global_vars and value == global_vars["__file__"]:
             return builder.create_code("__file__")
 
-    @customize
+    @customize(by_type=True)
     def dataclass_handler(self, value, builder: Builder):
 
         if is_dataclass(value) and not isinstance(value, type):
@@ -256,7 +256,7 @@ class InlineSnapshotPlugin:
 
             return builder.create_call(type(value), [], kwargs)
 
-    @customize
+    @customize(by_type=True)
     def namedtuple_handler(self, value, builder: Builder):
         t = type(value)
         b = t.__bases__
@@ -283,7 +283,7 @@ class InlineSnapshotPlugin:
             },
         )
 
-    @customize(tryfirst=True)
+    @customize(types=(defaultdict,), tryfirst=True)
     def defaultdict_handler(self, value, builder: Builder):
         if isinstance(value, defaultdict):
             return builder.create_call(
@@ -295,12 +295,12 @@ class InlineSnapshotPlugin:
         if is_unmanaged(value):
             return CustomUnmanaged(value=value)
 
-    @customize
+    @customize(types=(type(undefined),))
     def undefined_handler(self, value, builder: Builder):
         if value is undefined:
             return CustomUndefined()
 
-    @customize
+    @customize(types=(Outsourced,))
     def outsource_handler(self, value, builder: Builder):
         if isinstance(value, Outsourced):
             return builder.create_external(
@@ -317,7 +317,7 @@ else:
     from dirty_equals._utils import Omit
 
     class InlineSnapshotDirtyEqualsPlugin:
-        @customize(tryfirst=True)
+        @customize(types=(dirty_equals.DirtyEquals, type), tryfirst=True)
         def dirty_equals_handler(self, value, builder: Builder):
 
             if is_dirty_equal(value) and builder._build_new_value:
@@ -342,7 +342,8 @@ else:
                             kwargs.pop("delta")
                     return builder.create_call(type(value), args, kwargs)
 
-        @customize(tryfirst=True)
+        # IsNow() is only equal to datetimes
+        @customize(types=(datetime.datetime,), tryfirst=True)
         def is_now_handler(self, value, builder: Builder):
             if value == dirty_equals.IsNow():
                 return dirty_equals.IsNow()
@@ -357,7 +358,7 @@ except ImportError:  # pragma: no cover
 else:
 
     class InlineSnapshotAttrsPlugin:
-        @customize
+        @customize(by_type=True)
         def attrs_handler(self, value, builder: Builder):
 
             if attrs.has(type(value)):
@@ -419,7 +420,7 @@ else:
     from pydantic import BaseModel
 
     class InlineSnapshotPydanticPlugin:
-        @customize
+        @customize(types=(BaseModel,))
         def pydantic_model_handler(self, value, builder: Builder):
 
             if isinstance(value, BaseModel):
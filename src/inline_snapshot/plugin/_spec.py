@@ -1,6 +1,8 @@
-from functools import partial
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Optional
+from typing import Tuple
 
 import pluggy
 
@@ -18,10 +20,39 @@ hookimpl = pluggy.HookimplMarker(inline_snapshot_plugin_name)
 The pluggy hookimpl marker for inline_snapshot.
 """
 
-customize = partial(hookimpl, specname="customize")
-"""
-Decorator to mark a function as an implementation of the `customize` hook which can be used instead of `hookimpl(specname="customize")`.
-"""
+
+def customize(
+    function: Optional[Callable] = None,
+    *,
+    types: Optional[Tuple[type, ...]] = None,
+    by_type: bool = False,
+    **options: Any,
+):
+    """
+    Decorator to mark a function as an implementation of the `customize` hook which can be used instead of `hookimpl(specname="customize")`.
+
+    Arguments:
+        types: the handler is only called for values which are instances of these types
+            (`type(value)` has to be a subclass of one of them).
+        by_type: the handler declares that only the type of the value decides whether it returns `None`.
+            It is not called again for values of this type after it returned `None` once.
+        options: other options of `hookimpl()` like `tryfirst=True`.
+
+    inline-snapshot calls the handlers directly (without pluggy) and caches the
+    handlers which can apply to each type if there are no hook wrappers.
+    The handler should still check the value, because all handlers are
+    called through pluggy otherwise.
+    """
+
+    def decorator(function):
+        if types is not None:
+            function.inline_snapshot_types = tuple(types)
+        function.inline_snapshot_by_type = by_type
+        return hookimpl(function, specname="customize", **options)
+
+    if function is None:
+        return decorator
+    return decorator(function)
 
 
 class InlineSnapshotPluginSpec:
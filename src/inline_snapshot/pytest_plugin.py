@@ -1,4 +1,3 @@
-import os
 import sys
 from pathlib import Path
 
@@ -12,6 +11,7 @@ from . import _config
 from ._exceptions import UsageError
 from ._fix_assert import fix_assert
 from ._flags import Flags
+from ._format import finish_formatting
 from ._get_snapshot_value import unwrap
 from ._global_state import enter_snapshot_context
 from ._global_state import leave_snapshot_context
@@ -72,15 +72,11 @@ def pytest_addoption(parser, pluginmanager):
 categories = Flags.all().to_set()
 
 
-def xdist_running(config):
-    if "PYTEST_XDIST_WORKER" in os.environ:
-        return True
-
-    return (
-        hasattr(config.option, "numprocesses")
-        and config.option.numprocesses is not None
-        and config.option.numprocesses != 0
-    )
+def xdist_worker_id(config):
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None:
+        return None
+    return workerinput["workerid"]
 
 
 def find_pyproject(pytest_root, cwd):
@@ -166,21 +162,42 @@ class InlineSnapshotPlugin:
         else:
             cli_flags = None
 
+        if xdist_worker_id(config) is not None:
+            # xdist workers use the flags of the controller,
+            # which decides which changes are reported and applied
+            cli_flags = set(config.workerinput["inline_snapshot_flags"])
+
         def error(message):
             raise pytest.UsageError(message)
 
         self.session.load_config(
             pyproject,
             cli_flags=cli_flags,
-            parallel_run=xdist_running(config),
             error=error,
             project_root=config.rootpath,
         )
 
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        node.workerinput["inline_snapshot_flags"] = sorted(state().flags)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        output = getattr(node, "workeroutput", {}).get("inline_snapshot")
+        if output is not None:
+            self.session.worker_changes.add(node.workerinput["workerid"], output)
+
     @pytest.hookimpl(trylast=True)
     def pytest_sessionfinish(self, session, exitstatus):
         config = session.config
 
+        if (worker_id := xdist_worker_id(config)) is not None:
+            if state().active:
+                config.workeroutput["inline_snapshot"] = self.session.worker_output(
+                    worker_id
+                )
+            return
+
         capture = config.pluginmanager.getplugin("capturemanager")
 
         suspend_capture = (
@@ -209,6 +226,7 @@ class InlineSnapshotPlugin:
 
     @pytest.hookimpl
     def pytest_unconfigure(self, config):
+        finish_formatting()
         leave_snapshot_context()
 
     @pytest.hookimpl
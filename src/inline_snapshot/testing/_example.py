@@ -29,6 +29,7 @@ from inline_snapshot._get_snapshot_value import get_snapshot_value
 from inline_snapshot._snapshot_arg import snapshot_arg
 from inline_snapshot._snapshot_session import SnapshotSession
 
+from .._format import finish_formatting
 from .._global_state import enter_snapshot_context
 from .._global_state import leave_snapshot_context
 from .._global_state import state
@@ -204,6 +205,12 @@ class Example:
         def normalize_path(path):
             return str(path.relative_to(dir)).replace("\\", "/")
 
+        cache_dirs = {
+            p.parent
+            for p in dir.rglob(".gitignore")
+            if p.read_bytes().startswith(b"# this cache is created by inline-snapshot")
+        }
+
         return {
             normalize_path(p): try_read(p)
             for p in dir.rglob("*")
@@ -211,6 +218,7 @@ class Example:
             and p.name != ".gitignore"
             and p.suffix != ".pyc"
             and ".pytest_cache" not in p.parts
+            and not any(d in p.parents for d in cache_dirs)
         }
 
     def with_files(self, extra_files: dict[str, str | bytes]) -> Example:
@@ -397,7 +405,6 @@ class Example:
                     session.load_config(
                         tmp_path / "pyproject.toml",
                         flags,
-                        parallel_run=False,
                         error=report_error,
                         project_root=tmp_path,
                     )
@@ -481,6 +488,7 @@ class Example:
                         traceback.print_exc()
                         raised_exception.append(e)
 
+                    finish_formatting()
                     sys.modules = old_modules
                     sys.path = old_path
                     leave_snapshot_context()
@@ -99,3 +99,28 @@ def executing_used(request, monkeypatch):
 
         monkeypatch.setattr(executing.Source, "executing", fake_executing)
         yield used
+
+
+@pytest.fixture
+def snapshot_env(tmp_path, monkeypatch):
+    """Like `inline_snapshot._global_state.snapshot_env()`, but the caches are
+    stored in `tmp_path` instead of the storage directory of this repository."""
+    from inline_snapshot import _global_state
+    from inline_snapshot._format_cache import FormatCache
+    from inline_snapshot._utils import is_relative_to
+
+    set_entry = FormatCache.set
+
+    def checked_set(self, key, value):
+        assert is_relative_to(tmp_path, self.directory), self.directory
+        set_entry(self, key, value)
+
+    monkeypatch.setattr(FormatCache, "set", checked_set)
+
+    @contextmanager
+    def env():
+        with _global_state.snapshot_env() as state:
+            state.config.storage_dir = tmp_path
+            yield state
+
+    return env
@@ -0,0 +1,181 @@
+import pytest
+from dirty_equals import IsBytes
+
+from inline_snapshot import snapshot
+from inline_snapshot._external._storage._compression import compress
+from inline_snapshot._external._storage._compression import compression_suffixes
+from inline_snapshot._external._storage._compression import decompressed
+from inline_snapshot._global_state import snapshot_env
+from inline_snapshot.testing._example import Example
+
+
+@pytest.mark.parametrize("suffix", compression_suffixes.values())
+def test_compress(tmp_path, suffix):
+    source = tmp_path / "value.txt"
+    source.write_bytes(b"line\n" * 1000)
+
+    compress(source, tmp_path / f"a.txt{suffix}", suffix)
+    compress(source, tmp_path / f"b.txt{suffix}", suffix)
+
+    data = (tmp_path / f"a.txt{suffix}").read_bytes()
+    assert len(data) < 200
+    # the same content creates the same file
+    assert data == (tmp_path / f"b.txt{suffix}").read_bytes()
+
+    with snapshot_env():
+        assert decompressed(tmp_path / f"a.txt{suffix}", ".txt").read_bytes() == (
+            b"line\n" * 1000
+        )
+
+    assert decompressed(source, ".txt") == source
+
+
+def test_uuid_compression():
+    Example(
+        {
+            "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "short" == external()
+    assert "long\\n" * 10 == external()
+""",
+            "pyproject.toml": """\
+[tool.inline-snapshot]
+compression="gzip"
+compression-threshold=20
+""",
+        }
+    ).run_inline(
+        ["--inline-snapshot=create"],
+        changed_files=snapshot(
+            {
+                "tests/__inline_snapshot__/test_something/test_a/e3e70682-c209-4cac-a29f-6fbed82c07cd.txt": "short",
+                "tests/__inline_snapshot__/test_something/test_a/f728b4fa-4248-4e3a-8a5d-2f346baa9455.txt.gz": b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x02\xff\xcb\xc9\xcfK\xe7\xca!\x85\x00\x00<%6\xfe2\x00\x00\x00",
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "short" == external("uuid:e3e70682-c209-4cac-a29f-6fbed82c07cd.txt")
+    assert "long\\n" * 10 == external("uuid:f728b4fa-4248-4e3a-8a5d-2f346baa9455.txt")
+""",
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    ).replace(
+        '"long\\n" * 10', '"long\\n" * 2'
+    ).run_inline(
+        ["--inline-snapshot=fix"],
+        changed_files=snapshot(
+            {
+                "tests/__inline_snapshot__/test_something/test_a/f728b4fa-4248-4e3a-8a5d-2f346baa9455.txt": """\
+long
+long
+""",
+                "tests/__inline_snapshot__/test_something/test_a/f728b4fa-4248-4e3a-8a5d-2f346baa9455.txt.gz": None,
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    )
+
+
+def test_hash_compression():
+    Example(
+        {
+            "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "long\\n" * 10 == external()
+""",
+            "pyproject.toml": """\
+[tool.inline-snapshot]
+default-storage="hash"
+compression="lzma"
+compression-threshold=20
+""",
+        }
+    ).run_inline(
+        ["--inline-snapshot=create"],
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/external/bdd917e0675880c5f92d05697483da49b781f63b1f6915afa718e2c784fdb006.txt.xz": b"\xfd7zXZ\x00\x00\x04\xe6\xd6\xb4F\x02\x00!\x01\x16\x00\x00\x00t/\xe5\xa3\xe0\x001\x00\x0b]\x006\x1b\xca\x18\x9aJ\x0fI\xf5@\x00\x00\x00 s\x99}\xf0T\xa3\x04\x00\x01'2\xceV\x942\x1f\xb6\xf3}\x01\x00\x00\x00\x00\x04YZ",
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "long\\n" * 10 == external("hash:bdd917e06758*.txt")
+""",
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    ).replace(
+        '"long\\n" * 10', '"long\\n" * 11'
+    ).run_inline(
+        ["--inline-snapshot=fix,trim"],
+        reported_categories=snapshot({"fix"}),
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/external/7d29c47911b9ce80db623043a5bab17e26398d802a73cd3aab9a04fb8b48ef98.txt.xz": b"\xfd7zXZ\x00\x00\x04\xe6\xd6\xb4F\x02\x00!\x01\x16\x00\x00\x00t/\xe5\xa3\xe0\x006\x00\x0b]\x006\x1b\xca\x18\x9aJ\x12\xd5\xd9@\x00\x00\x00k\x8ela\xaf\xea\x87\xdf\x00\x01'7A\xa2\xfeB\x1f\xb6\xf3}\x01\x00\x00\x00\x00\x04YZ",
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "long\\n" * 11 == external("hash:7d29c47911b9*.txt")
+""",
+                ".inline-snapshot/external/bdd917e0675880c5f92d05697483da49b781f63b1f6915afa718e2c784fdb006.txt.xz": None,
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    )
+
+
+def test_pack_compression():
+    Example(
+        {
+            "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "long\\n" * 10 == external()
+""",
+            "pyproject.toml": """\
+[tool.inline-snapshot]
+default-storage="pack"
+compression="bz2"
+compression-threshold=20
+""",
+        }
+    ).run_inline(
+        ["--inline-snapshot=create"],
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/pack/externals-0.pack": b"BZh91AY&SY\xd9\x11\xd2\xcd\x00\x00\x0e\xc1\x00\x00\x10\x00\x85\xa0\x00 \xa5\x13A\x9a\x0cO&\xa7''\xc5\xdc\x91N\x14$6Dt\xb3@",
+                ".inline-snapshot/pack/index.sqlite": IsBytes(),
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "long\\n" * 10 == external("pack:bdd917e06758*.txt")
+""",
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    ).replace(
+        '"long\\n" * 10', '"long\\n" * 11'
+    ).run_inline(
+        ["--inline-snapshot=fix,trim"],
+        reported_categories=snapshot({"fix"}),
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/pack/externals-1.pack": b"BZh91AY&SY\xcd\xaf\x86\xa2\x00\x00\x10A\x00\x00\x10\x00\x85\xa0\x000\xcd\x00\x9a\xa2i\x85\xe2\xd2\xe2\xe2\xf8\xbb\x92)\xc2\x84\x86m|5\x10",
+                ".inline-snapshot/pack/index.sqlite": IsBytes(),
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "long\\n" * 11 == external("pack:7d29c47911b9*.txt")
+""",
+                ".inline-snapshot/pack/externals-0.pack": None,
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    )
@@ -1,3 +1,7 @@
+from pathlib import Path
+
+import pytest
+
 from inline_snapshot._inline_snapshot import snapshot
 from inline_snapshot.testing._example import Example
 
@@ -53,3 +57,160 @@ def test_a():
             }
         ),
     )
+
+
+def test_hash_index(tmp_path, mocker):
+    import pytest
+
+    from inline_snapshot._external._external_location import ExternalLocation
+    from inline_snapshot._external._storage import HashStorage
+    from inline_snapshot._external._storage import StorageLookupError
+
+    names = ["aaaa1.txt", "aaab2.txt", "aaab3.txt", "aaab4.json", "bbbb.txt"]
+    for name in names:
+        (tmp_path / name).write_text(name)
+
+    storage = HashStorage(tmp_path)
+    iterdir = mocker.spy(type(tmp_path), "iterdir")
+
+    assert storage._lookup_path("aaaa*.txt") == tmp_path / "aaaa1.txt"
+    assert storage._lookup_path("bbbb.txt") == tmp_path / "bbbb.txt"
+    assert storage.lookup_all("aaab*.txt") == {"aaab2.txt", "aaab3.txt"}
+    assert storage.lookup_all("aaab4.json") == {"aaab4.json"}
+    assert storage.lookup_all("aaab4*.txt") == set()
+
+    with pytest.raises(StorageLookupError, match="hash collision"):
+        storage._lookup_path("aaab*.txt")
+
+    # the directory is read once
+    assert iterdir.call_count == 1
+
+    storage.delete(ExternalLocation.from_name("hash:bbbb*.txt"))
+    assert storage.lookup_all("bbbb*.txt") == set()
+
+    # files which are created by someone else are found after a lookup miss
+    (tmp_path / "cccc.txt").write_text("c")
+    assert storage._lookup_path("cccc*.txt") == tmp_path / "cccc.txt"
+
+
+def test_hash_algorithm():
+    Example(
+        {
+            "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "a" == external("hash:")
+""",
+            "pyproject.toml": """\
+[tool.inline-snapshot]
+hash-algorithm="blake2b"
+""",
+        }
+    ).run_inline(
+        ["--inline-snapshot=create"],
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/external/333fcb4ee1aa7c115355ec66ceac917c8bfd815bf7587d325aec1864edd24e34d5abe2c6b1b5ee3face62fed78dbef802f2a85cb91d455a8f5249d330853cb3c.txt": "a",
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "a" == external("hash:333fcb4ee1aa*.txt")
+""",
+            }
+        ),
+    ).run_inline()
+
+
+def test_store_reuses_hash(tmp_path, mocker):
+    from inline_snapshot._external._external_location import ExternalLocation
+    from inline_snapshot._external._storage import HashStorage
+    from inline_snapshot._external._storage import _hash
+    from inline_snapshot._global_state import snapshot_env
+
+    new_file = tmp_path / "new.txt"
+    new_file.write_bytes(b"a" * 1000000)
+
+    storage = HashStorage(tmp_path / "external")
+    file_digest = mocker.spy(_hash, "file_digest")
+
+    with snapshot_env():
+        location = storage.new_location(
+            ExternalLocation.from_name("hash:.txt"), new_file
+        )
+        storage.store(location, new_file)
+
+    assert file_digest.call_count == 1
+
+    with storage.load(location) as stored:
+        assert stored.read_bytes() == new_file.read_bytes()
+
+
+def test_stored_file_is_a_copy(tmp_path):
+    from inline_snapshot._external._external_location import ExternalLocation
+    from inline_snapshot._external._storage import HashStorage
+    from inline_snapshot._global_state import snapshot_env
+
+    new_file = tmp_path / "new.txt"
+    new_file.write_bytes(b"a")
+
+    storage = HashStorage(tmp_path / "external")
+
+    with snapshot_env():
+        location = storage.new_location(
+            ExternalLocation.from_name("hash:.txt"), new_file
+        )
+        storage.store(location, new_file)
+
+    # the new file can be written in place without changing the stored file
+    with new_file.open("r+b") as f:
+        f.write(b"b")
+
+    with storage.load(location) as stored:
+        assert stored.read_bytes() == b"a"
+
+    assert storage.list() == {stored.name}
+
+
+@pytest.mark.parametrize("same_file_system", [True, False])
+def test_store_moves_session_file(tmp_path, mocker, same_file_system):
+    import errno
+    import os
+
+    from inline_snapshot._external._external_location import ExternalLocation
+    from inline_snapshot._external._storage import HashStorage
+    from inline_snapshot._external._storage import _hash
+    from inline_snapshot._global_state import snapshot_env
+
+    storage = HashStorage(tmp_path / "external")
+
+    replace = os.replace
+
+    def cross_device_replace(source, target):
+        # the temporary files of the session are on another file system
+        if Path(source).name.startswith("tmp-path-"):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        replace(source, target)
+
+    if not same_file_system:
+        mocker.patch.object(_hash.os, "replace", cross_device_replace)
+
+    copy = mocker.spy(_hash.shutil, "copy")
+
+    with snapshot_env() as state:
+        new_file = state.new_tmp_path(".txt")
+        new_file.write_bytes(b"a")
+
+        location = storage.new_location(
+            ExternalLocation.from_name("hash:.txt"), new_file
+        )
+        storage.store(location, new_file)
+
+        # the temporary file of the session is moved into the storage and
+        # only copied to another file system
+        assert new_file.exists() != same_file_system
+        assert copy.call_count == (0 if same_file_system else 1)
+
+        with storage.load(location) as stored:
+            assert stored.read_bytes() == b"a"
+
+    assert storage.list() == {stored.name}
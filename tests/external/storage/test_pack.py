@@ -0,0 +1,187 @@
+from dirty_equals import IsBytes
+
+from inline_snapshot import snapshot
+from inline_snapshot._external._external_location import ExternalLocation
+from inline_snapshot._external._storage import PackStorage
+from inline_snapshot._global_state import snapshot_env
+from inline_snapshot.testing._example import Example
+
+
+def test_pack_storage():
+    Example(
+        {
+            "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "a" == external()
+    assert ["b"] == external()
+""",
+            "pyproject.toml": """\
+[tool.inline-snapshot]
+default-storage="pack"
+""",
+        }
+    ).run_inline(
+        ["--inline-snapshot=create"],
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/pack/externals-0.pack": """\
+a[
+  "b"
+]\
+""",
+                ".inline-snapshot/pack/index.sqlite": IsBytes(),
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "a" == external("pack:ca978112ca1b*.txt")
+    assert ["b"] == external("pack:495baba8d0a0*.json")
+""",
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    ).replace(
+        '["b"] == external("pack:495baba8d0a0*.json")',
+        '["c"] == external("pack:495baba8d0a0*.json")',
+    ).run_inline(
+        ["--inline-snapshot=fix,trim"],
+        reported_categories=snapshot({"fix"}),
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/pack/externals-1.pack": """\
+a[
+  "c"
+]\
+""",
+                ".inline-snapshot/pack/index.sqlite": IsBytes(),
+                "tests/test_something.py": """\
+from inline_snapshot import external
+def test_a():
+    assert "a" == external("pack:ca978112ca1b*.txt")
+    assert ["c"] == external("pack:8daef5db335d*.json")
+""",
+                ".inline-snapshot/pack/externals-0.pack": None,
+            }
+        ),
+    ).run_inline(
+        reported_categories=snapshot(set())
+    )
+
+
+def test_pack_storage_flush(tmp_path):
+    storage = PackStorage(tmp_path / "pack")
+
+    def new_file(content):
+        path = tmp_path / f"{content}.txt"
+        path.write_text(content)
+        return path
+
+    def load(location):
+        with storage.load(location) as path:
+            return path.read_text()
+
+    with snapshot_env():
+        locations = {}
+        for content in ["a", "b", "c"]:
+            file = new_file(content)
+            location = storage.new_location(
+                ExternalLocation.from_name("pack:.txt"), file
+            )
+            storage.store(location, file)
+            locations[content] = location
+
+        # new files can be loaded before they are written
+        assert load(locations["a"]) == "a"
+        assert not storage.directory.exists()
+
+        storage.flush()
+        files_after_store = sorted(p.name for p in storage.directory.iterdir())
+
+        storage = PackStorage(tmp_path / "pack")
+        assert [load(locations[c]) for c in "abc"] == ["a", "b", "c"]
+
+        storage.delete(locations["b"])
+        assert storage.lookup_all(locations["b"].path) == set()
+        storage.flush()
+
+        files_after_delete = sorted(p.name for p in storage.directory.iterdir())
+        assert (storage.directory / "externals-1.pack").read_bytes() == b"ac"
+
+        storage = PackStorage(tmp_path / "pack")
+        assert load(locations["c"]) == "c"
+        unused = [
+            location.path
+            for location in storage.find_unused_externals([locations["a"]])
+        ]
+
+    assert files_after_store == snapshot(["externals-0.pack", "index.sqlite"])
+    # the pack is compacted
+    assert files_after_delete == snapshot(["externals-1.pack", "index.sqlite"])
+    assert unused == snapshot(
+        ["2e7d2c03a9507ae265ecf5b5356885a53393a2029d241394997265a1a25aefc6.txt"]
+    )
+
+
+def test_pack_storage_connection(tmp_path, mocker):
+    import sqlite3
+
+    file = tmp_path / "a.txt"
+    file.write_text("a")
+
+    with snapshot_env():
+        storage = PackStorage(tmp_path / "pack")
+        location = storage.new_location(ExternalLocation.from_name("pack:.txt"), file)
+        storage.store(location, file)
+        storage.flush()
+
+        connect = mocker.spy(sqlite3, "connect")
+
+        storage = PackStorage(tmp_path / "pack")
+        for _ in range(3):
+            assert storage.lookup_all(location.path)
+            with storage.load(location) as path:
+                assert path.read_text() == "a"
+
+        # the connection is reused for all lookups
+        assert connect.call_count == 1
+
+        storage.flush()
+        assert storage._db is None
+
+
+def test_pack_storage_threads(tmp_path):
+    import sys
+
+    from inline_snapshot._parallel import parallel_map
+
+    files = []
+    for i in range(200):
+        file = tmp_path / f"{i}.txt"
+        file.write_text(str(i))
+        files.append(file)
+
+    # the threads are switched often to find races
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        with snapshot_env():
+            storage = PackStorage(tmp_path / "pack")
+            locations = [
+                storage.new_location(ExternalLocation.from_name("pack:.txt"), file)
+                for file in files
+            ]
+
+            # store() reads and changes the collected files in every thread
+            parallel_map(lambda args: storage.store(*args), list(zip(locations, files)))
+            parallel_map(storage.delete, locations[:100])
+            storage.flush()
+
+            storage = PackStorage(tmp_path / "pack")
+            assert len(storage.list()) == 100
+            for i, location in enumerate(locations[100:], 100):
+                with storage.load(location) as path:
+                    assert path.read_text() == str(i)
+    finally:
+        sys.setswitchinterval(switch_interval)
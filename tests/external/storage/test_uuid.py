@@ -235,3 +235,64 @@ https://15r10nk.github.io/inline-snapshot/latest/external/external/#uuid)
 
 """)
     )
+
+
+def test_uuid_manifest(tmp_path):
+    import os
+
+    from inline_snapshot._external._storage._uuid import UuidManifest
+
+    tests = tmp_path / "tests"
+    folder = tests / "__inline_snapshot__" / "test_a" / "test_a"
+    folder.mkdir(parents=True)
+    file_a = folder / "f728b4fa-4248-4e3a-8a5d-2f346baa9455.txt"
+    file_a.write_text("a")
+
+    manifest_dir = tmp_path / "cache"
+
+    manifest = UuidManifest(manifest_dir, [tests])
+    assert manifest._rebuilt
+    assert manifest.files == {file_a.name: file_a}
+
+    # the saved manifest is used when nothing has changed
+    manifest = UuidManifest(manifest_dir, [tests])
+    assert not manifest._rebuilt
+    assert manifest.files == {file_a.name: file_a}
+
+    # files which are stored by inline-snapshot update the manifest
+    file_b = folder / "e3e70682-c209-4cac-a29f-6fbed82c07cd.txt"
+    file_b.write_text("b")
+    manifest.add(file_b)
+
+    manifest = UuidManifest(manifest_dir, [tests])
+    assert not manifest._rebuilt
+    assert set(manifest.files) == {file_a.name, file_b.name}
+
+    # the manifest is rebuilt when the folders are changed by someone else
+    file_a.unlink()
+    os.utime(folder, ns=(0, 0))
+
+    manifest = UuidManifest(manifest_dir, [tests])
+    assert manifest._rebuilt
+    assert manifest.files == {file_b.name: file_b}
+
+    # new __inline_snapshot__ folders are found without a trim run
+    new_folder = tests / "sub" / "__inline_snapshot__" / "test_c" / "test_c"
+    new_folder.mkdir(parents=True)
+    file_c = new_folder / "1b6453b3-59d6-4a7d-9a38-d0a5d1b3bca0.txt"
+    file_c.write_text("c")
+
+    manifest = UuidManifest(manifest_dir, [tests])
+    assert manifest._rebuilt
+    assert set(manifest.files) == {file_b.name, file_c.name}
+
+    # folders which are created by inline-snapshot are added to the manifest
+    new_folder = tests / "__inline_snapshot__" / "test_d" / "test_d"
+    new_folder.mkdir(parents=True)
+    file_d = new_folder / "58a3e5a6-b0a4-4a8d-8e8c-2f4c1a8d7e66.txt"
+    file_d.write_text("d")
+    manifest.add(file_d)
+
+    manifest = UuidManifest(manifest_dir, [tests])
+    assert not manifest._rebuilt
+    assert set(manifest.files) == {file_b.name, file_c.name, file_d.name}
@@ -19,12 +19,12 @@ def test_external_location():
             ".txt": ExternalLocation(storage="uuid", stem="", suffix=".txt"),
             ".b.txt": ExternalLocation(storage="uuid", stem="", suffix=".b.txt"),
             """""": ExternalLocation(storage="uuid", stem="", suffix=""),
-            "invalid:a.txt": "ValueError: storage has to be hash or uuid",
-            "invalid:a.b.txt": "ValueError: storage has to be hash or uuid",
-            "invalid:a": "ValueError: storage has to be hash or uuid",
-            "invalid:.txt": "ValueError: storage has to be hash or uuid",
-            "invalid:.b.txt": "ValueError: storage has to be hash or uuid",
-            "invalid:": "ValueError: storage has to be hash or uuid",
+            "invalid:a.txt": "ValueError: storage has to be hash, uuid or pack",
+            "invalid:a.b.txt": "ValueError: storage has to be hash, uuid or pack",
+            "invalid:a": "ValueError: storage has to be hash, uuid or pack",
+            "invalid:.txt": "ValueError: storage has to be hash, uuid or pack",
+            "invalid:.b.txt": "ValueError: storage has to be hash, uuid or pack",
+            "invalid:": "ValueError: storage has to be hash, uuid or pack",
         }
     )
 
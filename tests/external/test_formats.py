@@ -1,4 +1,14 @@
+import datetime
+import sys
+import uuid
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
 from inline_snapshot import snapshot
+from inline_snapshot._external._format._json import JsonFormat
+from inline_snapshot._external._format._protocol import get_format_handler_from_suffix
 from inline_snapshot.testing._example import Example
 
 
@@ -307,3 +317,260 @@ E           inline_snapshot._exceptions.UsageError: Multiple format handlers fou
         returncode=snapshot(1),
         outcomes={"failed": 1},
     )
+
+
+@pytest.mark.parametrize(
+    "suffix,value",
+    [
+        (".json", {"a": [1, 2.5, None, "Тест"]}),
+        (".txt", "a\r\nb\n"),
+        (".bin", b"\x00\xff"),
+    ],
+)
+def test_canonical_bytes(tmp_path, suffix, value):
+    format = get_format_handler_from_suffix(suffix)
+    path = tmp_path / f"value{suffix}"
+    format.encode(value, path)
+
+    assert format.canonical_bytes(value) == path.read_bytes()
+
+
+def test_canonical_bytes_without_decode(mocker):
+    decode = mocker.spy(JsonFormat, "decode")
+
+    Example(
+        {
+            "tests/test_something.py": """\
+from inline_snapshot import external
+
+def test_a():
+    assert {"a": [1, 2]} == external("uuid:e3e70682-c209-4cac-a29f-6fbed82c07cd.json")
+    assert [1, 2] == external("uuid:f728b4fa-4248-4e3a-8a5d-2f346baa9455.json")
+""",
+            "tests/__inline_snapshot__/test_something/test_a/e3e70682-c209-4cac-a29f-6fbed82c07cd.json": """\
+{
+  "a": [
+    1,
+    2
+  ]
+}\
+""",
+            "tests/__inline_snapshot__/test_something/test_a/f728b4fa-4248-4e3a-8a5d-2f346baa9455.json": """\
+[1, 2]\
+""",
+        }
+    ).run_inline(reported_categories=set())
+
+    # only the file which is not formatted like json.dump() is decoded
+    assert decode.call_count == 1
+
+
+def test_binary_diff(monkeypatch):
+    from difflib import unified_diff
+
+    from inline_snapshot._external import _diff
+    from inline_snapshot._external._diff import binary_diff
+    from inline_snapshot._external._diff import hexdump
+
+    def full_diff(original, new):
+        return "\n".join(
+            list(
+                unified_diff(hexdump(original).splitlines(), hexdump(new).splitlines())
+            )[2:]
+        ).strip()
+
+    # small blocks to test changes at the block borders
+    monkeypatch.setattr(_diff, "diff_block_size", 64)
+
+    data = bytes(range(256)) * 4
+    for new in [
+        data,
+        data[:500],
+        data + b"abc",
+        data[:63] + b"x" + data[64:],
+        data[:64] + b"x" + data[65:900] + b"y" + data[901:],
+        data[:100] + b"x" + data[100:],
+        b"",
+    ]:
+        assert binary_diff(data, new) == full_diff(data, new)
+        assert binary_diff(new, data) == full_diff(new, data)
+
+    assert binary_diff(data, data[:63] + b"x" + data[64:]) == snapshot("""\
+@@ -1,7 +1,7 @@
+
+ 00000000: 0001 0203 0405 0607 0809 0a0b 0c0d 0e0f |................|
+ 00000010: 1011 1213 1415 1617 1819 1a1b 1c1d 1e1f |................|
+ 00000020: 2021 2223 2425 2627 2829 2a2b 2c2d 2e2f | !"#$%&'()*+,-./|
+-00000030: 3031 3233 3435 3637 3839 3a3b 3c3d 3e3f |0123456789:;<=>?|
++00000030: 3031 3233 3435 3637 3839 3a3b 3c3d 3e78 |0123456789:;<=>x|
+ 00000040: 4041 4243 4445 4647 4849 4a4b 4c4d 4e4f |@ABCDEFGHIJKLMNO|
+ 00000050: 5051 5253 5455 5657 5859 5a5b 5c5d 5e5f |PQRSTUVWXYZ[\\]^_|
+ 00000060: 6061 6263 6465 6667 6869 6a6b 6c6d 6e6f |`abcdefghijklmno|\
+""")
+
+
+def test_format_dispatch_cache(mocker):
+    from inline_snapshot._external._format import _json
+    from inline_snapshot._external._format._protocol import encoding_cache
+    from inline_snapshot._external._format._protocol import get_format_handler
+    from inline_snapshot._external._format._text import TextFormat
+    from inline_snapshot._global_state import snapshot_env
+
+    text_is_format_for = mocker.spy(TextFormat, "is_format_for")
+    encode_json = mocker.spy(_json, "encode_json")
+
+    with snapshot_env():
+        for text in ["a", "b", "c"]:
+            assert get_format_handler(text, "").suffix == ".txt"
+
+        # the .txt format is checked once for every type and the
+        # .json format is not checked, because it has a lower priority
+        assert text_is_format_for.call_count == 1
+        assert encode_json.call_count == 0
+
+        with encoding_cache():
+            value = {"a": [1, 2]}
+            format = get_format_handler(value, "")
+            assert (
+                format.canonical_bytes(value) == b'{\n  "a": [\n    1,\n    2\n  ]\n}'
+            )
+
+        # the value is checked and encoded in one pass
+        assert encode_json.call_count == 1
+
+
+json_values = st.recursive(
+    st.none() | st.booleans() | st.integers() | st.floats() | st.text(),
+    lambda children: st.lists(children)
+    | st.tuples(children)
+    | st.dictionaries(st.text(), children),
+)
+
+
+@given(value=json_values)
+def test_orjson_backend_compatibility(value):
+    orjson = pytest.importorskip("orjson")
+    from inline_snapshot._external._format._json import json_text
+    from inline_snapshot._external._format._json import orjson_bytes
+
+    data = orjson_bytes(orjson, value)
+
+    if data is not None:
+        # orjson is only used if it creates the same file
+        assert data.decode("utf-8") == json_text(value)
+
+
+class StrSubclass(str):
+    pass
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        (1, 2),
+        [float("nan")],
+        {"a": float("-inf")},
+        2**64,
+        {1: 2},
+        StrSubclass("a"),
+        uuid.UUID(int=1),
+        datetime.date(2024, 1, 1),
+    ],
+)
+def test_orjson_unsupported(value, mocker):
+    orjson = pytest.importorskip("orjson")
+    from inline_snapshot._external._format._json import orjson_bytes
+
+    dumps = mocker.spy(orjson, "dumps")
+
+    # the value is rejected before it is encoded
+    assert orjson_bytes(orjson, value) is None
+    assert dumps.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        1e16,
+        -1.5e-7,
+        1e-5,
+        0.0001,
+        1.7976931348623157e308,
+        {"a 1e16": [1e16, "0.00001", 2.5e-5]},
+        2**70,
+        float("nan"),
+        [float("inf")],
+        (1, 2),
+        {1: 2},
+        "\x00\x1f\x7f ",
+    ],
+)
+def test_orjson_backend(tmp_path, value):
+    pytest.importorskip("orjson")
+    from inline_snapshot._global_state import snapshot_env
+    from inline_snapshot._global_state import state
+
+    with snapshot_env():
+        state().config.json_backend = "orjson"
+        format = JsonFormat()
+        path = tmp_path / "value.json"
+        format.encode(value, path)
+        orjson_data = path.read_bytes()
+        orjson_value = format.decode(path)
+
+    format.encode(value, path)
+    assert orjson_data == path.read_bytes()
+    assert repr(orjson_value) == repr(format.decode(path))
+
+
+def test_orjson_backend_not_installed(monkeypatch):
+    from inline_snapshot._external._format._json import json_bytes
+    from inline_snapshot._global_state import snapshot_env
+    from inline_snapshot._global_state import state
+
+    monkeypatch.setitem(sys.modules, "orjson", None)
+
+    with snapshot_env():
+        state().config.json_backend = "orjson"
+        assert json_bytes([1]) == b"[\n  1\n]"
+        problems = state().all_problems
+
+    assert problems == snapshot({"""\
+[b]json-backend is "orjson" but orjson is not installed.[/b]
+You can install inline-snapshot\\[orjson] to use it.
+The json module is used instead.\
+"""})
+
+
+@pytest.mark.parametrize(
+    "suffix,value",
+    [
+        (".json", [1.5, float("nan")]),
+        (".json", {"a": float("nan")}),
+        (".txt", type("Text", (str,), {})("a")),
+        (".bin", type("Binary", (bytes,), {})(b"a")),
+    ],
+)
+def test_no_canonical_bytes(suffix, value):
+    format = get_format_handler_from_suffix(suffix)
+
+    # equal bytes do not mean that the value is equal to the decoded value
+    assert format.canonical_bytes(value) is None
+
+
+def test_canonical_bytes_nan():
+    Example(
+        {
+            "tests/test_something.py": """\
+from inline_snapshot import external
+
+def test_a():
+    assert [float("nan")] == external("uuid:e3e70682-c209-4cac-a29f-6fbed82c07cd.json")
+""",
+            "tests/__inline_snapshot__/test_something/test_a/e3e70682-c209-4cac-a29f-6fbed82c07cd.json": """\
+[
+  NaN
+]\
+""",
+        }
+    ).run_inline(reported_categories=snapshot({"fix"}))
@@ -0,0 +1,57 @@
+import os
+
+from inline_snapshot._external import _usage_index
+from inline_snapshot._external._external_location import ExternalLocation
+from inline_snapshot._external._usage_index import ExternalUsageIndex
+
+
+def test_usage_index(tmp_path, mocker):
+    test_file = tmp_path / "test_a.py"
+    test_file.write_text("""\
+from inline_snapshot import external
+
+def test_a():
+    assert "a" == external("uuid:f728b4fa-4248-4e3a-8a5d-2f346baa9455.txt")
+""")
+    other_file = tmp_path / "test_b.py"
+    other_file.write_text("def test_b(): pass\n")
+
+    index_dir = tmp_path / "cache"
+    used_externals_in = mocker.spy(_usage_index, "used_externals_in")
+
+    expected = [
+        ExternalLocation(
+            "uuid",
+            "f728b4fa-4248-4e3a-8a5d-2f346baa9455",
+            ".txt",
+            test_file,
+            None,
+            4,
+        )
+    ]
+
+    index = ExternalUsageIndex(index_dir, "uuid")
+    assert index.used_externals(test_file) == expected
+    assert index.used_externals(other_file) == []
+    index.save()
+    assert used_externals_in.call_count == 2
+
+    # unchanged files are not parsed again
+    index = ExternalUsageIndex(index_dir, "uuid")
+    assert index.used_externals(test_file) == expected
+    assert used_externals_in.call_count == 2
+
+    # only the changed file is parsed again
+    test_file.write_text("def test_a(): pass\n")
+    os.utime(test_file, ns=(0, 0))
+    assert index.used_externals(test_file) == []
+    assert used_externals_in.call_count == 3
+    index.save()
+
+    # test_b.py was not used in the last session and is removed from the index
+    index = ExternalUsageIndex(index_dir, "uuid")
+    assert set(index._entries) == {str(test_file)}
+
+    # the index is invalid if the default storage changes
+    index = ExternalUsageIndex(index_dir, "hash")
+    assert index._entries == {}
@@ -0,0 +1,43 @@
+import os
+
+from inline_snapshot._external._format._protocol import get_format_handler_from_suffix
+from inline_snapshot._external._value_cache import DecodedValueCache
+
+
+def test_value_cache(tmp_path, mocker):
+    file = tmp_path / "data.json"
+    file.write_text('{"a": [1, 2]}')
+
+    format = get_format_handler_from_suffix(".json")
+    decode = mocker.spy(format, "decode")
+    cache = DecodedValueCache()
+
+    value = cache.decode(format, file)
+    assert value == {"a": [1, 2]}
+
+    # the caller gets a copy which can be changed
+    value["a"].append(3)
+    assert cache.decode(format, file) == {"a": [1, 2]}
+    assert decode.call_count == 1
+
+    # changed files are decoded again
+    file.write_text('{"a": [1, 2, 3]}')
+    os.utime(file, ns=(0, 0))
+    assert cache.decode(format, file) == {"a": [1, 2, 3]}
+    assert decode.call_count == 2
+
+
+def test_value_cache_lru(tmp_path):
+    format = get_format_handler_from_suffix(".txt")
+    cache = DecodedValueCache(max_size=10)
+
+    files = []
+    for name in "abc":
+        file = tmp_path / f"{name}.txt"
+        file.write_text(name * 4)
+        files.append(file)
+        assert cache.decode(format, file) == name * 4
+
+    # only the last two files fit into the cache
+    assert len(cache._entries) == 2
+    assert [key[0].name for key in cache._entries] == ["b.txt", "c.txt"]
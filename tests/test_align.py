@@ -1,6 +1,13 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
 from inline_snapshot import snapshot
 from inline_snapshot._align import add_x
 from inline_snapshot._align import align
+from inline_snapshot._align import nw_align
+from inline_snapshot._customize._custom_code import CustomCode
+from inline_snapshot._customize._custom_sequence import CustomList
+from inline_snapshot._customize._custom_unmanaged import CustomUnmanaged
 
 
 def test_align():
@@ -8,3 +15,79 @@ def test_align():
 
     assert align("abbc", "axyc") == snapshot("mddiim")
     assert add_x(align("abbc", "axyc")) == snapshot("mxxm")
+
+
+def matrix_align(seq_a, seq_b) -> str:
+    # Needleman-Wunsch with the full matrix
+    matrix: list = [[(0, "e")] + [(0, "i")] * len(seq_b)]
+
+    for a in seq_a:
+        last = matrix[-1]
+
+        new_line = [(0, "d")]
+        for bi, b in enumerate(seq_b, 1):
+            la, lc, lb = new_line[-1], last[bi - 1], last[bi]
+            values = [(la[0], "i"), (lb[0], "d")]
+            if a == b:
+                values.append((lc[0] + 1, "m"))
+
+            new_line.append(max(values))
+        matrix.append(new_line)
+
+    ai = len(seq_a)
+    bi = len(seq_b)
+    d = ""
+    track = ""
+
+    while d != "e":
+        _, d = matrix[ai][bi]
+        if d == "m":
+            ai -= 1
+            bi -= 1
+        elif d == "i":
+            bi -= 1
+        elif d == "d":
+            ai -= 1
+        if d != "e":
+            track += d
+
+    return track[::-1]
+
+
+@given(seq_a=st.text("abc", max_size=30), seq_b=st.text("abc", max_size=30))
+def test_align_like_matrix(seq_a, seq_b):
+    assert nw_align(seq_a, seq_b) == matrix_align(seq_a, seq_b)
+
+
+@given(
+    seq_a=st.lists(st.sampled_from([1, 2, [1], [2], {"a": 1}]), max_size=12),
+    seq_b=st.lists(st.sampled_from([1, 2, [1], [2], {"a": 1}]), max_size=12),
+)
+def test_align_custom_like_matrix(seq_a, seq_b):
+    def to_custom(value):
+        if isinstance(value, list):
+            return CustomList([to_custom(v) for v in value])
+        return CustomCode(value, repr(value))
+
+    custom_a = [to_custom(v) for v in seq_a]
+    custom_b = [to_custom(v) for v in seq_b]
+    assert nw_align(custom_a, custom_b) == matrix_align(seq_a, seq_b)
+
+
+def test_align_large():
+    old = list(range(20000))
+    new = old[1:10000] + [-1] + old[10000:-1] + [-2]
+
+    assert align(old, new) == "d" + "m" * 9999 + "i" + "m" * 9999 + "di"
+
+
+def test_align_unmanaged():
+    class AnyInt:
+        def __eq__(self, other):
+            return isinstance(other, int)
+
+    # unmanaged values are compared with ==
+    old = [CustomCode(1), CustomUnmanaged(AnyInt()), CustomCode(3), CustomCode(4)]
+    new = [CustomCode(2), CustomCode(3), CustomCode(5), CustomCode(1), CustomCode(4)]
+
+    assert nw_align(old, new) == matrix_align(old, new) == snapshot("dmmiim")
@@ -1,4 +1,5 @@
 import dataclasses
+import threading
 from collections import Counter
 from collections import OrderedDict
 from collections import UserDict
@@ -6,6 +7,7 @@ from collections import UserList
 from collections import defaultdict
 from collections import namedtuple
 from dataclasses import dataclass
+from enum import Enum
 from typing import NamedTuple
 
 import pytest
@@ -148,6 +150,7 @@ def test_enum_in_dataclass():
 from inline_snapshot import snapshot
 from enum import Enum
 from dataclasses import dataclass
+from enum import Enum
 
 class color(Enum):
     red="red"
@@ -167,6 +170,7 @@ def test_a():
 from inline_snapshot import snapshot
 from enum import Enum
 from dataclasses import dataclass
+from enum import Enum
 
 class color(Enum):
     red="red"
@@ -429,3 +433,135 @@ def test():
         returncode=snapshot(1),
         outcomes={"passed": 1, "errors": 1},
     )
+
+
+def test_scalars():
+    class MyInt(int):
+        def __repr__(self):
+            return f"MyInt({int(self)})"
+
+    values = [
+        0,
+        -5,
+        10**30,
+        True,
+        None,
+        1.5,
+        -0.0,
+        float("inf"),
+        1e100,
+        "",
+        "a'b\"c",
+        "\x00ሴ",
+        b"",
+        b"a\x00'",
+        MyInt(5),
+    ]
+
+    assert [code_repr(v) for v in values] == snapshot(
+        [
+            "0",
+            "-5",
+            "1000000000000000000000000000000",
+            "True",
+            "None",
+            "1.5",
+            "-0.0",
+            "inf",
+            "1e+100",
+            "''",
+            "'a\\'b\"c'",
+            "'\\x00ሴ'",
+            "b''",
+            'b"a\\x00\'"',
+            "MyInt(5)",
+        ]
+    )
+
+
+def test_customize_repr_for_scalars():
+
+    Example(
+        {
+            "conftest.py": """\
+from inline_snapshot import customize_repr
+
+@customize_repr
+def _(value: int):
+    return f"int({value!r})"
+""",
+            "tests/test_something.py": """\
+from inline_snapshot import snapshot
+
+def test_a():
+    assert [1, "a"] == snapshot()
+""",
+        }
+    ).run_pytest(
+        ["--inline-snapshot=create"],
+        returncode=snapshot(1),
+        outcomes={"passed": 1, "errors": 1, "warnings": 2},
+        changed_files=snapshot({"tests/test_something.py": """\
+from inline_snapshot import snapshot
+
+def test_a():
+    assert [1, "a"] == snapshot([int(1), "a"])
+"""}),
+    )
+
+
+class ThreadEnum(Enum):
+    a = 1
+
+
+def test_recursive_repr_in_threads():
+    other_thread = []
+
+    class Thing:
+        def __repr__(self):
+            # repr() is only changed for the code generation
+            thread = threading.Thread(
+                target=lambda: other_thread.append(repr(ThreadEnum.a))
+            )
+            thread.start()
+            thread.join()
+
+            return f"Thing({repr(ThreadEnum.a)})"
+
+        def __eq__(self, other):
+            return isinstance(other, Thing)
+
+    assert code_repr(Thing()) == snapshot("Thing(ThreadEnum.a)")
+    assert other_thread == snapshot(["<ThreadEnum.a: 1>"])
+    assert repr(ThreadEnum.a) == snapshot("<ThreadEnum.a: 1>")
+
+
+def test_repr_is_only_replaced_for_recursive_repr():
+    import builtins
+
+    from inline_snapshot._code_repr import real_repr
+
+    replaced = {}
+
+    def record(name):
+        replaced[name] = builtins.repr is not real_repr
+
+    class Plain:
+        def __repr__(self):
+            record("Plain")
+            return "Plain()"
+
+        def __eq__(self, other):
+            return isinstance(other, Plain)
+
+    class Recursive:
+        def __repr__(self):
+            record("Recursive")
+            return f"Recursive({repr(ThreadEnum.a)})"
+
+        def __eq__(self, other):
+            return isinstance(other, Recursive)
+
+    assert code_repr(Plain()) == snapshot("Plain()")
+    assert code_repr(Recursive()) == snapshot("Recursive(ThreadEnum.a)")
+    assert replaced == {"Plain": False, "Recursive": True}
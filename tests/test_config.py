@@ -118,7 +118,57 @@ def test_incorrect_storage():
 default-storage="incorrect"
     """}).run_pytest(
         stderr=snapshot(
-            'ERROR: default-storage has to be uuid or hash but is "incorrect"\n'
+            'ERROR: default-storage has to be uuid, hash or pack but is "incorrect"\n'
+        ),
+        returncode=snapshot(4),
+        outcomes={},
+    )
+
+
+def test_incorrect_json_backend():
+    Example({"pyproject.toml": """
+[tool.inline-snapshot]
+json-backend="simplejson"
+    """}).run_pytest(
+        stderr=snapshot(
+            'ERROR: json-backend has to be json or orjson but is "simplejson"\n'
+        ),
+        returncode=snapshot(4),
+        outcomes={},
+    )
+
+
+def test_incorrect_compression():
+    Example({"pyproject.toml": """
+[tool.inline-snapshot]
+compression="zip"
+    """}).run_pytest(
+        stderr=snapshot(
+            'ERROR: compression has to be gzip, lzma or bz2 but is "zip"\n'
+        ),
+        returncode=snapshot(4),
+        outcomes={},
+    )
+
+    Example({"pyproject.toml": """
+[tool.inline-snapshot]
+compression-threshold="1MB"
+    """}).run_pytest(
+        stderr=snapshot(
+            'ERROR: compression-threshold has to be a number of bytes but is "1MB"\n'
+        ),
+        returncode=snapshot(4),
+        outcomes={},
+    )
+
+
+def test_incorrect_hash_algorithm():
+    Example({"pyproject.toml": """
+[tool.inline-snapshot]
+hash-algorithm="shake_128"
+    """}).run_pytest(
+        stderr=snapshot(
+            'ERROR: hash-algorithm "shake_128" is not supported, use one with a fixed digest size like "sha256" or "blake2b"\n'
         ),
         returncode=snapshot(4),
         outcomes={},
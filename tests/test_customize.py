@@ -367,3 +367,152 @@ def test():
     ).run_inline(
         ["--inline-snapshot=fix"], reported_categories=set()
     )
+
+
+def test_customize_dispatch():
+    import pluggy
+
+    from inline_snapshot._customize._dispatch import CustomizeDispatch
+    from inline_snapshot.plugin import InlineSnapshotPluginSpec
+    from inline_snapshot.plugin import customize
+    from inline_snapshot.plugin import hookimpl
+
+    calls = []
+
+    class Plugin:
+        @customize(types=(int,))
+        def positive_int(self, value):
+            calls.append(("positive_int", value))
+            if isinstance(value, int) and value > 0:
+                return "positive"
+
+        @customize(by_type=True)
+        def by_type(self, value):
+            calls.append(("by_type", value))
+
+        @customize(tryfirst=True)
+        def every_value(self, value, builder):
+            calls.append(("every_value", value))
+
+    pm = pluggy.PluginManager("inline_snapshot")
+    pm.add_hookspecs(InlineSnapshotPluginSpec)
+    pm.register(Plugin())
+
+    dispatch = CustomizeDispatch()
+
+    def call(value):
+        kwargs = dict(value=value, builder=None, local_vars={}, global_vars={})
+        result = dispatch.customize(pm, **kwargs)
+
+        dispatched_calls = len(calls)
+        assert result == pm.hook.customize(**kwargs)
+        del calls[dispatched_calls:]
+
+        return result
+
+    results = [call(value) for value in [1, "a", "b", -1, -2]]
+
+    assert results == snapshot(["positive", None, None, None, None])
+    assert calls == snapshot(
+        [
+            ("every_value", 1),
+            ("positive_int", 1),
+            ("every_value", "a"),
+            ("by_type", "a"),
+            ("every_value", "b"),
+            ("every_value", -1),
+            ("positive_int", -1),
+            ("by_type", -1),
+            ("every_value", -2),
+            ("positive_int", -2),
+        ]
+    )
+
+    class Wrapper:
+        @hookimpl(wrapper=True, specname="customize")
+        def wrapper(self, value):
+            result = yield
+            return result or "wrapped"
+
+    pm.register(Wrapper())
+    calls.clear()
+
+    # the wrapper is called by pluggy
+    assert call("c") == "wrapped"
+    assert calls == snapshot(
+        [("every_value", "c"), ("positive_int", "c"), ("by_type", "c")]
+    )
+
+
+def test_eval_cache():
+    from inline_snapshot._customize._custom_call import CustomCall
+    from inline_snapshot._customize._custom_code import CustomCode
+    from inline_snapshot._customize._custom_sequence import CustomTuple
+    from inline_snapshot._customize._custom_unmanaged import CustomUnmanaged
+
+    calls = []
+
+    class Point:
+        def __init__(self, x):
+            calls.append(x)
+            self.x = x
+
+        def __eq__(self, other):
+            return isinstance(other, Point) and self.x == other.x
+
+        def __hash__(self):
+            return hash(self.x)
+
+    def point(x):
+        return CustomCall(CustomCode(Point, "Point"), [CustomCode(x)], {})
+
+    value = CustomTuple([CustomCode(1), CustomCode("a")])
+    assert value._eval() is value._eval()
+
+    value = CustomTuple([point(1), CustomCode("a")])
+
+    # the hash is cached, but not the mutable Point
+    assert hash(value) == hash(value)
+    assert calls == [1]
+    assert value._eval() is not value._eval()
+
+    assert value == CustomTuple([point(1), CustomCode("a")])
+    assert value != CustomTuple([point(2), CustomCode("a")])
+    assert {value: 5}[CustomTuple([point(1), CustomCode("a")])] == 5
+
+    # unmanaged values are updated and are not cached
+    unmanaged = CustomUnmanaged(value=1)
+    value = CustomTuple([point(3), unmanaged])
+    assert value._eval() == (Point(3), 1)
+    unmanaged.value = 2
+    assert value._eval() == (Point(3), 2)
+
+
+def test_eval_cache_mutable_result():
+    from inline_snapshot._customize._custom_call import CustomCall
+    from inline_snapshot._customize._custom_code import CustomCode
+    from inline_snapshot._customize._custom_sequence import CustomList
+    from inline_snapshot._customize._custom_sequence import CustomTuple
+
+    class Point:
+        def __init__(self, x):
+            self.x = x
+
+        def __eq__(self, other):
+            return isinstance(other, Point) and self.x == other.x
+
+    child = CustomList([CustomCode(1)])
+    value = CustomList([child])
+    assert value._eval() == [[1]]
+
+    child._eval().append(2)
+    value._eval()[0].append(3)
+    assert value._eval() == [[1]]
+
+    point = CustomCall(CustomCode(Point, "Point"), [CustomCode(1)], {})
+    value = CustomTuple([point])
+    assert value._eval() == (Point(1),)
+
+    point._eval().x = 2
+    value._eval()[0].x = 3
+    assert value._eval() == (Point(1),)
@@ -2,6 +2,8 @@ import platform
 import re
 import sys
 
+import pytest
+
 from inline_snapshot import snapshot
 from inline_snapshot.extra import transformation
 from inline_snapshot.testing import Example
@@ -310,3 +312,282 @@ def test_a():
         returncode=1,
         outcomes={"passed": 1, "errors": 1},
     ).run_inline()
+
+
+def test_format_expressions(mocker, snapshot_env):
+    import black
+
+    from inline_snapshot._format import format_expressions
+
+    format_str = mocker.spy(black, "format_str")
+
+    with snapshot_env():
+        result = format_expressions(
+            ['" "', "[1,2,]", "{'a':1}", "f(  x )"], "test_something.py"
+        )
+
+    assert result == snapshot(
+        [
+            '" "\n',
+            """\
+[
+    1,
+    2,
+]
+""",
+            '{"a": 1}\n',
+            "f(x)\n",
+        ]
+    )
+    assert format_str.call_count == 1
+
+
+def test_format_expressions_error(snapshot_env):
+    from inline_snapshot._format import format_expressions
+
+    with snapshot_env() as state:
+        result = format_expressions(["[1,2]", "1+"], "test_something.py")
+        problems = len(state.all_problems)
+
+    # every expression is formatted on its own when the batch can not be formatted
+    assert result == snapshot(["[1, 2]\n", "1+"])
+    assert problems == 1
+
+
+def test_format_cache(mocker, tmp_path, snapshot_env):
+    import black
+
+    from inline_snapshot._format import format_code
+    from inline_snapshot._format_cache import format_cache
+
+    format_str = mocker.spy(black, "format_str")
+
+    def format_twice():
+        with snapshot_env():
+            result = format_code("[1,2]", "test_something.py")
+            format_cache().prune()
+            return result
+
+    assert format_twice() == "[1, 2]\n"
+    assert format_twice() == "[1, 2]\n"
+    assert format_str.call_count == 1
+
+    cache_dir = tmp_path / "cache" / "format"
+    assert (cache_dir / ".gitignore").read_text().endswith("*\n")
+    assert len(list(cache_dir.glob("??/*"))) == 1
+
+
+def test_format_cache_prune(tmp_path):
+    import os
+
+    from inline_snapshot._format_cache import FormatCache
+
+    cache = FormatCache(tmp_path, max_size=10)
+    cache.set("aa1", "12345")
+    cache.set("aa2", "12345")
+    os.utime(tmp_path / "aa" / "aa1", (0, 0))
+    cache.set("aa3", "12345")
+
+    cache.prune()
+
+    assert cache.get("aa1") is None
+    assert cache.get("aa2") == "12345"
+    assert cache.get("aa3") == "12345"
+
+
+format_server = """\
+import re
+import sys
+
+with open("server.log", "a") as log:
+    log.write("start\\n")
+
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+
+while line := stdin.readline():
+    filename_length, code_length = map(int, line.split())
+    filename = stdin.read(filename_length).decode()
+    code = stdin.read(code_length).decode()
+
+    result = re.sub("#.*", "", code).encode()
+    stdout.write(b"ok %d\\n" % len(result) + result)
+    stdout.flush()
+"""
+
+
+def test_format_server():
+    Example(
+        {
+            "format_server.py": format_server,
+            "pyproject.toml": f"""\
+[tool.inline-snapshot]
+format-server="{executable} format_server.py"
+""",
+            "test_a.py": """\
+from inline_snapshot import snapshot
+# some comment
+def test_a():
+    assert "5" == snapshot('''3''')# abc
+""",
+            "test_b.py": """\
+from inline_snapshot import snapshot
+# some comment
+def test_b():
+    assert "5" == snapshot('''3''')# abc
+""",
+        }
+    ).run_pytest(
+        ["--inline-snapshot=fix"],
+        changed_files=snapshot(
+            {
+                "server.log": "start\n",
+                "test_a.py": """\
+from inline_snapshot import snapshot
+
+def test_a():
+    assert "5" == snapshot('5')
+""",
+                "test_b.py": """\
+from inline_snapshot import snapshot
+
+def test_b():
+    assert "5" == snapshot('5')
+""",
+            }
+        ),
+        returncode=1,
+        outcomes={"passed": 2, "errors": 2},
+    )
+
+
+def test_format_server_fallback():
+
+    @transformation
+    def NoExecutable(text):
+        return re.sub(
+            r"'[^']*python[^']* format_server.py' *\n?",
+            "'python format_server.py' ",
+            text,
+        )
+
+    Example(
+        {
+            "format_server.py": """\
+import sys
+
+with open("server.log", "a") as log:
+    log.write("start\\n")
+
+sys.stdin.readline()
+sys.stderr.write("server crashed\\n")
+sys.exit(1)
+""",
+            "fmt_cmd.py": """\
+from sys import stdin,stdout
+import re
+
+text=stdin.read()
+text=re.sub("#.*","",text)
+stdout.buffer.write(text.encode("utf-8"))
+""",
+            "pyproject.toml": f"""\
+[tool.inline-snapshot]
+format-server="{executable} format_server.py"
+format-command="{executable} fmt_cmd.py {{filename}}"
+""",
+            "test_a.py": """\
+from inline_snapshot import snapshot
+# some comment
+def test_a():
+    assert "5" == snapshot('''3''')# abc
+""",
+        }
+    ).run_inline(
+        ["--inline-snapshot=fix"],
+        changed_files=snapshot(
+            {
+                "server.log": """\
+start
+start
+""",
+                "test_a.py": """\
+from inline_snapshot import snapshot
+
+def test_a():
+    assert "5" == snapshot('5')
+""",
+            }
+        ),
+        report=NoExecutable(snapshot("""\
+FAIL: some snapshots in this test have incorrect values.
+If you just created this value with --inline-snapshot=create, the value is now \n\
+created and you can ignore this message.
+
+
+═══════════════════════════════ inline-snapshot ════════════════════════════════
+-------------------------------- Fix snapshots ---------------------------------
++--------------------------------- test_a.py ----------------------------------+
+| @@ -1,4 +1,4 @@                                                              |
+|                                                                              |
+|  from inline_snapshot import snapshot                                        |
+| -# some comment                                                              |
+| +                                                                            |
+|  def test_a():                                                               |
+| -    assert "5" == snapshot('''3''')# abc                                    |
+| +    assert "5" == snapshot('5')                                             |
++------------------------------------------------------------------------------+
+These changes will be applied, because you used fix
+
+----------------------------------- Problems -----------------------------------
+The format-server 'python format_server.py' stopped and could not be restarted:
+server crashed
+The code is formatted without the server for the rest of the session.
+
+""")),
+    )
+
+
+@pytest.mark.parametrize("read_request", [True, False])
+def test_format_server_timeout(tmp_path, snapshot_env, read_request):
+    from inline_snapshot._format_server import FormatServer
+    from inline_snapshot._format_server import FormatServerUnavailable
+
+    log = tmp_path / "server.log"
+    server_script = tmp_path / "format_server.py"
+    server_script.write_text(f"""\
+import sys
+import time
+
+with open({str(log)!r}, "a") as log:
+    log.write("start\\n")
+
+if {read_request!r}:
+    sys.stdin.buffer.readline()
+time.sleep(1000)
+""")
+
+    server = FormatServer(f'"{sys.executable}" "{server_script}"', timeout=0.5)
+
+    with snapshot_env() as state:
+        try:
+            # the request is larger than the buffer of the pipe if the
+            # server does not read it
+            server.format(
+                "a=1\n" if read_request else "a=1\n" * 1000000, "test_something.py"
+            )
+        except FormatServerUnavailable:
+            pass
+        else:
+            assert False, "the server should be unavailable"
+        problems = [
+            re.sub("'.*'", "'python format_server.py'", problem)
+            for problem in state.all_problems
+        ]
+
+    assert log.read_text() == "start\nstart\n"
+    assert server._process is None
+    assert problems == snapshot(["""\
+[b]The format-server 'python format_server.py' stopped and could not be restarted:[/b]
+no response within 0.5 seconds
+The code is formatted without the server for the rest of the session.\
+"""])
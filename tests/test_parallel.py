@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+from dirty_equals import IsDict
+
+from inline_snapshot import snapshot
+from inline_snapshot._global_state import snapshot_env
+from inline_snapshot._parallel import ensure_directory
+from inline_snapshot._parallel import parallel_map
+from inline_snapshot.testing._example import Example
+
+
+def test_parallel_map():
+    threads = set()
+
+    def f(i):
+        threads.add(threading.get_ident())
+        if i in (5, 7):
+            raise ValueError(i)
+        return i * 2
+
+    assert parallel_map(f, range(4)) == [0, 2, 4, 6]
+
+    # the first exception is raised
+    with pytest.raises(ValueError, match="5"):
+        parallel_map(f, range(10))
+
+    assert threading.get_ident() not in threads
+
+
+def test_ensure_directory(tmp_path, mocker):
+    mkdir = mocker.spy(type(tmp_path), "mkdir")
+    directory = tmp_path / "a"
+
+    with snapshot_env():
+        for _ in range(3):
+            ensure_directory(directory)
+
+    assert directory.is_dir()
+    assert mkdir.call_count == 1
+
+
+def test_many_externals():
+    Example("from inline_snapshot import external, external_file\n\n" + "".join(f"""\
+def test_{i}():
+    assert "{i}" == external()
+    assert {i} == external_file("files/{i}.json")
+
+""" for i in range(20))).run_inline(
+        ["--inline-snapshot=create"],
+        reported_categories=snapshot({"create", "fix"}),
+        changed_files=IsDict(
+            {f"tests/files/{i}.json": str(i) for i in range(20)}
+        ).settings(partial=True),
+    ).run_inline()
+
+
+@pytest.mark.parametrize("thread_safe", [True, False])
+def test_apply_external_changes(tmp_path, thread_safe):
+    from inline_snapshot._change import ExternalChange
+    from inline_snapshot._external._external_location import ExternalLocation
+    from inline_snapshot._external._storage._protocol import StorageProtocol
+    from inline_snapshot._snapshot_session import apply_external_changes
+
+    threads = []
+
+    class Storage(StorageProtocol):
+        def store(self, location, file_path):
+            threads.append(threading.get_ident())
+
+    storage = Storage()
+    storage.thread_safe = thread_safe
+
+    with snapshot_env() as state:
+        state.all_storages["hash"] = storage
+        apply_external_changes(
+            [
+                ExternalChange(
+                    "create",
+                    tmp_path / f"{i}.txt",
+                    ExternalLocation.from_name(""),
+                    ExternalLocation.from_name(f"hash:{i}.txt"),
+                    None,
+                )
+                for i in range(10)
+            ]
+        )
+
+    assert len(threads) == 10
+    # the changes of storages which are not thread-safe are applied in the
+    # main thread
+    assert (threading.get_ident() in threads) != thread_safe
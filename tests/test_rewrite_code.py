@@ -1,5 +1,6 @@
 import pytest
 
+from inline_snapshot import snapshot
 from inline_snapshot._rewrite_code import ChangeRecorder
 from inline_snapshot._rewrite_code import SourcePosition
 from inline_snapshot._rewrite_code import SourceRange
@@ -22,7 +23,7 @@ def test_range():
         SourceRange(b, a)
 
 
-def test_rewrite(tmp_path):
+def test_rewrite(tmp_path, snapshot_env):
     file = tmp_path / "file.txt"
     file.write_bytes(b"""
 12345
@@ -30,18 +31,203 @@ def test_rewrite(tmp_path):
 12345
 """)
 
-    recorder = ChangeRecorder()
-    s = recorder.new_change()
+    with snapshot_env():
+        recorder = ChangeRecorder()
+        s = recorder.new_change()
 
-    s.replace(((2, 2), (2, 3)), "a", filename=file)
-    s.delete(((3, 2), (3, 3)), filename=file)
-    s.insert((4, 2), "c", filename=file)
+        s.replace(((2, 2), (2, 3)), "a", filename=file)
+        s.delete(((3, 2), (3, 3)), filename=file)
+        s.insert((4, 2), "c", filename=file)
 
-    assert recorder.num_fixes() == 1
-    recorder.fix_all()
+        assert recorder.num_fixes() == 1
+        recorder.fix_all()
 
     assert file.read_text("utf-8") == """
 12a45
 1245
 12c345
 """
+
+
+def test_new_code_cache(tmp_path, mocker, snapshot_env):
+    from inline_snapshot import _file_cache
+    from inline_snapshot import _rewrite_code
+
+    file = tmp_path / "file.py"
+    file.write_bytes(b"a = 1\nb = 2\n")
+
+    is_formatted = mocker.spy(_file_cache, "format_code")
+    format_code = mocker.spy(_rewrite_code, "format_code")
+
+    with snapshot_env():
+        recorder = ChangeRecorder()
+        recorder.new_change().replace(((1, 4), (1, 5)), "5", filename=file)
+
+        source = recorder.get_source(file)
+        assert source.new_code() == "a = 5\nb = 2\n"
+        calls = format_code.call_count
+        assert source.new_code() == "a = 5\nb = 2\n"
+        assert format_code.call_count == calls
+
+        # another recorder with the same replacements reuses the result
+        other = ChangeRecorder()
+        other.new_change().replace(((1, 4), (1, 5)), "5", filename=file)
+        assert other.get_source(file).new_code() == "a = 5\nb = 2\n"
+        assert format_code.call_count == calls
+
+        recorder.new_change().replace(((2, 4), (2, 5)), "7", filename=file)
+        assert source.new_code() == "a = 5\nb = 7\n"
+        assert format_code.call_count == calls + 1
+
+        # the original file is checked only once
+        assert is_formatted.call_count == 1
+
+        recorder.fix_all()
+        assert file.read_text() == "a = 5\nb = 7\n"
+        assert ChangeRecorder().get_source(file).source == "a = 5\nb = 7\n"
+
+
+def test_layered_recorder(tmp_path, snapshot_env):
+
+    file_a = tmp_path / "a.py"
+    file_a.write_bytes(b"a = 1\nb = 2\n")
+    file_b = tmp_path / "b.py"
+    file_b.write_bytes(b"c = 3\n")
+
+    with snapshot_env():
+        first = ChangeRecorder()
+        first.new_change().replace(((1, 4), (1, 5)), "5", filename=file_a)
+
+        second = first.layer()
+        second.new_change().replace(((1, 4), (1, 5)), "6", filename=file_b)
+        assert [f.filename for f in second.files()] == [file_b]
+
+        # the changes of the first layer are found through the second layer
+        third = second.layer()
+        third.new_change().replace(((2, 4), (2, 5)), "7", filename=file_a)
+
+        source = third.get_source(file_a)
+        assert source.source == "a = 5\nb = 2\n"
+        assert source.new_code() == "a = 5\nb = 7\n"
+        diff = source.diff()
+
+    assert diff == snapshot("""\
+@@ -1,2 +1,2 @@
+
+ a = 5
+-b = 2
++b = 7\
+""")
+
+
+def test_replacement_order(tmp_path, snapshot_env):
+    import random
+
+    file = tmp_path / "file.py"
+    file.write_bytes(b"a = [1, 2, 3, 4, 5]\n" * 3)
+
+    positions = [(line, col) for line in range(1, 4) for col in range(5, 19, 3)]
+    random.Random(0).shuffle(positions)
+
+    with snapshot_env():
+        recorder = ChangeRecorder()
+        s = recorder.new_change()
+        for line, col in positions:
+            s.replace(((line, col), (line, col + 1)), "x", filename=file)
+            s.insert((line, col + 1), "0", filename=file)
+
+        source = recorder.get_source(file)
+        assert source.replacements == sorted(source.replacements)
+
+        recorder.fix_all()
+
+    assert file.read_text("utf-8") == "a = [x0, x0, x0, x0, x0]\n" * 3
+
+
+def test_overlapping_replacements(tmp_path, snapshot_env):
+
+    file = tmp_path / "file.py"
+    file.write_bytes(b"a = 123456\n")
+
+    with snapshot_env():
+        recorder = ChangeRecorder()
+        s = recorder.new_change()
+        s.replace(((1, 5), (1, 8)), "0", filename=file)
+
+        with pytest.raises(AssertionError):
+            s.replace(((1, 7), (1, 9)), "0", filename=file)
+
+        with pytest.raises(AssertionError):
+            s.replace(((1, 4), (1, 6)), "0", filename=file)
+
+        s.replace(((1, 8), (1, 9)), "9", filename=file)
+        s.replace(((1, 4), (1, 5)), "7", filename=file)
+        recorder.fix_all()
+
+    assert file.read_text("utf-8") == "a = 7096\n"
+
+
+def test_format_changed_lines(tmp_path, mocker, snapshot_env):
+    from inline_snapshot import _rewrite_code
+
+    file = tmp_path / "file.py"
+    file.write_text("".join(f"a{i} = [{i}]\n" for i in range(100)), "utf-8")
+
+    format_code = mocker.spy(_rewrite_code, "format_code")
+
+    with snapshot_env():
+        recorder = ChangeRecorder()
+        s = recorder.new_change()
+        s.replace(((10, 5), (10, 8)), "[ 1,2 ]", filename=file)
+        s.replace(((11, 6), (11, 10)), "[\n1]", filename=file)
+        s.replace(((50, 6), (50, 10)), "[ 1 ]", filename=file)
+        new_code = recorder.get_source(file).new_code()
+
+    assert format_code.call_args.kwargs["lines"] == [(10, 12), (51, 51)]
+    assert new_code.splitlines()[9:11] == ["a9 = [1, 2]", "a10 = [1]"]
+    assert new_code.splitlines()[49] == "a49 = [1]"
+
+
+def test_layer_formats_only_its_replacements(tmp_path, mocker, snapshot_env):
+    from inline_snapshot import _rewrite_code
+
+    file = tmp_path / "file.py"
+    file.write_text("".join(f"a{i} = [{i}]\n" for i in range(100)), "utf-8")
+
+    format_code = mocker.spy(_rewrite_code, "format_code")
+
+    def replace_line_50(recorder):
+        recorder.new_change().replace(((50, 6), (50, 10)), "[ 1 ]", filename=file)
+
+    with snapshot_env():
+        first = ChangeRecorder()
+        first.new_change().replace(((10, 5), (10, 8)), "[\n    1,\n]", filename=file)
+        first.get_source(file).new_code()
+
+        # the replacement of the second layer is moved by the two lines which
+        # are inserted by the first layer
+        second = first.layer()
+        replace_line_50(second)
+        new_code = second.get_source(file).new_code()
+        assert format_code.call_args.kwargs["lines"] == [(52, 52)]
+
+        # the code of the lower layer is changed by the formatter and the
+        # positions can not be moved through it
+        third = ChangeRecorder()
+        third.new_change().replace(((10, 5), (10, 8)), "[ 1 ]", filename=file)
+        fourth = third.layer()
+        replace_line_50(fourth)
+        fallback_code = fourth.get_source(file).new_code()
+        assert format_code.call_args.kwargs["lines"] == [(10, 10), (50, 50)]
+
+    with snapshot_env():
+        flat = ChangeRecorder()
+        flat.new_change().replace(((10, 5), (10, 8)), "[\n    1,\n]", filename=file)
+        replace_line_50(flat)
+        expected = flat.get_source(file).new_code()
+
+    assert new_code == expected
+    assert new_code.splitlines()[9:12] == ["a9 = [", "    1,", "]"]
+    assert new_code.splitlines()[51] == "a49 = [1]"
+    assert fallback_code.splitlines()[9] == "a9 = [1]"
+    assert fallback_code.splitlines()[49] == "a49 = [1]"
@@ -10,15 +10,18 @@ def test_a():
     assert 1==snapshot()
 """).run_pytest(
         ["--inline-snapshot=create", "-n=auto"],
-        stderr=snapshot(
-            "ERROR: --inline-snapshot=create cannot be combined with xdist\n"
-        ),
-        returncode=4,
-        outcomes={},
+        changed_files=snapshot({"tests/test_something.py": """\
+from inline_snapshot import snapshot
+
+def test_a():
+    assert 1==snapshot(1)
+"""}),
+        returncode=snapshot(1),
+        outcomes=snapshot({"passed": 1, "errors": 1}),
     )
 
 
-def test_xdist_disabled():
+def test_xdist_report():
     Example("""\
 from inline_snapshot import snapshot
 
@@ -27,12 +30,22 @@ def test_a():
 """).run_pytest(
         ["-n=auto"],
         report=snapshot("""\
-INFO: inline-snapshot was disabled because you used xdist. This means that tests
-with snapshots will continue to run, but snapshot(x) will only return x and
-inline-snapshot will not be able to fix snapshots or generate reports.\
+-------------------------------- Fix snapshots ---------------------------------
++-------------------------- tests/test_something.py ---------------------------+
+| @@ -1,4 +1,4 @@                                                              |
+|                                                                              |
+|  from inline_snapshot import snapshot                                        |
+|                                                                              |
+|  def test_a():                                                               |
+| -    assert 1==snapshot(5)                                                   |
+| +    assert 1==snapshot(1)                                                   |
++------------------------------------------------------------------------------+
+These changes are not applied.
+Use --inline-snapshot=fix to apply them, or use the interactive mode with
+--inline-snapshot=review\
 """),
         returncode=snapshot(1),
-        outcomes=snapshot({"failed": 1}),
+        outcomes=snapshot({"failed": 1, "errors": 1}),
         error="""\
 >       assert 1==snapshot(5)
 E       assert 1 == 5
@@ -64,10 +77,14 @@ E        +  where 2 = snapshot(2)
 
     e.run_pytest(
         ["-n=auto", "--inline-snapshot=fix"],
-        report=snapshot(""),
-        stderr=snapshot("ERROR: --inline-snapshot=fix cannot be combined with xdist\n"),
-        returncode=4,
-        outcomes={},
+        changed_files=snapshot({"tests/test_something.py": """\
+from inline_snapshot import snapshot
+
+def test_a():
+    assert 1==snapshot(1)
+"""}),
+        returncode=snapshot(1),
+        outcomes=snapshot({"passed": 1, "errors": 1}),
     )
 
     Example(
@@ -85,19 +102,97 @@ def test_a():
         }
     ).run_pytest(
         ["-n=auto"],
+        changed_files=snapshot({"tests/test_something.py": """\
+from inline_snapshot import snapshot
+
+def test_a():
+    assert 1==snapshot(1)
+"""}),
+        returncode=snapshot(1),
+        outcomes=snapshot({"passed": 1, "errors": 1}),
+    )
+
+
+def test_xdist_multiple_workers():
+    Example(
+        {
+            "tests/test_a.py": """\
+from inline_snapshot import snapshot, external
+
+def check(value):
+    assert value == snapshot()
+
+def test_a():
+    check(5)
+    assert [1, 2] == snapshot([1, 3])
+
+def test_b():
+    check(5)
+    assert "text" == external("hash:")
+""",
+        }
+    ).run_pytest(
+        ["-n=2", "--dist=each", "--inline-snapshot=create,fix"],
+        changed_files=snapshot(
+            {
+                ".inline-snapshot/external/982d9e3eb996f559e633f4d194def3761d909f5a3b647d1a851fead67c32c9d1.txt": "text",
+                "tests/test_a.py": """\
+from inline_snapshot import snapshot, external
+
+def check(value):
+    assert value == snapshot(5)
+
+def test_a():
+    check(5)
+    assert [1, 2] == snapshot([1, 2])
+
+def test_b():
+    check(5)
+    assert "text" == external("hash:982d9e3eb996*.txt")
+""",
+            }
+        ),
+        returncode=snapshot(1),
+        outcomes=snapshot({"passed": 4, "errors": 4}),
+    )
+
+
+def test_xdist_conflict():
+    Example("""\
+import os
+from inline_snapshot import snapshot
+
+def test_a():
+    assert os.environ["PYTEST_XDIST_WORKER"] == snapshot()
+""").run_pytest(
+        ["-n=2", "--dist=each", "--inline-snapshot=create"],
         report=snapshot("""\
-INFO: inline-snapshot was disabled because you used xdist. This means that tests
-with snapshots will continue to run, but snapshot(x) will only return x and
-inline-snapshot will not be able to fix snapshots or generate reports.\
+------------------------------- Create snapshots -------------------------------
++-------------------------- tests/test_something.py ---------------------------+
+| @@ -2,4 +2,4 @@                                                              |
+|                                                                              |
+|  from inline_snapshot import snapshot                                        |
+|                                                                              |
+|  def test_a():                                                               |
+| -    assert os.environ["PYTEST_XDIST_WORKER"] == snapshot()                  |
+| +    assert os.environ["PYTEST_XDIST_WORKER"] == snapshot("gw0")             |
++------------------------------------------------------------------------------+
+These changes will be applied, because you used create
+----------------------------------- Problems -----------------------------------
+The snapshot at tests/test_something.py:5 was changed differently by the xdist
+workers gw0 and gw1.
+Only the changes of gw0 are used. Run the tests without xdist (-n0) to update
+this snapshot correctly.\
 """),
-        stderr=snapshot(""),
-        returncode=1,
-        error="""\
->       assert 1==snapshot(2)
-E       assert 1 == 2
-E        +  where 2 = snapshot(2)
-""",
-        outcomes={"failed": 1},
+        changed_files=snapshot({"tests/test_something.py": """\
+import os
+from inline_snapshot import snapshot
+
+def test_a():
+    assert os.environ["PYTEST_XDIST_WORKER"] == snapshot("gw0")
+"""}),
+        returncode=snapshot(1),
+        outcomes=snapshot({"passed": 2, "errors": 2}),
     )
 
 
@@ -122,3 +217,78 @@ E       assert 1 == 2
 E        +  where 2 = snapshot(2)
 """,
     )
+
+
+def test_xdist_change_from_one_worker():
+    Example("""\
+import os
+from inline_snapshot import snapshot
+
+def test_a():
+    s = snapshot([1])
+    if os.environ["PYTEST_XDIST_WORKER"] == "gw1":
+        assert [1, 2] == s
+""").run_pytest(
+        ["-n=2", "--dist=each", "--inline-snapshot=fix"],
+        changed_files=snapshot({"tests/test_something.py": """\
+import os
+from inline_snapshot import snapshot
+
+def test_a():
+    s = snapshot([1, 2])
+    if os.environ["PYTEST_XDIST_WORKER"] == "gw1":
+        assert [1, 2] == s
+"""}),
+        returncode=snapshot(1),
+        outcomes=snapshot({"passed": 2, "errors": 1}),
+    )
+
+
+def test_xdist_overlapping_changes():
+    Example("""\
+import os
+from inline_snapshot import snapshot
+
+def test_a():
+    s = snapshot([1])
+    if os.environ["PYTEST_XDIST_WORKER"] == "gw0":
+        assert "x" == s
+    else:
+        assert [1, 2] == s
+""").run_pytest(
+        ["-n=2", "--dist=each", "--inline-snapshot=fix"],
+        changed_files=snapshot({"tests/test_something.py": """\
+import os
+from inline_snapshot import snapshot
+
+def test_a():
+    s = snapshot("x")
+    if os.environ["PYTEST_XDIST_WORKER"] == "gw0":
+        assert "x" == s
+    else:
+        assert [1, 2] == s
+"""}),
+        report=snapshot("""\
+-------------------------------- Fix snapshots ---------------------------------
++-------------------------- tests/test_something.py ---------------------------+
+| @@ -2,7 +2,7 @@                                                              |
+|                                                                              |
+|  from inline_snapshot import snapshot                                        |
+|                                                                              |
+|  def test_a():                                                               |
+| -    s = snapshot([1])                                                       |
+| +    s = snapshot("x")                                                       |
+|      if os.environ["PYTEST_XDIST_WORKER"] == "gw0":                          |
+|          assert "x" == s                                                     |
+|      else:                                                                   |
++------------------------------------------------------------------------------+
+These changes will be applied, because you used fix
+----------------------------------- Problems -----------------------------------
+The snapshot at tests/test_something.py:5 was changed differently by the xdist
+workers gw0 and gw1.
+Only the changes of gw0 are used. Run the tests without xdist (-n0) to update
+this snapshot correctly.\
+"""),
+        returncode=snapshot(1),
+        outcomes=snapshot({"passed": 2, "errors": 2}),
+    )